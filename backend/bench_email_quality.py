@@ -0,0 +1,70 @@
+import os
+import sys
+import time
+import statistics
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.email_quality import EmailQualityValidator, GENERIC_PHRASES
+from test_email_quality import RESUME, GOOD, GENERIC
+
+# Benchmark for email validation: legacy per-phrase scans vs the compiled validator,
+# per candidate and per streamed chunk. Makes no API calls, but needs the backend .env
+# like the other scripts: python bench_email_quality.py
+
+ITERATIONS = 2000
+CHUNK = 16
+
+
+def legacy_is_too_generic(email_text: str) -> bool:
+    """The validation previously in LLMService._is_too_generic (without logging)"""
+    email_lower = email_text.lower()
+    generic_count = sum(1 for phrase in GENERIC_PHRASES if phrase in email_lower)
+    return generic_count >= 2 or len(email_text.split()) < 100
+
+
+def timed(fn, iterations: int = ITERATIONS):
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    timings.sort()
+    return statistics.median(timings), timings[int(len(timings) * 0.95)]
+
+
+def stream_through(validator, entities, text):
+    stream = validator.stream(entities)
+    for start in range(0, len(text), CHUNK):
+        stream.feed(text[start:start + CHUNK])
+    return stream
+
+
+def main():
+    validator = EmailQualityValidator()
+    entities = validator.extract_entities(RESUME)
+    chunks = len(GOOD) // CHUNK + 1
+
+    rows = [
+        ("legacy scan (good)", lambda: legacy_is_too_generic(GOOD)),
+        ("legacy scan (generic)", lambda: legacy_is_too_generic(GENERIC)),
+        ("check, no resume (good)", lambda: validator.check(GOOD)),
+        ("check + entities (good)", lambda: validator.check(GOOD, entities)),
+        ("check + entities (generic)", lambda: validator.check(GENERIC, entities)),
+        ("extract entities (cold)", lambda: EmailQualityValidator().extract_entities(RESUME)),
+        ("extract entities (cached)", lambda: validator.extract_entities(RESUME)),
+        (f"stream, {chunks} chunks of {CHUNK}", lambda: stream_through(validator, entities, GOOD)),
+    ]
+
+    header = f"{'Operation':<32}{'p50 us':>10}{'p95 us':>10}"
+    print(header)
+    print("-" * len(header))
+    for name, fn in rows:
+        p50, p95 = timed(fn, ITERATIONS // 10 if "cold" in name else ITERATIONS)
+        print(f"{name:<32}{p50:>10.1f}{p95:>10.1f}")
+
+    p50, _ = timed(lambda: stream_through(validator, entities, GOOD))
+    print(f"\nPer streamed chunk: {p50 / chunks:.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import os
+import sys
+import time
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.email_renderer import EmailRenderer
+from test_email_renderer import BODY, HOSTILE, test_hostile_input_is_escaped
+
+# Benchmark for outbound email rendering: the previous per-send f-string vs the compiled
+# templates, one at a time and as batch sends. Makes no API calls, but needs the backend .env
+# like the other scripts: python bench_email_renderer.py
+
+BATCH_SIZES = [1, 100, 1000]
+ROUNDS = 20
+
+
+def legacy_format_email_body(body: str) -> str:
+    """Copy of the rendering previously in ResendService._format_email_body (HTML only, unescaped)"""
+    if not body.startswith("<"):
+        body = body.replace("\n", "<br>")
+
+    html_body = f"""
+<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>
+        body {{
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 600px;
+            margin: 0 auto;
+            padding: 20px;
+        }}
+        .email-content {{
+            margin-bottom: 30px;
+        }}
+        .footer {{
+            margin-top: 40px;
+            padding-top: 20px;
+            border-top: 1px solid #e0e0e0;
+            font-size: 12px;
+            color: #666;
+            text-align: center;
+        }}
+        .footer a {{
+            color: #4f46e5;
+            text-decoration: none;
+        }}
+    </style>
+</head>
+<body>
+    <div class="email-content">
+        {body}
+    </div>
+
+    <div class="footer">
+        <p>This email was sent via <a href="https://internify.app" target="_blank">Internify</a></p>
+        <p style="font-size: 11px; color: #999;">
+            If you'd like to stop receiving emails from this sender, please reply directly to them.
+        </p>
+    </div>
+</body>
+</html>
+"""
+    return html_body
+
+
+def throughput(fn, bodies) -> float:
+    """Emails rendered per second (best of ROUNDS)"""
+    best = float("inf")
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        fn(bodies)
+        best = min(best, time.perf_counter() - start)
+    return len(bodies) / best
+
+
+def main():
+    renderer = EmailRenderer()
+
+    # Personalised bodies (all distinct) and one body to many recipients
+    variants = [BODY.replace("Hi team", f"Hi team {i}") for i in range(max(BATCH_SIZES))]
+
+    header = f"{'Batch':<28}{'legacy/s':>12}{'render/s':>12}{'render_batch/s':>16}"
+    print(header)
+    print("-" * len(header))
+
+    for size in BATCH_SIZES:
+        for label, bodies in (("distinct", variants[:size]), ("same body", [BODY] * size)):
+            legacy = throughput(lambda b: [legacy_format_email_body(x) for x in b], bodies)
+            single = throughput(lambda b: [renderer.render(x) for x in b], bodies)
+            batch = throughput(renderer.render_batch, bodies)
+            print(f"{f'{size} x {label}':<28}{legacy:>12,.0f}{single:>12,.0f}{batch:>16,.0f}")
+
+    print("\nLegacy output for hostile bodies (unescaped markup reaches the HTML part):")
+    for body in HOSTILE[:3]:
+        print(f"  {body!r:<70} escaped: {body not in legacy_format_email_body(body)}")
+
+    print()
+    test_hostile_input_is_escaped()
+
+
+if __name__ == "__main__":
+    main()
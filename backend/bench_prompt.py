@@ -0,0 +1,121 @@
+import os
+import sys
+import time
+import statistics
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.prompt_builder import PromptBuilder, terms
+
+# Benchmark for prompt construction: tokens per section and build latency per request.
+# Makes no API calls, but needs the backend .env like the other scripts: python bench_prompt.py
+
+RESUME = """RUDRANSH KARAN
+Bangalore, India | rudransh@example.com | github.com/rudransh
+Computer Science student building backend systems and applied machine learning tools.
+
+EDUCATION
+B.Tech in Computer Science, PES University, 2022-2026, CGPA 8.9
+Relevant coursework: Operating Systems, Databases, Computer Networks, Machine Learning
+
+EXPERIENCE
+Backend Intern, FinEdge Payments (May 2024 - Jul 2024)
+• Built a reconciliation service in Go and PostgreSQL processing 2M transactions a day
+• Cut settlement report latency from 40s to 3s by adding partial indexes and batching queries
+• Wrote Kubernetes manifests and Grafana dashboards for the service
+
+Research Assistant, PES AI Lab (Jan 2024 - Apr 2024)
+• Fine-tuned BERT models for Kannada sentiment analysis with PyTorch and Hugging Face
+• Published an annotated dataset of 12,000 product reviews
+
+PROJECTS
+Internify — AI internship outreach platform
+• FastAPI backend with Supabase auth and storage, Groq and Gemini LLMs for email generation
+• Next.js frontend with Tailwind; SerpAPI integration for internship search
+SmartSense — real-time sensor fusion for industrial monitoring
+• STM32 microcontrollers running FreeRTOS, TensorFlow Lite anomaly detection at the edge
+• MQTT telemetry pipeline into InfluxDB with alerting
+PathFinder — campus navigation app
+• Flutter app with Dijkstra routing over an indoor graph, Firebase backend
+
+SKILLS
+Languages: Python, Go, C++, TypeScript, SQL
+Frameworks: FastAPI, Django, React, Next.js, PyTorch, TensorFlow
+Tools: Docker, Kubernetes, PostgreSQL, Redis, Git, Linux, AWS
+
+ACHIEVEMENTS
+• Winner, Smart India Hackathon 2023 (hardware edition)
+• Top 5% in Google Kick Start 2023
+
+INTERESTS
+Chess, long-distance running, photography
+"""
+
+JOBS = [
+    (
+        "Backend Engineering Intern",
+        "PayFlow",
+        "PayFlow is building the payments infrastructure for India's SMBs. As a backend intern you will design and "
+        "build high-throughput services in Go and Python, work with PostgreSQL and Redis, and improve reliability "
+        "of our settlement pipeline. You will write production code, review designs, and own features end to end. "
+        "Experience with Docker, Kubernetes and observability tools is a plus. We value curiosity, ownership and "
+        "clear communication. Stipend: INR 40,000/month. Location: Bangalore (hybrid). Duration: 6 months."
+    ),
+    (
+        "Embedded AI Intern",
+        "Controlytics AI",
+        "We build edge AI devices for predictive maintenance. You will port ML models to microcontrollers, optimize "
+        "inference with TensorFlow Lite, write firmware in C/C++ on FreeRTOS, and integrate sensor data pipelines "
+        "over MQTT. Familiarity with STM32 or ESP32 is required."
+    ),
+    (
+        "Machine Learning Intern",
+        "LinguaTech",
+        "Work on NLP models for Indian languages: data collection, fine-tuning transformer models with PyTorch, "
+        "evaluation, and deployment behind APIs."
+    ),
+]
+
+ITERATIONS = 200
+
+
+def head_truncation_coverage(resume: str, job_terms: set) -> float:
+    """Share of job terms found in the legacy head-truncated resume (first 1500 characters)"""
+    head = set(terms(resume[:1500]))
+    return len(head & job_terms) / len(job_terms) if job_terms else 0.0
+
+
+def main(builder: PromptBuilder):
+    print(f"Tokenizer: {'tiktoken cl100k_base' if builder.tokenizer.exact else 'approximate (install tiktoken for exact counts)'}")
+    print(f"Budgets: resume {builder.resume_budget} tokens, job {builder.job_budget} tokens")
+    print(f"Static system block: {builder.system_tokens} tokens\n")
+
+    header = f"{'Position':<28}{'user':>6}{'resume':>8}{'job':>6}{'total':>7}{'p50 ms':>9}{'p95 ms':>9}{'cov':>7}{'head cov':>10}"
+    print(header)
+    print("-" * len(header))
+
+    for title, company, description in JOBS:
+        timings = []
+        for _ in range(ITERATIONS):
+            start = time.perf_counter()
+            parts = builder.build(RESUME, description, title, company)
+            timings.append((time.perf_counter() - start) * 1000)
+
+        job_terms = set(terms(f"{title} {description}"))
+        selected_terms = set(terms(parts.user.split("## JOB DETAILS:")[0]))
+        coverage = len(selected_terms & job_terms) / len(job_terms)
+
+        timings.sort()
+        print(
+            f"{title[:27]:<28}{parts.user_tokens:>6}{parts.resume_tokens:>8}{parts.job_tokens:>6}{parts.total_tokens:>7}"
+            f"{statistics.median(timings):>9.3f}{timings[int(len(timings) * 0.95)]:>9.3f}"
+            f"{coverage:>7.0%}{head_truncation_coverage(RESUME, job_terms):>10.0%}"
+        )
+
+    print("\ncov: job terms covered by the selected resume chunks; head cov: same for the first 1500 characters")
+
+
+if __name__ == "__main__":
+    main(PromptBuilder())
+    # The sample resume fits the default budget; a tight budget exercises chunk selection
+    print()
+    main(PromptBuilder(resume_budget=200))
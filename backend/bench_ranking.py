@@ -0,0 +1,98 @@
+import os
+import sys
+import time
+import random
+import statistics
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.ranking_service import RankingService
+from test_email_quality import RESUME
+
+# Benchmark for resume-to-listing ranking: scoring 1,000 listings against a resume, with the
+# resume and listing vectors cached and not. Makes no API calls, but needs the backend .env
+# like the other scripts: python bench_ranking.py
+
+LISTINGS = 1000
+ROUNDS = 20
+
+ROLES = [
+    ("Embedded Systems Intern", "STM32 firmware in C++ on FreeRTOS, sensor fusion, MQTT telemetry"),
+    ("Machine Learning Intern", "Train TensorFlow Lite models for anomaly detection at the edge, Python"),
+    ("Backend Engineering Intern", "Build FastAPI services on Postgres and Docker, write Python tests"),
+    ("Frontend Intern", "React and Next.js UI work, TypeScript, CSS, accessibility"),
+    ("Marketing Intern", "Plan social media campaigns, write copy, analyse engagement"),
+    ("Finance Intern", "Support month-end close, reconcile accounts, Excel modelling"),
+    ("Sales Development Intern", "Prospect leads, cold calling, CRM hygiene in Salesforce"),
+]
+
+FILLER = (
+    "You will collaborate with mentors, attend weekly reviews and present your work at the end "
+    "of the program. We value curiosity, ownership and clear communication."
+).split()
+
+
+def make_listings(count: int, seed: int = 7) -> list:
+    rng = random.Random(seed)
+    listings = []
+    for i in range(count):
+        title, skills = ROLES[i % len(ROLES)]
+        words = skills.split() + rng.sample(FILLER, 12) + [f"team{rng.randint(0, 50)}"]
+        rng.shuffle(words)
+        listings.append({
+            "id": str(i),
+            "title": title,
+            "company": f"Company {i}",
+            "description": " ".join(words * 20),  # ~450 words, like a SerpAPI description
+        })
+    return listings
+
+
+def timed(fn, rounds: int = ROUNDS):
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[-1]
+
+
+def main():
+    listings = make_listings(LISTINGS)
+    # Not yet saved (no id), so their vectors can't be cached
+    unsaved = [{key: value for key, value in listing.items() if key != "id"} for listing in listings]
+
+    ranker = RankingService()
+    ranker.rank(listings, RESUME, resume_id="r1")  # warm the caches
+
+    rows = [
+        ("rank, vectors cached", lambda: ranker.rank(listings, RESUME, resume_id="r1", sort_by_match=True)),
+        ("rank, listings not cached", lambda: ranker.rank(unsaved, RESUME, resume_id="r1", sort_by_match=True)),
+        ("rank, all caches cold", lambda: RankingService().rank(listings, RESUME, sort_by_match=True)),
+        ("rank 10 listings (one search)", lambda: ranker.rank(listings[:10], RESUME, resume_id="r1", sort_by_match=True)),
+    ]
+
+    header = f"{'Operation':<34}{'p50 ms':>10}{'max ms':>10}"
+    print(f"{LISTINGS} listings, ~{len(listings[0]['description'].split())} words each\n")
+    print(header)
+    print("-" * len(header))
+    for name, fn in rows:
+        p50, worst = timed(fn)
+        print(f"{name:<34}{p50:>10.2f}{worst:>10.2f}")
+
+    resume = ranker.resume_vector("r1", RESUME)
+    scoring, _ = timed(lambda: ranker.score(resume, listings))
+    vectorize, _ = timed(lambda: [ranker.vectorize(ranker.listing_tokens(listing)) for listing in listings])
+    print(f"\nTokenizing + vectorizing {LISTINGS} listings: {vectorize:.2f} ms, batched scoring: {scoring:.2f} ms")
+
+    # The embedded/ML resume should put those roles on top and the business roles last
+    ranked = ranker.rank(listings[:len(ROLES)], RESUME, resume_id="r1", sort_by_match=True)
+    print("\nRanking for the sample resume:")
+    for listing in ranked:
+        print(f"  {listing['match_score']:.3f}  {listing['title']}")
+    assert ranked[0]["title"] in ("Embedded Systems Intern", "Machine Learning Intern")
+    assert ranked[-1]["match_score"] < ranked[0]["match_score"] / 3
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+import io
+import os
+import sys
+import asyncio
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import jwt
+import httpx
+from fastapi import Depends, File, UploadFile
+
+from main import app
+from routes.resume import extract_text_from_pdf, MAX_RESUME_BYTES, MULTIPART_OVERHEAD_BYTES
+from routes.utils import verify_token
+from services.supabase_service import supabase_service
+
+# Memory benchmark for /resume/upload: peak Python heap while several large resumes upload
+# concurrently, for the current streaming handler and the previous read-everything handler.
+# Supabase is stubbed out: python bench_resume_upload.py
+
+UPLOAD_MB = 8
+CONCURRENCY = [1, 4, 8]
+CHUNK = 64 * 1024
+
+
+def make_pdf(padding_bytes: int) -> bytes:
+    """A one-page PDF with some text, padded with an unreferenced binary stream (like an embedded image)"""
+    content = b"BT /F1 12 Tf 72 720 Td (Priya Sharma - Python, FastAPI, Supabase) Tj ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (padding_bytes, os.urandom(padding_bytes)),
+    ]
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        pdf += b"%010d 00000 n \n" % offset
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+def multipart(file_bytes: bytes, filename: str = "resume.pdf") -> tuple:
+    boundary = "benchboundary"
+    head = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+        f"Content-Type: application/pdf\r\n\r\n"
+    ).encode()
+    tail = f"\r\n--{boundary}--\r\n".encode()
+    return head + file_bytes + tail, f"multipart/form-data; boundary={boundary}"
+
+
+@app.post("/bench/legacy-upload")
+async def legacy_upload(file: UploadFile = File(...), payload: dict = Depends(verify_token)):
+    """The previous handler's file handling: whole file in memory, bytes passed on"""
+    file_content = await file.read()
+    extracted_text = await asyncio.to_thread(extract_text_from_pdf, io.BytesIO(file_content))
+    await supabase_service.upload_file(bucket="resumes", file_path="bench.pdf", file_data=file_content)
+    return {"length": len(extracted_text)}
+
+
+def stub_supabase():
+    async def get_user_by_id(user_id):
+        return {"id": user_id, "email": "bench@example.com"}
+
+    async def upload_file(bucket, file_path, file_data):
+        # Consume the upload like the storage client's multipart encoder does
+        if isinstance(file_data, bytes):
+            await asyncio.sleep(0.05)
+        else:
+            while file_data.read(CHUNK):
+                await asyncio.sleep(0)
+        return file_path
+
+    async def save_resume(user_id, file_path, extracted_text):
+        return {"id": "bench", "uploaded_at": "2025-01-01T00:00:00"}
+
+    supabase_service.get_user_by_id = get_user_by_id
+    supabase_service.upload_file = upload_file
+    supabase_service.save_resume = save_resume
+
+
+async def upload(client: httpx.AsyncClient, path: str, body: bytes, content_type: str, headers: dict) -> tuple:
+    """Stream `body` without a Content-Length; returns (status, bytes the server read before answering)"""
+    sent = 0
+
+    async def chunks():
+        nonlocal sent
+        # Arrive in network-sized chunks; the ASGI transport pulls one per receive()
+        view = memoryview(body)
+        for start in range(0, len(view), CHUNK):
+            sent = start + CHUNK
+            yield bytes(view[start:start + CHUNK])
+
+    response = await client.post(path, content=chunks(), headers={**headers, "Content-Type": content_type})
+    return response.status_code, min(sent, len(body))
+
+
+async def peak_mb(path: str, concurrency: int, body: bytes, content_type: str, headers: dict) -> tuple:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        tracemalloc.start()
+        results = await asyncio.gather(*(
+            upload(client, path, body, content_type, headers) for _ in range(concurrency)
+        ))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    return peak / (1024 * 1024), [status for status, _ in results]
+
+
+async def main():
+    stub_supabase()
+    secret = os.getenv("SUPABASE_JWT_SECRET") or "k" * 32  # unverified when the secret is unset
+    headers = {"Authorization": "Bearer " + jwt.encode({"sub": "bench-user", "email": "bench@example.com"}, secret)}
+
+    pdf = make_pdf(UPLOAD_MB * 1024 * 1024)
+    body, content_type = multipart(pdf)
+
+    print(f"{UPLOAD_MB} MB resume, limit {MAX_RESUME_BYTES // (1024 * 1024)} MB\n")
+    header = f"{'Concurrent uploads':<22}{'legacy peak MB':>16}{'streaming peak MB':>20}"
+    print(header)
+    print("-" * len(header))
+
+    for concurrency in CONCURRENCY:
+        legacy, legacy_statuses = await peak_mb("/bench/legacy-upload", concurrency, body, content_type, headers)
+        current, statuses = await peak_mb("/resume/upload", concurrency, body, content_type, headers)
+        assert set(legacy_statuses) == {200} and set(statuses) == {200}, (legacy_statuses, statuses)
+        print(f"{concurrency:<22}{legacy:>16.1f}{current:>20.1f}")
+
+    # Oversized and non-PDF uploads are refused
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+        # Past the middleware's allowance for multipart overhead, so the streaming cutoff
+        # (not the handler's file.size check) is what rejects it
+        oversized, oversized_type = multipart(make_pdf(MAX_RESUME_BYTES + 1024 * 1024))
+        cutoff = MAX_RESUME_BYTES + MULTIPART_OVERHEAD_BYTES
+        status, read = await upload(client, "/resume/upload", oversized, oversized_type, headers)
+        print(f"\nUpload over the limit (streamed, no Content-Length): {status} after "
+              f"{read / (1024 * 1024):.1f} of {len(oversized) / (1024 * 1024):.1f} MB")
+        assert status == 413
+        assert read <= cutoff + CHUNK < len(oversized), (read, cutoff)
+
+        declared = await client.post(
+            "/resume/upload", content=oversized, headers={**headers, "Content-Type": oversized_type}
+        )
+        print(f"Upload over the limit (Content-Length declared): {declared.status_code}")
+        assert declared.status_code == 413
+
+        # Refused from its first bytes, not after the whole file is spooled
+        fake, fake_type = multipart(b"MZ\x90\x00" + os.urandom(UPLOAD_MB * 1024 * 1024), filename="resume.pdf")
+        status, read = await upload(client, "/resume/upload", fake, fake_type, headers)
+        print(f"Non-PDF bytes named .pdf: {status} after {read / 1024:.0f} KB of {len(fake) / (1024 * 1024):.1f} MB")
+        assert status == 400
+        assert read <= 2 * CHUNK, read
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
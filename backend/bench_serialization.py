@@ -0,0 +1,141 @@
+import os
+import sys
+import json
+import time
+import random
+import statistics
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+from models.email import EmailHistoryResponse, EmailHistoryItem
+from models.internship import InternshipSearchResponse, InternshipListing
+from responses import ORJSONResponse
+
+# Benchmark for response serialization of the largest responses: a 100-row /email/history
+# and a 50-result /internships/search. Compares FastAPI's default path (jsonable_encoder +
+# json.dumps), response-model paths, and rows sent as-is through ORJSONResponse (what those
+# routes do). Makes no API calls: python bench_serialization.py
+
+ROUNDS = 200
+
+WORDS = "build ship services python react postgres mentors reviews ownership curiosity customers scale".split()
+
+
+def make_internship(rng: random.Random, i: int) -> dict:
+    return {
+        "id": f"7c9e6679-7425-40de-944b-{i:012d}",
+        "title": rng.choice(["Software Engineer Intern", "Data Science Intern", "Backend Intern"]),
+        "company": rng.choice(["Razorpay", "Zepto", "Freshworks", "Postman"]),
+        "link": f"https://www.linkedin.com/jobs/view/{rng.getrandbits(40)}",
+        "description": " ".join(rng.choice(WORDS) for _ in range(400)),
+        "location": "Bangalore, Karnataka, India",
+        "posted_at": None,
+        "created_at": "2025-01-15T10:30:00.123456",
+        "contact_email": None,
+        "contact_phone": None,
+        "contact_website": "https://razorpay.com/careers",
+        "fingerprint": f"{rng.getrandbits(64):016x}",
+    }
+
+
+def make_history(count: int = 100) -> dict:
+    rng = random.Random(1)
+    emails = [{
+        "id": f"e1a2b3c4-0000-4000-8000-{i:012d}",
+        "user_id": "0b6f5e1c-2a6d-4a5b-9c1e-3f2d1e0c9b8a",
+        "internship_id": f"7c9e6679-7425-40de-944b-{i:012d}",
+        "subject": "Application for Software Engineer Intern at Razorpay",
+        "body": "Dear Hiring Manager,\n\n" + " ".join(rng.choice(WORDS) for _ in range(180)),
+        "recipient_email": "careers@razorpay.com",
+        "status": "sent",
+        "sent_at": "2025-01-15T10:30:00.123456",
+        "internships": make_internship(rng, i),
+    } for i in range(count)]
+    return {"success": True, "emails": emails, "count": len(emails)}
+
+
+def make_search(count: int = 50) -> dict:
+    rng = random.Random(2)
+    internships = [{
+        **make_internship(rng, i),
+        "already_applied": i % 7 == 0,
+        "last_sent_at": "2025-01-10T09:00:00" if i % 7 == 0 else None,
+        "match_score": round(rng.random(), 3),
+    } for i in range(count)]
+    return {"success": True, "internships": internships, "count": len(internships), "source": "mixed"}
+
+
+def construct_history(content: dict) -> EmailHistoryResponse:
+    return EmailHistoryResponse.model_construct(
+        success=True,
+        count=content["count"],
+        emails=[
+            EmailHistoryItem.model_construct(**{**row, "internships": InternshipListing.model_construct(**row["internships"])})
+            for row in content["emails"]
+        ]
+    )
+
+
+def construct_search(content: dict) -> InternshipSearchResponse:
+    return InternshipSearchResponse.model_construct(
+        success=True,
+        count=content["count"],
+        source=content["source"],
+        internships=[InternshipListing.model_construct(**row) for row in content["internships"]]
+    )
+
+
+def contains(outer, inner) -> bool:
+    """Whether `outer` has everything in `inner` (dicts may have extra keys)"""
+    if isinstance(inner, dict):
+        return isinstance(outer, dict) and all(key in outer and contains(outer[key], value) for key, value in inner.items())
+    if isinstance(inner, list):
+        return isinstance(outer, list) and len(outer) == len(inner) and all(map(contains, outer, inner))
+    return outer == inner
+
+
+def timed(render) -> float:
+    """Median milliseconds per response"""
+    samples = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        render()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def run(name: str, content: dict, model, construct) -> None:
+    adapter = TypeAdapter(model)
+    paths = [
+        ("jsonable_encoder + json (before)", lambda: JSONResponse(jsonable_encoder(content)).body),
+        ("jsonable_encoder + orjson", lambda: ORJSONResponse(jsonable_encoder(content)).body),
+        ("response model, validated", lambda: adapter.dump_json(adapter.validate_python(content))),
+        ("response model, model_construct", lambda: adapter.dump_json(adapter.validate_python(construct(content)))),
+        ("rows as-is, orjson (routes)", lambda: ORJSONResponse(content).body),
+    ]
+
+    # orjson produces the same document; response models add their unset fields as null
+    expected = json.loads(JSONResponse(jsonable_encoder(content)).body)
+    assert json.loads(ORJSONResponse(content).body) == expected
+    assert contains(json.loads(adapter.dump_json(adapter.validate_python(content))), expected)
+
+    size_kb = len(ORJSONResponse(content).body) / 1024
+    print(f"{name} ({size_kb:.0f} KB)")
+    baseline = None
+    for label, render in paths:
+        ms = timed(render)
+        baseline = baseline or ms
+        print(f"  {label:<36}{ms:>8.2f} ms{baseline / ms:>8.1f}x")
+    print()
+
+
+def main():
+    run("GET /email/history, 100 rows", make_history(), EmailHistoryResponse, construct_history)
+    run("GET /internships/search, 50 results", make_search(), InternshipSearchResponse, construct_search)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import os
+import sys
+import json
+import time
+import random
+import statistics
+import tracemalloc
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.scraper_service import scraper_service
+
+# Benchmark for decoding SerpAPI google_jobs responses: the previous response.json() + dict
+# parsing against the typed msgspec decode into InternshipRecords. Pass recorded responses
+# as arguments (python bench_serpapi_decode.py page1.json page2.json); without arguments,
+# pages shaped like SerpAPI's are generated. Needs the backend .env like the other scripts.
+
+JOBS_PER_PAGE = 100
+ROUNDS = 50
+
+COMPANIES = ["Zepto", "Razorpay Software Pvt Ltd", "Freshworks", "Swiggy", "CRED", "Postman", "Zerodha"]
+TITLES = ["Software Engineer Intern", "Data Science Intern", "Product Design Intern", "Backend Intern"]
+CITIES = ["Bengaluru, Karnataka, India", "Mumbai, Maharashtra, India", "Pune, Maharashtra, India", "Anywhere"]
+WORDS = (
+    "build ship services python react postgres kafka mentors weekly reviews ownership curiosity "
+    "stipend ₹25,000 per month apply hiring team product customers scale latency reliability"
+).split()
+
+
+def make_page(seed: int) -> bytes:
+    """A google_jobs response with the fields SerpAPI returns, most of which the scraper ignores"""
+    rng = random.Random(seed)
+    jobs = []
+    for i in range(JOBS_PER_PAGE):
+        company = rng.choice(COMPANIES)
+        description = " ".join(rng.choice(WORDS) for _ in range(rng.randint(250, 600)))
+        jobs.append({
+            "title": rng.choice(TITLES),
+            "company_name": company,
+            "location": rng.choice(CITIES),
+            "via": "LinkedIn",
+            "share_link": f"https://www.google.com/search?ibp=htl;jobs&q={i}#htidocid={rng.getrandbits(64):x}",
+            "share_url": f"https://www.linkedin.com/jobs/view/{rng.getrandbits(40)}",
+            "thumbnail": "https://encrypted-tbn0.gstatic.com/images?q=tbn:" + "A" * 120,
+            "extensions": ["3 days ago", "Internship", "Health insurance"],
+            "detected_extensions": {"posted_at": "3 days ago", "schedule_type": "Internship", "health_insurance": True},
+            "description": description,
+            "job_highlights": [
+                {"title": "Qualifications", "items": [" ".join(rng.sample(WORDS, 12)) for _ in range(5)]},
+                {"title": "Responsibilities", "items": [" ".join(rng.sample(WORDS, 12)) for _ in range(6)]},
+            ],
+            "related_links": [
+                {"link": f"https://{company.split()[0].lower()}.com/careers", "text": "See web results"},
+            ],
+            "apply_options": [
+                {"title": site, "link": f"https://{site.lower()}.com/jobs/{rng.getrandbits(32)}"}
+                for site in ("LinkedIn", "Indeed", "Glassdoor", "Naukri")
+            ],
+            "job_id": "eyJqb2JfdGl0bGUiOi" + "x" * 300,
+        })
+    page = {
+        "search_metadata": {"id": f"{seed:x}", "status": "Success", "total_time_taken": 1.2},
+        "search_parameters": {"engine": "google_jobs", "q": "software engineer internship in India", "gl": "in"},
+        "jobs_results": jobs,
+    }
+    return json.dumps(page).encode("utf-8")
+
+
+def legacy_parse(content: bytes) -> list:
+    """The previous parsing: the whole response as dicts, then a new dict per job"""
+    data = json.loads(content)
+    internships = []
+    if "jobs_results" not in data:
+        return internships
+    for job in data["jobs_results"]:
+        contact_info = legacy_contact_info(job)
+        internships.append({
+            "title": job.get("title", ""),
+            "company": job.get("company_name", ""),
+            "location": job.get("location", ""),
+            "description": job.get("description", ""),
+            "link": job.get("share_url") or job.get("apply_link", ""),
+            "posted_at": job.get("detected_extensions", {}).get("posted_at"),
+            "job_type": ", ".join(job.get("detected_extensions", {}).get("schedule_type", [])),
+            "salary": job.get("detected_extensions", {}).get("salary"),
+            "contact_email": contact_info.get("email"),
+            "contact_phone": contact_info.get("phone"),
+            "contact_website": contact_info.get("website"),
+        })
+    return internships
+
+
+def legacy_contact_info(job: dict) -> dict:
+    import re
+    full_text = f"{job.get('description', '')} {job.get('title', '')} {job.get('company_name', '')}"
+    emails = re.findall(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', full_text)
+    phones = re.findall(r'(?:\+91|91)?[\s-]?(?:\d{5}[\s-]?\d{5}|\d{10}|\d{3}[\s-]?\d{3}[\s-]?\d{4})', full_text)
+    website = None
+    for link in job.get("related_links", []):
+        if isinstance(link, dict) and "careers" in link.get("link", ""):
+            website = link["link"]
+            break
+    return {"email": emails[0] if emails else None, "phone": phones[0].strip() if phones else None, "website": website}
+
+
+def timed(parse, pages: list) -> float:
+    """Median milliseconds to parse one page"""
+    samples = []
+    for _ in range(ROUNDS):
+        for page in pages:
+            start = time.perf_counter()
+            parse(page)
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def peak_and_retained(parse, page: bytes) -> tuple:
+    """Peak KB while parsing a page, and KB still held by the parsed listings"""
+    tracemalloc.start()
+    result = parse(page)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak / 1024, retained / 1024
+
+
+def main():
+    if len(sys.argv) > 1:
+        pages = [open(path, "rb").read() for path in sys.argv[1:]]
+        source = f"{len(pages)} recorded responses"
+    else:
+        pages = [make_page(seed) for seed in range(5)]
+        source = f"{len(pages)} generated responses of {JOBS_PER_PAGE} jobs"
+
+    new_parse = scraper_service._parse_internship_results
+    assert len(new_parse(pages[0])) == len(legacy_parse(pages[0]))
+
+    size_kb = statistics.mean(len(page) for page in pages) / 1024
+    print(f"{source}, {size_kb:.0f} KB each on average\n")
+
+    header = f"{'':<28}{'median ms/page':>16}{'peak KB':>12}{'retained KB':>14}"
+    print(header)
+    print("-" * len(header))
+
+    for name, parse in (("json + dicts (previous)", legacy_parse), ("msgspec + records", new_parse)):
+        ms = timed(parse, pages)
+        peak, retained = peak_and_retained(parse, pages[0])
+        print(f"{name:<28}{ms:>16.2f}{peak:>12.0f}{retained:>14.0f}")
+
+
+if __name__ == "__main__":
+    main()
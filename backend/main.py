@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse
 import os
 from dotenv import load_dotenv
 
@@ -12,6 +13,15 @@ from routes import (
     llm_router,
     email_router
 )
+from services.metrics import metrics
+from services.prefetch_service import prefetch_service
+from services.usage_service import usage_service
+from services.speculative_service import speculative_service
+from services.circuit_breaker import circuit_breakers
+from services.readiness_service import readiness_service
+from middleware import BodySizeLimitMiddleware, FileSignatureMiddleware
+from responses import ORJSONResponse
+from routes.resume import MAX_RESUME_BYTES, MULTIPART_OVERHEAD_BYTES, PDF_MAGIC, PDF_HEADER_WINDOW
 
 # Load environment variables
 load_dotenv()
@@ -22,7 +32,8 @@ app = FastAPI(
     description="Backend API for Internify - AI-Powered Internship Application Platform",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
 )
 
 # Configure CORS
@@ -48,6 +59,36 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Cap upload sizes while the body streams in
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={"/resume/upload": MAX_RESUME_BYTES + MULTIPART_OVERHEAD_BYTES},
+)
+
+# Refuse non-PDF resumes from their first bytes, before the rest is received
+app.add_middleware(
+    FileSignatureMiddleware,
+    signatures={"/resume/upload": (PDF_MAGIC, PDF_HEADER_WINDOW, "The file is not a valid PDF")},
+    header_limit=MULTIPART_OVERHEAD_BYTES,
+)
+
+# Compress larger responses (brotli when brotli-asgi is installed and the client accepts it, else gzip)
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+try:
+    from brotli_asgi import BrotliMiddleware
+    app.add_middleware(
+        BrotliMiddleware,
+        quality=int(os.getenv("BROTLI_QUALITY", "4")),
+        minimum_size=COMPRESSION_MIN_BYTES,
+        gzip_fallback=True
+    )
+except ImportError:
+    app.add_middleware(
+        GZipMiddleware,
+        minimum_size=COMPRESSION_MIN_BYTES,
+        compresslevel=int(os.getenv("GZIP_LEVEL", "6"))
+    )
+
 # Include routers
 app.include_router(auth_router)
 app.include_router(resume_router)
@@ -72,18 +113,52 @@ async def root():
 # Health check endpoint
 @app.get("/health")
 async def health_check():
-    """Health check endpoint for monitoring"""
+    """Health check endpoint for monitoring, with circuit breaker state per dependency"""
+    dependencies = circuit_breakers.snapshot()
+    degraded = any(breaker["state"] != "closed" for breaker in dependencies.values())
+    
     return {
-        "status": "healthy",
-        "service": "Internify API"
+        "status": "degraded" if degraded else "healthy",
+        "service": "Internify API",
+        "dependencies": dependencies
     }
 
 
+# Readiness endpoint
+@app.get("/ready")
+async def readiness_check():
+    """
+    Readiness check for load balancers: probes Supabase, SerpAPI, the LLM provider and Resend
+    
+    Probes run concurrently with a timeout and their results are cached briefly.
+    Returns 503 when a required dependency (READY_REQUIRED) is down.
+    """
+    result = await readiness_service.check()
+    
+    return ORJSONResponse(
+        status_code=200 if result["ready"] else 503,
+        content={
+            "status": "ready" if result["ready"] else "not_ready",
+            **result
+        }
+    )
+
+
+# Metrics endpoint
+@app.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus-format metrics (rate limit bucket levels, rejections, ...)"""
+    return PlainTextResponse(
+        metrics.render(),
+        media_type="text/plain; version=0.0.4"
+    )
+
+
 # Error handler
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     """Global exception handler"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "success": False,
@@ -100,6 +175,11 @@ async def startup_event():
     print("🚀 Internify API is starting up...")
     print(f"📝 Documentation available at: /docs")
     print(f"🔧 Environment: {os.getenv('ENVIRONMENT', 'development')}")
+    
+    # Keep popular searches warm in the background
+    prefetch_service.start()
+    usage_service.start()
+    speculative_service.start()
 
 
 # Shutdown event
@@ -107,6 +187,9 @@ async def startup_event():
 async def shutdown_event():
     """Run on application shutdown"""
     print("👋 Internify API is shutting down...")
+    await prefetch_service.stop()
+    await speculative_service.stop()
+    await usage_service.stop()
 
 
 if __name__ == "__main__":
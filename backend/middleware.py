@@ -0,0 +1,140 @@
+import re
+from typing import Dict, Optional, Tuple
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class BodySizeLimitMiddleware:
+    """
+    Rejects request bodies over a per-path byte limit with 413
+
+    The declared Content-Length is checked before anything is read, and the
+    bytes actually received are counted chunk by chunk, so an oversized body
+    is cut off while it streams in rather than after it has been spooled.
+    """
+
+    def __init__(self, app: ASGIApp, limits: Dict[str, int]):
+        """
+        Args:
+            app: The wrapped ASGI app
+            limits: Path -> maximum body size in bytes
+        """
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit = self.limits.get(scope.get("path", "")) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        declared = self._content_length(scope)
+        if declared is not None and declared > limit:
+            await self._reject(scope, receive, send, limit)
+            return
+
+        received = 0
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside body parsing; FastAPI re-raises HTTPExceptions as-is
+                    raise HTTPException(status_code=413, detail=self._detail(limit))
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+    @staticmethod
+    def _content_length(scope: Scope) -> Optional[int]:
+        for name, value in scope.get("headers", []):
+            if name == b"content-length":
+                try:
+                    return int(value)
+                except ValueError:
+                    return None
+        return None
+
+    @staticmethod
+    def _detail(limit: int) -> str:
+        return f"Request body too large (limit {limit // (1024 * 1024)} MB)."
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send, limit: int) -> None:
+        response = JSONResponse({"detail": self._detail(limit)}, status_code=413, headers={"Connection": "close"})
+        await response(scope, receive, send)
+
+
+# End of the headers of a multipart part carrying a file
+_FILE_PART_HEADERS = re.compile(
+    rb"content-disposition:[^\r\n]*filename=[^\r\n]*\r\n(?:[^\r\n]+\r\n)*\r\n",
+    re.IGNORECASE
+)
+
+
+class FileSignatureMiddleware:
+    """
+    Rejects multipart uploads whose file doesn't start with the expected magic bytes
+
+    The body is scanned as it streams in: once the first file part's headers
+    and the first `window` bytes of its content have arrived, an upload
+    without the signature is refused with 400, before the rest is received
+    and spooled.
+    """
+
+    def __init__(self, app: ASGIApp, signatures: Dict[str, Tuple[bytes, int, str]], header_limit: int = 64 * 1024):
+        """
+        Args:
+            app: The wrapped ASGI app
+            signatures: Path -> (magic bytes, window they must appear in, error detail)
+            header_limit: Bytes scanned for the file part's headers before giving up
+        """
+        self.app = app
+        self.signatures = signatures
+        self.header_limit = header_limit
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        signature = self.signatures.get(scope.get("path", "")) if scope["type"] == "http" else None
+        if signature is None or not self._is_multipart(scope):
+            await self.app(scope, receive, send)
+            return
+
+        magic, window, detail = signature
+        head = bytearray()
+        checked = False
+
+        async def checking_receive() -> Message:
+            nonlocal checked
+            message = await receive()
+            if checked or message["type"] != "http.request":
+                return message
+
+            head.extend(message.get("body", b""))
+            more_body = message.get("more_body", False)
+
+            match = _FILE_PART_HEADERS.search(head)
+            if match is None:
+                # No file part yet; past the limit, leave it to the handler
+                checked = not more_body or len(head) > self.header_limit
+                return message
+
+            content = head[match.end():match.end() + window]
+            if len(content) < window and more_body:
+                return message
+
+            checked = True
+            if magic not in content:
+                # Raised inside body parsing, like BodySizeLimitMiddleware
+                raise HTTPException(status_code=400, detail=detail)
+            return message
+
+        await self.app(scope, checking_receive, send)
+
+    @staticmethod
+    def _is_multipart(scope: Scope) -> bool:
+        for name, value in scope.get("headers", []):
+            if name == b"content-type":
+                return value.lower().startswith(b"multipart/form-data")
+        return False
@@ -1,25 +1,41 @@
 # Backend Models Package
-from .user import UserBase, UserCreate, UserResponse, UserAuth
-from .internship import InternshipBase, InternshipCreate, InternshipResponse, InternshipSearchQuery
-from .email import EmailBase, EmailCreate, EmailResponse, EmailGenerateRequest, EmailSendRequest
-from .resume import ResumeBase, ResumeCreate, ResumeResponse, ResumeUploadResponse
+from .user import UserBase, UserCreate, UserResponse, UserAuth, UserProfile, UserProfileResponse
+from .internship import (
+    InternshipBase, InternshipCreate, InternshipResponse, InternshipSearchQuery,
+    InternshipListing, InternshipSearchResponse, InternshipFeedResponse, InternshipRecord
+)
+from .email import (
+    EmailBase, EmailCreate, EmailResponse, EmailGenerateRequest, EmailSendRequest,
+    EmailHistoryItem, EmailHistoryResponse
+)
+from .resume import ResumeBase, ResumeCreate, ResumeResponse, ResumeUploadResponse, LatestResume, LatestResumeResponse
 
 __all__ = [
     "UserBase",
     "UserCreate",
     "UserResponse",
     "UserAuth",
+    "UserProfile",
+    "UserProfileResponse",
     "InternshipBase",
     "InternshipCreate",
     "InternshipResponse",
     "InternshipSearchQuery",
+    "InternshipListing",
+    "InternshipSearchResponse",
+    "InternshipFeedResponse",
+    "InternshipRecord",
     "EmailBase",
     "EmailCreate",
     "EmailResponse",
     "EmailGenerateRequest",
     "EmailSendRequest",
+    "EmailHistoryItem",
+    "EmailHistoryResponse",
     "ResumeBase",
     "ResumeCreate",
     "ResumeResponse",
     "ResumeUploadResponse",
+    "LatestResume",
+    "LatestResumeResponse",
 ]
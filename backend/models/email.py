@@ -1,6 +1,7 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, ConfigDict, EmailStr
+from typing import List, Optional
 from datetime import datetime
+from models.internship import InternshipListing
 
 
 class EmailBase(BaseModel):
@@ -27,9 +28,14 @@ class EmailResponse(EmailBase):
 
 class EmailGenerateRequest(BaseModel):
     internship_description: str
-    resume_text: str
     internship_title: str
     company_name: str
+    # Reference one of the user's resumes by id (preferred), or send the text itself.
+    # With neither, the latest resume is used.
+    resume_id: Optional[str] = None
+    resume_text: Optional[str] = None
+    # Stored listing the email is for; lets a speculatively pre-generated email be served
+    internship_id: Optional[str] = None
 
 
 class EmailSendRequest(BaseModel):
@@ -37,3 +43,27 @@ class EmailSendRequest(BaseModel):
     recipient_email: EmailStr
     subject: str
     body: str
+    # Send even if the user already emailed this internship
+    force: bool = False
+
+
+class EmailHistoryItem(BaseModel):
+    """A sent email as stored, with the internship it was sent for"""
+    model_config = ConfigDict(extra="allow")
+
+    id: str
+    user_id: str
+    internship_id: Optional[str] = None
+    subject: str
+    body: str
+    recipient_email: str
+    status: str = "sent"
+    # ISO timestamp as stored
+    sent_at: Optional[str] = None
+    internships: Optional[InternshipListing] = None
+
+
+class EmailHistoryResponse(BaseModel):
+    success: bool = True
+    emails: List[EmailHistoryItem]
+    count: int
@@ -1,5 +1,6 @@
-from pydantic import BaseModel, HttpUrl
-from typing import Optional
+import msgspec
+from pydantic import BaseModel, ConfigDict, HttpUrl
+from typing import Any, ClassVar, Dict, List, Optional, Union
 from datetime import datetime
 
 
@@ -31,3 +32,113 @@ class InternshipSearchQuery(BaseModel):
     role: str
     location: Optional[str] = None
     limit: int = 10
+
+
+
+class InternshipListing(BaseModel):
+    """A listing in search and feed responses (stored row plus per-user annotations)"""
+    model_config = ConfigDict(extra="allow")
+
+    id: Optional[str] = None
+    title: str
+    company: str
+    link: Optional[str] = None
+    description: Optional[str] = None
+    location: Optional[str] = None
+    # ISO timestamps as stored
+    posted_at: Optional[str] = None
+    created_at: Optional[str] = None
+    contact_email: Optional[str] = None
+    contact_phone: Optional[str] = None
+    contact_website: Optional[str] = None
+    fingerprint: Optional[str] = None
+    # Full-text rank (local search only)
+    rank: Optional[float] = None
+    already_applied: Optional[bool] = None
+    last_sent_at: Optional[str] = None
+    match_score: Optional[float] = None
+
+
+class InternshipSearchResponse(BaseModel):
+    success: bool = True
+    internships: List[InternshipListing]
+    count: int = 0
+    # "local", "serpapi" or "mixed"
+    source: Optional[str] = None
+    message: Optional[str] = None
+
+
+class InternshipFeedResponse(BaseModel):
+    success: bool = True
+    internships: List[InternshipListing]
+    count: int
+    has_more: bool
+    since: str
+
+# SerpAPI google_jobs responses, decoded with msgspec. Only the fields the
+# scraper reads are declared; everything else in the payload is skipped
+# without being materialized.
+
+class SerpDetectedExtensions(msgspec.Struct, gc=False):
+    posted_at: Optional[str] = None
+    # A string in current responses, a list in older ones
+    schedule_type: Union[str, List[str], None] = None
+    salary: Optional[str] = None
+
+
+class SerpRelatedLink(msgspec.Struct, gc=False):
+    link: Optional[str] = None
+
+
+class SerpJob(msgspec.Struct):
+    title: Optional[str] = None
+    company_name: Optional[str] = None
+    location: Optional[str] = None
+    description: Optional[str] = None
+    share_url: Optional[str] = None
+    apply_link: Optional[str] = None
+    detected_extensions: Optional[SerpDetectedExtensions] = None
+    related_links: List[SerpRelatedLink] = []
+
+
+class SerpJobsPage(msgspec.Struct):
+    # Jobs are decoded one by one, so a malformed job doesn't fail the whole page
+    jobs_results: List[msgspec.Raw] = []
+
+
+class InternshipRecord(msgspec.Struct, gc=False):
+    """
+    A scraped listing, from SerpAPI through de-duplication to the database
+
+    Slotted and untracked by the garbage collector (it only holds strings),
+    so a page of listings is far smaller than the equivalent dicts.
+    """
+    title: str = ""
+    company: str = ""
+    location: str = ""
+    description: str = ""
+    link: str = ""
+    posted_at: Optional[str] = None
+    job_type: str = ""
+    salary: Optional[str] = None
+    contact_email: Optional[str] = None
+    contact_phone: Optional[str] = None
+    contact_website: Optional[str] = None
+    fingerprint: Optional[str] = None
+
+    # Columns of the internships table
+    DB_COLUMNS: ClassVar[tuple] = (
+        "title", "company", "link", "description", "location",
+        "contact_email", "contact_phone", "contact_website", "fingerprint",
+    )
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style read, so records and stored rows can be handled alike"""
+        return getattr(self, key, default)
+
+    def to_row(self) -> Dict[str, Any]:
+        """Insert/upsert payload for the internships table"""
+        return {column: getattr(self, column) for column in self.DB_COLUMNS}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return msgspec.structs.asdict(self)
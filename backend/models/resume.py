@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
 
@@ -26,3 +26,20 @@ class ResumeUploadResponse(BaseModel):
     file_path: str
     extracted_text: str
     uploaded_at: datetime
+
+
+class LatestResume(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    id: str
+    user_id: Optional[str] = None
+    file_path: str
+    # Omitted with include_text=false
+    extracted_text: Optional[str] = None
+    # ISO timestamp as stored
+    uploaded_at: Optional[str] = None
+
+
+class LatestResumeResponse(BaseModel):
+    success: bool = True
+    resume: LatestResume
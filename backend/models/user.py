@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, ConfigDict, EmailStr
 from typing import Optional
 from datetime import datetime
 
@@ -23,3 +23,19 @@ class UserResponse(UserBase):
 class UserAuth(BaseModel):
     user_id: str
     email: EmailStr
+
+
+class UserProfile(BaseModel):
+    """A user row as stored"""
+    model_config = ConfigDict(extra="allow")
+
+    id: str
+    email: str
+    name: Optional[str] = None
+    # ISO timestamp as stored
+    created_at: Optional[str] = None
+
+
+class UserProfileResponse(BaseModel):
+    success: bool = True
+    user: UserProfile
@@ -0,0 +1 @@
+# Local stand-ins for upstream APIs and the load driver (python -m perf.load)
@@ -0,0 +1,412 @@
+import os
+import sys
+import json
+import math
+import time
+import uuid
+import asyncio
+import argparse
+import platform
+import statistics
+import subprocess
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+import jwt
+import httpx
+
+from perf.stubs import UpstreamStubs, StubConfig, parse_behaviors, add_behavior_arguments, base_urls
+
+# Load driver for the main user flows against local upstream stand-ins (perf/stubs.py).
+# Starts the stubs and a backend (uvicorn) wired to them, drives each scenario at each
+# concurrency level for a fixed time, and writes throughput and p50/p95/p99 latency to a
+# JSON file that later runs can be compared against. From backend/:
+#
+#   python -m perf.load --out perf/results/baseline.json
+#   python -m perf.load --compare perf/results/baseline.json --max-regression 0.15
+#
+# See docs/guides/PERFORMANCE_TESTING.md.
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCENARIOS = ("upload", "search", "generate", "send")
+JWT_SECRET = "perf-test-secret-perf-test-secret"
+
+ROLES = [
+    "software engineer", "data science", "backend", "frontend", "machine learning", "product design",
+    "devops", "mobile", "embedded systems", "full stack", "analytics", "security",
+]
+
+RESUME_LINES = [
+    "PRIYA SHARMA",
+    "priya@example.com | github.com/priya",
+    "EDUCATION",
+    "B.E. Computer Science, RV College of Engineering, 2021-2025",
+    "PROJECTS",
+    "Internify - AI internship outreach platform",
+    "FastAPI backend, Supabase, Next.js frontend, Groq and Gemini",
+    "SmartSense - real-time sensor fusion for industrial monitoring",
+    "STM32 microcontrollers running FreeRTOS, TensorFlow Lite anomaly detection",
+    "SKILLS",
+    "Python, C++, Docker, Git, PostgreSQL, React",
+]
+
+
+def make_pdf(lines: List[str]) -> bytes:
+    """A one-page text PDF that PyPDF2 can extract"""
+    text = b" ".join(b"(%s) Tj T*" % line.encode("latin-1") for line in lines)
+    content = b"BT /F1 11 Tf 14 TL 72 740 Td " + text + b" ET"
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R "
+        b"/Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+
+    pdf = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(pdf))
+        pdf += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+
+    xref = len(pdf)
+    pdf += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        pdf += b"%010d 00000 n \n" % offset
+    pdf += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(pdf)
+
+
+class VirtualUser:
+    """One signed-in user; each concurrent worker acts as its own user"""
+
+    def __init__(self, index: int):
+        self.index = index
+        self.id = str(uuid.uuid4())
+        self.email = f"perf-user-{index}@example.com"
+        token = jwt.encode({"sub": self.id, "email": self.email, "role": "authenticated"}, JWT_SECRET, algorithm="HS256")
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.resume_id: Optional[str] = None
+        self.sequence = 0
+
+
+class Scenarios:
+    """One request of each scenario, for a virtual user"""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.pdf = make_pdf(RESUME_LINES)
+
+    async def upload(self, user: VirtualUser) -> httpx.Response:
+        response = await self.client.post(
+            "/resume/upload",
+            files={"file": ("resume.pdf", self.pdf, "application/pdf")},
+            headers=user.headers
+        )
+        if response.status_code == 200:
+            user.resume_id = response.json().get("id") or user.resume_id
+        return response
+
+    async def search(self, user: VirtualUser) -> httpx.Response:
+        # Cycle through roles and limits so the run mixes SerpAPI cache hits and misses
+        user.sequence += 1
+        role = ROLES[(user.index + user.sequence) % len(ROLES)]
+        return await self.client.get(
+            "/internships/search",
+            params={"role": role, "limit": 10 + user.sequence % 3},
+            headers=user.headers
+        )
+
+    async def generate(self, user: VirtualUser) -> httpx.Response:
+        user.sequence += 1
+        return await self.client.post(
+            "/llm/generate-email",
+            json={
+                "internship_description": "Build backend services in Python and FastAPI on Postgres. " * 15,
+                "internship_title": "Backend Engineering Intern",
+                # A new request each time: no cached alternates or speculative results
+                "company_name": f"Company {user.sequence}",
+                "resume_id": user.resume_id,
+            },
+            headers=user.headers
+        )
+
+    async def send(self, user: VirtualUser) -> httpx.Response:
+        return await self.client.post(
+            "/email/send",
+            json={
+                "internship_id": str(uuid.uuid4()),
+                "recipient_email": "careers@example.com",
+                "subject": "Built Internify, a FastAPI outreach platform",
+                "body": "I've been following your team's work.\n\nI'd be happy to walk through the project if helpful.",
+            },
+            headers=user.headers
+        )
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, math.ceil(fraction * len(ordered)) - 1))]
+
+
+def summarize(latencies: List[float], statuses: List[int], elapsed: float) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    errors = sum(1 for status in statuses if status >= 400 or status == 0)
+    return {
+        "requests": len(statuses),
+        "errors": errors,
+        "error_rate": round(errors / len(statuses), 4) if statuses else 0.0,
+        "throughput_rps": round(len(statuses) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(ordered), 2) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 0.50), 2),
+        "p95_ms": round(percentile(ordered, 0.95), 2),
+        "p99_ms": round(percentile(ordered, 0.99), 2),
+        "max_ms": round(ordered[-1], 2) if ordered else 0.0,
+    }
+
+
+async def run_level(
+    request: Callable[[VirtualUser], Any],
+    users: List[VirtualUser],
+    duration: float,
+    warmup: float
+) -> Dict[str, Any]:
+    """Run `request` in a closed loop, one worker per user, and summarize the measured window"""
+    latencies: List[float] = []
+    statuses: List[int] = []
+    started = time.perf_counter()
+    measure_from = started + warmup
+    stop_at = measure_from + duration
+
+    async def worker(user: VirtualUser):
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            try:
+                response = await request(user)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            end = time.perf_counter()
+            if start >= measure_from:
+                latencies.append((end - start) * 1000)
+                statuses.append(status)
+
+    await asyncio.gather(*(worker(user) for user in users))
+    return summarize(latencies, statuses, time.perf_counter() - measure_from)
+
+
+def backend_env(stub_root: str, provider: str) -> Dict[str, str]:
+    """Environment for a backend wired to the stubs (explicit values win over backend/.env)"""
+    env = {
+        **os.environ,
+        **base_urls(stub_root),
+        "SUPABASE_SERVICE_KEY": jwt.encode({"role": "service_role"}, JWT_SECRET, algorithm="HS256"),
+        "SUPABASE_ANON_KEY": "",
+        "SUPABASE_JWT_SECRET": JWT_SECRET,
+        "SERPAPI_KEY": "perf",
+        "RESEND_API_KEY": "re_perf",
+        "GROQ_API_KEY": "perf" if provider == "groq" else "",
+        "GEMINI_API_KEY": "perf" if provider == "gemini" else "",
+        "GEMINI_PREFIX_CACHE": "false",
+        "ENVIRONMENT": "perf",
+        # Measure the service, not its own throttling
+        "RATE_LIMIT_SEARCH": "off",
+        "RATE_LIMIT_GENERATE": "off",
+        "RATE_LIMIT_SEND": "off",
+        "RATE_LIMIT_SERPAPI": "off",
+        "RATE_LIMIT_LLM": "off",
+        "RATE_LIMIT_RESEND": "off",
+        "LLM_DAILY_TOKEN_BUDGET": "0",
+        "PREFETCH_ENABLED": "false",
+        "SPECULATIVE_ENABLED": "false",
+        "RATE_LIMIT_REDIS_URL": "",
+        "IDEMPOTENCY_REDIS_URL": "",
+    }
+    return env
+
+
+async def start_backend(port: int, env: Dict[str, str], log_path: str) -> subprocess.Popen:
+    log = open(log_path, "w")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=log,
+        stderr=subprocess.STDOUT
+    )
+
+    async with httpx.AsyncClient() as client:
+        for _ in range(150):
+            if process.poll() is not None:
+                raise RuntimeError(f"Backend exited with {process.returncode}, see {log_path}")
+            try:
+                if (await client.get(f"http://127.0.0.1:{port}/health")).status_code == 200:
+                    return process
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.2)
+
+    process.terminate()
+    raise RuntimeError(f"Backend didn't become healthy, see {log_path}")
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: Dict[str, Dict[str, Any]]) -> None:
+    header = f"{'scenario':<10}{'conc':>6}{'req':>8}{'err':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"
+    print(header)
+    print("-" * len(header))
+    for scenario, levels in results.items():
+        for concurrency, stats in levels.items():
+            print(f"{scenario:<10}{concurrency:>6}{stats['requests']:>8}{stats['errors']:>6}{stats['throughput_rps']:>9.1f}"
+                  f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}")
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> List[str]:
+    """Print deltas against a baseline file; returns the regressions beyond `max_regression`"""
+    regressions = []
+    print(f"\nCompared with {baseline['meta'].get('commit') or 'baseline'} ({baseline['meta'].get('created_at')})")
+    header = f"{'scenario':<10}{'conc':>6}{'rps':>16}{'p50 ms':>18}{'p95 ms':>18}{'p99 ms':>18}"
+    print(header)
+    print("-" * len(header))
+
+    def delta(new: float, old: float) -> str:
+        change = (new - old) / old * 100 if old else 0.0
+        return f"{new:.1f} ({change:+.0f}%)"
+
+    for scenario, levels in current["results"].items():
+        for concurrency, stats in levels.items():
+            old = baseline["results"].get(scenario, {}).get(concurrency)
+            if not old:
+                continue
+            print(f"{scenario:<10}{concurrency:>6}{delta(stats['throughput_rps'], old['throughput_rps']):>16}"
+                  f"{delta(stats['p50_ms'], old['p50_ms']):>18}{delta(stats['p95_ms'], old['p95_ms']):>18}"
+                  f"{delta(stats['p99_ms'], old['p99_ms']):>18}")
+
+            if old["p95_ms"] and stats["p95_ms"] > old["p95_ms"] * (1 + max_regression):
+                regressions.append(f"{scenario} x{concurrency}: p95 {old['p95_ms']:.1f} -> {stats['p95_ms']:.1f} ms")
+            if old["throughput_rps"] and stats["throughput_rps"] < old["throughput_rps"] * (1 - max_regression):
+                regressions.append(f"{scenario} x{concurrency}: {old['throughput_rps']:.1f} -> {stats['throughput_rps']:.1f} req/s")
+            if stats["error_rate"] > old["error_rate"] + max_regression:
+                regressions.append(f"{scenario} x{concurrency}: error rate {old['error_rate']:.1%} -> {stats['error_rate']:.1%}")
+
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> int:
+    scenarios = [name.strip() for name in args.scenarios.split(",")]
+    levels = [int(level) for level in args.concurrency.split(",")]
+    config = parse_behaviors(StubConfig(seed=args.seed), args.latency, args.errors)
+
+    stub_runner, stub_root = None, args.stubs_url
+    if not args.base_url:
+        stub_runner, stub_root = await UpstreamStubs(config).start()
+    backend = None
+    try:
+        base_url = args.base_url
+        if not base_url:
+            os.makedirs(os.path.dirname(os.path.abspath(args.backend_log)), exist_ok=True)
+            backend = await start_backend(args.port, backend_env(stub_root, args.provider), args.backend_log)
+            base_url = f"http://127.0.0.1:{args.port}"
+        print(f"[PERF] Backend {base_url}, upstream stubs {stub_root}")
+
+        limits = httpx.Limits(max_connections=max(levels) * 2, max_keepalive_connections=max(levels) * 2)
+        async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=args.timeout) as client:
+            runner = Scenarios(client)
+            users = [VirtualUser(index) for index in range(max(levels))]
+
+            if "generate" in scenarios:
+                # Generation reads the user's resume; upload one per user first
+                await asyncio.gather(*(runner.upload(user) for user in users))
+
+            results: Dict[str, Dict[str, Any]] = {}
+            for scenario in scenarios:
+                results[scenario] = {}
+                for level in levels:
+                    print(f"[PERF] {scenario} x{level} for {args.duration:g}s...")
+                    results[scenario][str(level)] = await run_level(
+                        getattr(runner, scenario), users[:level], args.duration, args.warmup
+                    )
+
+            upstream_stats = (await client.get(f"{stub_root}/_stats")).json()
+    finally:
+        if backend:
+            # The backend flushes to the stubs on shutdown, so keep serving them meanwhile
+            backend.terminate()
+            try:
+                await asyncio.wait_for(asyncio.to_thread(backend.wait), timeout=15)
+            except asyncio.TimeoutError:
+                backend.kill()
+        if stub_runner:
+            await stub_runner.cleanup()
+
+    report = {
+        "meta": {
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "provider": args.provider,
+            "duration_seconds": args.duration,
+            "warmup_seconds": args.warmup,
+            "upstreams": {name: vars(behavior) for name, behavior in config.behaviors.items()},
+            "upstream_requests": upstream_stats,
+        },
+        "results": results,
+    }
+
+    print()
+    print_results(results)
+
+    os.makedirs(os.path.dirname(os.path.abspath(args.out)), exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n[PERF] Wrote {args.out}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+        if regressions:
+            print(f"\n[PERF] Regressions beyond {args.max_regression:.0%}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"\n[PERF] No regressions beyond {args.max_regression:.0%}")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the backend against local upstream stand-ins")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Comma-separated: {', '.join(SCENARIOS)}")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels")
+    parser.add_argument("--duration", type=float, default=10, help="Measured seconds per scenario and level")
+    parser.add_argument("--warmup", type=float, default=2, help="Unmeasured seconds before each measurement")
+    parser.add_argument("--timeout", type=float, default=60, help="Client timeout per request, seconds")
+    parser.add_argument("--provider", choices=("groq", "gemini"), default="groq", help="LLM provider the backend uses")
+    parser.add_argument("--base-url", help="Drive an already running backend instead of starting one")
+    parser.add_argument("--stubs-url", default="http://127.0.0.1:8900",
+                        help="With --base-url: the stubs that backend points at (python -m perf.stubs)")
+    parser.add_argument("--port", type=int, default=8765, help="Port for the backend this run starts")
+    parser.add_argument("--backend-log", default=os.path.join(BACKEND_DIR, "perf", "results", "backend.log"))
+    parser.add_argument("--out", default=os.path.join(BACKEND_DIR, "perf", "results", "latest.json"), help="Where to write the results")
+    parser.add_argument("--compare", help="Baseline results file to compare against")
+    parser.add_argument("--max-regression", type=float, default=0.15,
+                        help="Fail (exit 1) when p95 grows or throughput drops by more than this fraction")
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
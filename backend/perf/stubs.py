@@ -0,0 +1,491 @@
+import json
+import time
+import uuid
+import random
+import asyncio
+import argparse
+import hashlib
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+# Local stand-ins for the backend's upstreams: Supabase (PostgREST and Storage), SerpAPI,
+# Groq, Gemini and Resend, served by one aiohttp app under a path prefix each. Every
+# upstream has its own latency and error injection, so load tests are reproducible and
+# make no paid API calls. Run standalone against a backend started by hand:
+#
+#   python -m perf.stubs --port 8900 --latency groq=900:300 --errors serpapi=0.05:429
+#
+# and point the backend at it (see base_urls()). perf/load.py starts it in-process.
+
+UPSTREAMS = ("supabase", "serpapi", "groq", "gemini", "resend")
+
+# Typical latencies seen in production, in milliseconds (base, jitter)
+DEFAULT_LATENCY = {
+    "supabase": (15, 10),
+    "serpapi": (1200, 400),
+    "groq": (900, 300),
+    "gemini": (1500, 500),
+    "resend": (150, 50),
+}
+
+EMAIL_BODY = """I've been following your team's work on developer platforms and the way you ship reliable infrastructure to millions of users.
+
+I'm a computer science student who builds backend systems end to end.
+
+One project I've spent significant time on is Internify, an AI internship outreach platform. While building it, I worked extensively with FastAPI, Supabase and Next.js, designing a search pipeline that deduplicates listings from several sources and a generation service that ranks several drafts before returning one. Keeping p95 latency low under bursty traffic taught me a lot about caching, timeouts and graceful degradation.
+
+That experience maps closely to the services your team runs, where correctness under load matters as much as features.
+
+I'd be happy to walk through the project if helpful.
+
+I've attached my resume below for more details on the project and related work."""
+
+WORDS = (
+    "build ship services python react postgres kafka mentors weekly reviews ownership curiosity "
+    "stipend apply hiring team product customers scale latency reliability fastapi docker"
+).split()
+COMPANIES = ["Zepto", "Razorpay", "Freshworks", "Swiggy", "CRED", "Postman", "Zerodha", "Meesho"]
+CITIES = ["Bengaluru, Karnataka, India", "Mumbai, Maharashtra, India", "Pune, Maharashtra, India", "Anywhere"]
+
+
+@dataclass
+class UpstreamBehavior:
+    """Latency and failures injected into one upstream's responses"""
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 500
+
+
+@dataclass
+class StubConfig:
+    behaviors: Dict[str, UpstreamBehavior] = field(default_factory=lambda: {
+        name: UpstreamBehavior(*DEFAULT_LATENCY[name]) for name in UPSTREAMS
+    })
+    seed: int = 1
+
+
+def parse_behaviors(config: StubConfig, latencies: List[str], errors: List[str]) -> StubConfig:
+    """Apply "name=ms[:jitter]" latency and "name=rate[:status]" error options"""
+    for option in latencies:
+        name, _, value = option.partition("=")
+        base, _, jitter = value.partition(":")
+        behavior = config.behaviors[name]
+        behavior.latency_ms = float(base)
+        behavior.jitter_ms = float(jitter or 0)
+    for option in errors:
+        name, _, value = option.partition("=")
+        rate, _, status = value.partition(":")
+        behavior = config.behaviors[name]
+        behavior.error_rate = float(rate)
+        behavior.error_status = int(status or 500)
+    return config
+
+
+def base_urls(root: str) -> Dict[str, str]:
+    """Backend environment pointing every upstream at stubs served from `root`"""
+    return {
+        "SUPABASE_URL": f"{root}/supabase",
+        "SERPAPI_BASE_URL": f"{root}/serpapi/search",
+        "GROQ_BASE_URL": f"{root}/groq",
+        "GEMINI_BASE_URL": f"{root}/gemini",
+        "RESEND_API_URL": f"{root}/resend",
+    }
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Table:
+    """In-memory PostgREST table with the filters the backend uses"""
+
+    # Timestamp columns the schema fills by default (docs/database/database_schema.sql)
+    DEFAULTS = {"resumes": ("uploaded_at",), "emails": ("sent_at",)}
+
+    def __init__(self, name: str):
+        self.defaults = self.DEFAULTS.get(name, ("created_at",))
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        # Unique indexes for upserts, by conflict columns
+        self.unique: Dict[Tuple[str, ...], Dict[tuple, str]] = {}
+
+    def insert(self, row: Dict[str, Any], on_conflict: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+        if on_conflict:
+            index = self.unique.setdefault(on_conflict, {
+                tuple(existing.get(column) for column in on_conflict): row_id
+                for row_id, existing in self.rows.items()
+            })
+            key = tuple(row.get(column) for column in on_conflict)
+            existing_id = index.get(key)
+            if existing_id is not None:
+                self.rows[existing_id].update(row)
+                return self.rows[existing_id]
+
+        stored = {"id": str(uuid.uuid4()), **{column: _now() for column in self.defaults}, **row}
+        self.rows[stored["id"]] = stored
+        for columns, index in self.unique.items():
+            index[tuple(stored.get(column) for column in columns)] = stored["id"]
+        return stored
+
+    def select(self, filters: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        if len(filters) == 1 and filters[0][:2] == ("id", "eq"):
+            row = self.rows.get(filters[0][2])
+            return [row] if row else []
+        return [row for row in self.rows.values() if all(_matches(row, *condition) for condition in filters)]
+
+    def delete(self, filters: List[Tuple[str, str, str]]) -> List[Dict[str, Any]]:
+        removed = self.select(filters)
+        for row in removed:
+            self.rows.pop(row["id"], None)
+        self.unique.clear()
+        return removed
+
+
+def _matches(row: Dict[str, Any], column: str, operator: str, value: str) -> bool:
+    actual = row.get(column)
+    if operator == "is":
+        return actual is None if value == "null" else str(actual).lower() == value
+    if actual is None:
+        return False
+    if operator == "in":
+        return str(actual) in value.strip("()").split(",")
+    actual = str(actual)
+    return {
+        "eq": actual == value,
+        "neq": actual != value,
+        "gt": actual > value,
+        "gte": actual >= value,
+        "lt": actual < value,
+        "lte": actual <= value,
+    }.get(operator, True)
+
+
+def _error_body(upstream: str, status: int) -> Dict[str, Any]:
+    """An error in the shape each provider's client parses"""
+    message = f"injected {upstream} failure"
+    if upstream == "supabase":
+        return {"code": str(status), "message": message, "details": None, "hint": None}
+    if upstream == "serpapi":
+        return {"error": message}
+    if upstream == "groq":
+        return {"error": {"message": message, "type": "rate_limit_exceeded" if status == 429 else "internal_server_error"}}
+    if upstream == "gemini":
+        return {"error": {"code": status, "message": message, "status": "RESOURCE_EXHAUSTED" if status == 429 else "INTERNAL"}}
+    return {"statusCode": status, "message": message, "name": "rate_limit_exceeded" if status == 429 else "application_error"}
+
+
+class UpstreamStubs:
+    """aiohttp app serving every upstream stand-in"""
+
+    def __init__(self, config: Optional[StubConfig] = None):
+        self.config = config or StubConfig()
+        self.rng = random.Random(self.config.seed)
+        self.tables: Dict[str, Table] = {}
+        self.requests: Dict[str, int] = {name: 0 for name in UPSTREAMS}
+        self.failures: Dict[str, int] = {name: 0 for name in UPSTREAMS}
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.add_routes([
+            web.post("/supabase/rest/v1/rpc/{function}", self.postgrest_rpc),
+            web.route("*", "/supabase/rest/v1/{table}", self.postgrest),
+            web.route("*", "/supabase/storage/v1/object/{bucket}", self.storage),
+            web.route("*", "/supabase/storage/v1/object/{bucket}/{path:.*}", self.storage),
+            web.get("/serpapi/search", self.serpapi_search),
+            web.get("/serpapi/account.json", self.serpapi_account),
+            web.post("/groq/openai/v1/chat/completions", self.groq_completion),
+            web.get("/groq/openai/v1/models/{model}", self.groq_model),
+            web.post("/gemini/{version}/models/{model}", self.gemini_generate),
+            web.get("/gemini/{version}/models/{model}", self.gemini_model),
+            web.post("/gemini/{version}/cachedContents", self.gemini_cache),
+            web.route("*", "/gemini/{version}/cachedContents/{name}", self.gemini_cache),
+            web.post("/resend/emails", self.resend_send),
+            web.post("/resend/emails/batch", self.resend_batch),
+            web.get("/resend/domains", self.resend_domains),
+            web.get("/_stats", self.stats),
+        ])
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> Tuple[web.AppRunner, str]:
+        """Serve in the running event loop; returns the runner and the root URL"""
+        runner = web.AppRunner(self.app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return runner, f"http://{host}:{port}"
+
+    async def _behave(self, upstream: str) -> Optional[web.Response]:
+        """Sleep for the injected latency; an error response to return instead, if one is injected"""
+        behavior = self.config.behaviors[upstream]
+        self.requests[upstream] += 1
+
+        delay = behavior.latency_ms + self.rng.uniform(0, behavior.jitter_ms)
+        if delay:
+            await asyncio.sleep(delay / 1000)
+
+        if behavior.error_rate and self.rng.random() < behavior.error_rate:
+            self.failures[upstream] += 1
+            return web.json_response(_error_body(upstream, behavior.error_status), status=behavior.error_status)
+        return None
+
+    # Supabase PostgREST
+
+    def _table(self, name: str) -> Table:
+        if name not in self.tables:
+            self.tables[name] = Table(name)
+        return self.tables[name]
+
+    async def postgrest(self, request: web.Request) -> web.Response:
+        failure = await self._behave("supabase")
+        if failure:
+            return failure
+
+        table = self._table(request.match_info["table"])
+        filters = [
+            (column, *value.split(".", 1))
+            for column, value in request.query.items()
+            if column not in ("select", "order", "limit", "offset", "on_conflict", "columns") and "." in value
+        ]
+        prefer = request.headers.get("Prefer", "")
+
+        if request.method == "GET" or request.method == "HEAD":
+            rows = table.select(filters)
+            order = request.query.get("order")
+            if order:
+                column, _, direction = order.partition(".")
+                rows = sorted(rows, key=lambda row: str(row.get(column) or ""), reverse=direction.startswith("desc"))
+            offset = int(request.query.get("offset", 0))
+            limit = request.query.get("limit")
+            total = len(rows)
+            rows = rows[offset:offset + int(limit)] if limit else rows[offset:]
+        elif request.method == "POST":
+            body = await request.json()
+            conflict = request.query.get("on_conflict") if "merge-duplicates" in prefer else None
+            columns = tuple(column.strip() for column in conflict.split(",")) if conflict else None
+            rows = [table.insert(row, columns) for row in (body if isinstance(body, list) else [body])]
+            total = len(rows)
+        elif request.method == "PATCH":
+            changes = await request.json()
+            rows = table.select(filters)
+            for row in rows:
+                row.update(changes)
+            total = len(rows)
+        elif request.method == "DELETE":
+            rows = table.delete(filters)
+            total = len(rows)
+        else:
+            return web.json_response({"message": "method not allowed"}, status=405)
+
+        headers = {"Content-Range": f"0-{max(len(rows) - 1, 0)}/{total}"}
+        if "return=minimal" in prefer:
+            return web.Response(status=201 if request.method == "POST" else 204, headers=headers)
+        if "vnd.pgrst.object" in request.headers.get("Accept", ""):
+            if len(rows) != 1:
+                return web.json_response({"code": "PGRST116", "message": "not a single row"}, status=406)
+            return web.json_response(rows[0], headers=headers)
+        return web.json_response(rows, status=201 if request.method == "POST" else 200, headers=headers)
+
+    async def postgrest_rpc(self, request: web.Request) -> web.Response:
+        failure = await self._behave("supabase")
+        if failure:
+            return failure
+
+        # Empty results send searches to SerpAPI and let every send through
+        function = request.match_info["function"]
+        if function == "increment_llm_usage":
+            return web.Response(status=204)
+        return web.json_response([])
+
+    # Supabase Storage
+
+    async def storage(self, request: web.Request) -> web.Response:
+        failure = await self._behave("supabase")
+        if failure:
+            return failure
+
+        bucket = request.match_info["bucket"]
+        path = request.match_info.get("path", "")
+        # Read the upload like Storage would, without keeping it
+        size = 0
+        async for chunk in request.content.iter_chunked(64 * 1024):
+            size += len(chunk)
+
+        if request.method == "DELETE":
+            return web.json_response([])
+        return web.json_response({"Key": f"{bucket}/{path}", "Id": str(uuid.uuid4()), "size": size})
+
+    # SerpAPI
+
+    async def serpapi_search(self, request: web.Request) -> web.Response:
+        failure = await self._behave("serpapi")
+        if failure:
+            return failure
+
+        query = request.query.get("q", "")
+        count = min(int(request.query.get("num", 10)), 100)
+        return web.json_response(self._jobs_page(query, count))
+
+    def _jobs_page(self, query: str, count: int) -> Dict[str, Any]:
+        """google_jobs results, the same for the same query (so re-scrapes upsert)"""
+        rng = random.Random(hashlib.sha256(query.encode("utf-8")).digest())
+        jobs = []
+        for i in range(count):
+            company = rng.choice(COMPANIES)
+            jobs.append({
+                "title": f"{query.split(' in ')[0].title() or 'Software Engineer'} Intern",
+                "company_name": company,
+                "location": rng.choice(CITIES),
+                "via": "LinkedIn",
+                "share_url": f"https://www.linkedin.com/jobs/view/{rng.getrandbits(40)}",
+                "extensions": ["3 days ago", "Internship"],
+                "detected_extensions": {"posted_at": "3 days ago", "schedule_type": "Internship"},
+                "description": " ".join(rng.choice(WORDS) for _ in range(rng.randint(150, 400))),
+                "related_links": [{"link": f"https://{company.lower()}.com/careers", "text": "Careers"}],
+                "job_id": f"{rng.getrandbits(128):x}",
+            })
+        return {
+            "search_metadata": {"id": uuid.uuid4().hex, "status": "Success"},
+            "search_parameters": {"engine": "google_jobs", "q": query},
+            "jobs_results": jobs,
+        }
+
+    async def serpapi_account(self, request: web.Request) -> web.Response:
+        failure = await self._behave("serpapi")
+        return failure or web.json_response({"total_searches_left": 100000})
+
+    # Groq (OpenAI-compatible)
+
+    async def groq_completion(self, request: web.Request) -> web.Response:
+        failure = await self._behave("groq")
+        if failure:
+            return failure
+
+        body = await request.json()
+        prompt_tokens = sum(len(message.get("content", "")) for message in body.get("messages", [])) // 4
+        text = self._completion_text(body.get("max_tokens"))
+        return web.json_response({
+            "id": f"chatcmpl-{uuid.uuid4().hex}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": len(text) // 4,
+                "total_tokens": prompt_tokens + len(text) // 4,
+            },
+        })
+
+    async def groq_model(self, request: web.Request) -> web.Response:
+        failure = await self._behave("groq")
+        return failure or web.json_response({"id": request.match_info["model"], "object": "model", "owned_by": "stub"})
+
+    # Gemini
+
+    async def gemini_generate(self, request: web.Request) -> web.Response:
+        # The model segment carries the method ("gemini-2.0-flash-exp:generateContent")
+        failure = await self._behave("gemini")
+        if failure:
+            return failure
+
+        body = await request.json()
+        config = body.get("generationConfig") or {}
+        text = self._completion_text(config.get("maxOutputTokens"))
+        prompt_tokens = len(json.dumps(body.get("contents", ""))) // 4
+        return web.json_response({
+            "candidates": [
+                {"content": {"role": "model", "parts": [{"text": text}]}, "finishReason": "STOP", "index": index}
+                for index in range(config.get("candidateCount") or 1)
+            ],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": len(text) // 4,
+                "totalTokenCount": prompt_tokens + len(text) // 4,
+            },
+        })
+
+    async def gemini_model(self, request: web.Request) -> web.Response:
+        failure = await self._behave("gemini")
+        return failure or web.json_response({"name": f"models/{request.match_info['model']}"})
+
+    async def gemini_cache(self, request: web.Request) -> web.Response:
+        failure = await self._behave("gemini")
+        if failure:
+            return failure
+        if request.method == "DELETE":
+            return web.json_response({})
+        return web.json_response({
+            "name": f"cachedContents/{request.match_info.get('name') or uuid.uuid4().hex}",
+            "expireTime": datetime.fromtimestamp(time.time() + 3600, timezone.utc).isoformat(),
+        })
+
+    def _completion_text(self, max_tokens: Optional[int]) -> str:
+        # Subject line requests ask for a few dozen tokens
+        if max_tokens and max_tokens <= 50:
+            return "Built Internify, a FastAPI outreach platform"
+        return EMAIL_BODY
+
+    # Resend
+
+    async def resend_send(self, request: web.Request) -> web.Response:
+        failure = await self._behave("resend")
+        if failure:
+            return failure
+        await request.read()
+        return web.json_response({"id": str(uuid.uuid4())})
+
+    async def resend_batch(self, request: web.Request) -> web.Response:
+        failure = await self._behave("resend")
+        if failure:
+            return failure
+        emails = await request.json()
+        return web.json_response({"data": [{"id": str(uuid.uuid4())} for _ in emails]})
+
+    async def resend_domains(self, request: web.Request) -> web.Response:
+        failure = await self._behave("resend")
+        return failure or web.json_response({"data": []})
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({"requests": self.requests, "failures": self.failures})
+
+
+def add_behavior_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--latency", action="append", default=[], metavar="UPSTREAM=MS[:JITTER]",
+                        help=f"Response latency of one upstream ({', '.join(UPSTREAMS)})")
+    parser.add_argument("--errors", action="append", default=[], metavar="UPSTREAM=RATE[:STATUS]",
+                        help="Fraction of an upstream's requests that fail (default status 500)")
+    parser.add_argument("--seed", type=int, default=1, help="Seed for latency jitter and error injection")
+
+
+async def serve(host: str, port: int, config: StubConfig) -> None:
+    stubs = UpstreamStubs(config)
+    runner, root = await stubs.start(host, port)
+    print(f"[STUBS] Serving {', '.join(UPSTREAMS)} at {root}")
+    for name, value in base_urls(root).items():
+        print(f"{name}={value}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-ins for Internify's upstream APIs")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    add_behavior_arguments(parser)
+    args = parser.parse_args()
+
+    config = parse_behaviors(StubConfig(seed=args.seed), args.latency, args.errors)
+    try:
+        asyncio.run(serve(args.host, args.port, config))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import orjson
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Optional, Union
+from fastapi import Request
+from starlette.responses import JSONResponse, Response
+
+from services.metrics import metrics
+
+
+metrics.describe("http_not_modified_total", "counter", "Conditional GETs answered with 304 Not Modified")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+class ORJSONResponse(JSONResponse):
+    """
+    JSON response rendered with orjson
+
+    The app's default response class. Routes that serve database rows return
+    it directly with their `response_model` as the documented shape: the rows
+    are trusted and already JSON types, so FastAPI's response validation and
+    jsonable_encoder pass over every row are skipped.
+
+    (FastAPI's own ORJSONResponse is deprecated and warns on every response.)
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def conditional_json(
+    request: Request,
+    content: Any,
+    version: Optional[Any] = None,
+    last_modified: Optional[Union[str, datetime]] = None
+) -> Response:
+    """
+    JSON response with an ETag, answering 304 when the client's copy is current
+
+    Args:
+        request: The incoming request (If-None-Match / If-Modified-Since)
+        content: The response document
+        version: Anything that changes whenever `content` does (ids,
+            timestamps). The ETag is derived from it, so a 304 doesn't
+            serialize `content` at all. Without it, the ETag is a hash of the
+            rendered body.
+        last_modified: When the data last changed (ISO string or datetime)
+
+    Returns:
+        200 with the body, or an empty 304, both carrying the validators
+    """
+
+    body = None if version is not None else dumps(content)
+    digest = hashlib.blake2b(body if body is not None else dumps(version), digest_size=16).hexdigest()
+
+    # Weak: the same document is sent gzip/brotli-encoded or not
+    headers = {
+        "ETag": f'W/"{digest}"',
+        # Per-user data: browsers may keep it but must revalidate every time
+        "Cache-Control": "private, no-cache",
+        "Vary": "Authorization",
+    }
+
+    modified = _to_datetime(last_modified)
+    if modified is not None:
+        headers["Last-Modified"] = format_datetime(modified, usegmt=True)
+
+    if _is_current(request, digest, modified):
+        # Route template rather than the path, which may contain ids
+        metrics.inc("http_not_modified_total", route=getattr(request.scope.get("route"), "path", "unknown"))
+        return Response(status_code=304, headers=headers)
+
+    return Response(body if body is not None else dumps(content), media_type="application/json", headers=headers)
+
+
+def _is_current(request: Request, digest: str, modified: Optional[datetime]) -> bool:
+    """RFC 9110 evaluation: If-None-Match when present, else If-Modified-Since"""
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison: W/ prefixes are ignored
+        tags = {tag.strip().removeprefix("W/").strip('"') for tag in if_none_match.split(",")}
+        return "*" in tags or digest in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have whole-second precision
+        return modified.replace(microsecond=0) <= since
+
+    return False
+
+
+def _to_datetime(value: Optional[Union[str, datetime]]) -> Optional[datetime]:
+    """Timestamps as stored (naive ones are UTC)"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
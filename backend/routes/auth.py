@@ -1,6 +1,8 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from routes.utils import verify_token, extract_user_id, extract_user_email
 from services.supabase_service import supabase_service
+from models.user import UserProfileResponse
+from responses import conditional_json
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -50,10 +52,12 @@ async def verify_auth_token(payload: dict = Depends(verify_token)):
         )
 
 
-@router.get("/me")
-async def get_current_user(payload: dict = Depends(verify_token)):
+@router.get("/me", response_model=UserProfileResponse)
+async def get_current_user(request: Request, payload: dict = Depends(verify_token)):
     """
     Get current authenticated user's information
+    
+    Sends an ETag; returns 304 when If-None-Match matches.
     """
     
     try:
@@ -67,10 +71,10 @@ async def get_current_user(payload: dict = Depends(verify_token)):
                 detail="User not found"
             )
         
-        return {
+        return conditional_json(request, {
             "success": True,
             "user": user
-        }
+        })
     
     except HTTPException:
         raise
@@ -1,23 +1,39 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from routes.utils import verify_token, extract_user_id, extract_user_email
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, Response, status, Query
+from routes.utils import verify_token, extract_user_id, extract_user_email, rate_limit, upstream_limit_exceeded
 from services.resend_service import resend_service
 from services.supabase_service import supabase_service
-from models.email import EmailSendRequest, EmailResponse
-from typing import List
+from services.idempotency import idempotency_service, request_fingerprint, IdempotencyKeyReused, IdempotencyInProgress
+from models.email import EmailSendRequest, EmailResponse, EmailHistoryResponse
+from responses import conditional_json
+from typing import List, Optional
 
 router = APIRouter(prefix="/email", tags=["Email"])
 
+# (user_id, internship_id) of sends in progress in this process, against double submits
+_sends_in_flight: set = set()
+
 
 @router.post("/send")
 async def send_email(
     request: EmailSendRequest,
-    payload: dict = Depends(verify_token)
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=255, description="Retries with the same key send at most once"),
+    payload: dict = Depends(rate_limit("email.send"))
 ):
     """
     Send a cold email to a company
     
+    Refuses (409) to email an internship the user already emailed, unless
+    `force` is set, and a second send while the first is still in progress.
+    
+    With an Idempotency-Key header, retries of a request send at most once:
+    duplicates wait for or replay the first request's response (marked with
+    an Idempotent-Replayed header). Only a request that reaches Resend takes
+    from the shared Resend bucket, so replays and refused duplicates don't.
+    
     Args:
         request: Email send request with recipient, subject, and body
+        idempotency_key: Client-generated key, unique per intended send
     
     Returns:
         Success status and email record
@@ -27,45 +43,28 @@ async def send_email(
         user_id = extract_user_id(payload)
         user_email = extract_user_email(payload)
         
-        # Send email via Resend
-        result = await resend_service.send_email(
-            to_email=request.recipient_email,
-            subject=request.subject,
-            body=request.body,
-            reply_to=user_email  # Set user's email as reply-to
-        )
+        if not idempotency_key:
+            return await _guarded_send(request, user_id, user_email)
         
-        if not result:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to send email. Please check your email configuration."
-            )
-        
-        # Save email record to database
-        email_record = await supabase_service.save_email({
-            "user_id": user_id,
-            "internship_id": request.internship_id,
-            "subject": request.subject,
-            "body": request.body,
-            "recipient_email": request.recipient_email,
-            "status": "sent"
-        })
-        
-        if not email_record:
-            # Email was sent but failed to save record
-            # Still return success since email went through
-            return {
-                "success": True,
-                "message": "Email sent successfully but failed to save record",
-                "email_id": None
-            }
-        
-        return {
-            "success": True,
-            "message": "Email sent successfully!",
-            "email": email_record
-        }
+        result, replayed = await idempotency_service.run(
+            f"email.send:{user_id}:{idempotency_key}",
+            request_fingerprint(request.model_dump(mode="json")),
+            lambda: _guarded_send(request, user_id, user_email)
+        )
+        if replayed:
+            response.headers["Idempotent-Replayed"] = "true"
+        return result
     
+    except IdempotencyKeyReused:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+            detail="This Idempotency-Key was already used for a different email."
+        )
+    except IdempotencyInProgress:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="A request with this Idempotency-Key is still being processed. Please retry shortly."
+        )
     except HTTPException:
         raise
     except Exception as e:
@@ -75,14 +74,92 @@ async def send_email(
         )
 
 
-@router.get("/history")
+async def _guarded_send(request: EmailSendRequest, user_id: str, user_email: str) -> dict:
+    """Send unless it duplicates an earlier or in-progress send (409)"""
+    
+    send_key = (user_id, request.internship_id)
+    
+    if send_key in _sends_in_flight:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="This email is already being sent."
+        )
+    
+    if not request.force:
+        applied = await supabase_service.get_applied_internships(user_id, internship_ids=[request.internship_id])
+        if applied:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail=f"You already emailed this internship (last sent {applied[0]['last_sent_at']}). Send with force=true to email it again."
+            )
+    
+    _sends_in_flight.add(send_key)
+    try:
+        return await _send_and_record(request, user_id, user_email)
+    finally:
+        _sends_in_flight.discard(send_key)
+
+
+async def _send_and_record(request: EmailSendRequest, user_id: str, user_email: str) -> dict:
+    """Send via Resend and save the email record"""
+    
+    # Taken here rather than in the route dependency: replays and 409s never reach Resend
+    limited = upstream_limit_exceeded("resend")
+    if limited:
+        raise limited
+    
+    # Send email via Resend
+    result = await resend_service.send_email(
+        to_email=request.recipient_email,
+        subject=request.subject,
+        body=request.body,
+        reply_to=user_email  # Set user's email as reply-to
+    )
+    
+    if not result:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to send email. Please check your email configuration."
+        )
+    
+    # Save email record to database
+    email_record = await supabase_service.save_email({
+        "user_id": user_id,
+        "internship_id": request.internship_id,
+        "subject": request.subject,
+        "body": request.body,
+        "recipient_email": request.recipient_email,
+        "status": "sent"
+    })
+    
+    if not email_record:
+        # Email was sent but failed to save record
+        # Still return success since email went through
+        return {
+            "success": True,
+            "message": "Email sent successfully but failed to save record",
+            "email_id": None
+        }
+    
+    return {
+        "success": True,
+        "message": "Email sent successfully!",
+        "email": email_record
+    }
+
+
+@router.get("/history", response_model=EmailHistoryResponse)
 async def get_email_history(
+    request: Request,
     limit: int = Query(50, ge=1, le=100, description="Maximum number of emails to return"),
     payload: dict = Depends(verify_token)
 ):
     """
     Get user's email history
     
+    Sends an ETag and Last-Modified (the newest sent_at); returns 304 when
+    the client's copy is current.
+    
     Args:
         limit: Maximum number of emails to return (1-100)
     
@@ -95,11 +172,16 @@ async def get_email_history(
         
         emails = await supabase_service.get_user_emails(user_id, limit=limit)
         
-        return {
-            "success": True,
-            "emails": emails,
-            "count": len(emails)
-        }
+        # The embedded internships can change without a new email, so the ETag hashes the body
+        return conditional_json(
+            request,
+            {
+                "success": True,
+                "emails": emails,
+                "count": len(emails)
+            },
+            last_modified=emails[0].get("sent_at") if emails else None
+        )
     
     except Exception as e:
         raise HTTPException(
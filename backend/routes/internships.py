@@ -1,33 +1,104 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from routes.utils import verify_token
+from fastapi import APIRouter, Depends, HTTPException, Request, status, Query
+from routes.utils import verify_token, extract_user_id, rate_limit, upstream_limit_exceeded
 from services.scraper_service import scraper_service
 from services.supabase_service import supabase_service
-from models.internship import InternshipResponse
+from services.dedup_service import dedup_service
+from services.prefetch_service import prefetch_service
+from services.resume_service import resume_service
+from services.ranking_service import ranking_service
+from services.speculative_service import speculative_service, PRIORITY_VIEW, PRIORITY_SEARCH
+from models.internship import InternshipResponse, InternshipSearchResponse, InternshipFeedResponse
+from responses import ORJSONResponse, conditional_json
 from typing import Optional, List
+from datetime import datetime, timedelta
+import os
 
 router = APIRouter(prefix="/internships", tags=["Internships"])
 
+# Stored listings older than this are not served by /search (SerpAPI refreshes them)
+LOCAL_SEARCH_MAX_AGE_DAYS = int(os.getenv("LOCAL_SEARCH_MAX_AGE_DAYS", "14"))
 
-@router.get("/search")
+# How far back the first fetch of a new saved search reaches
+FEED_INITIAL_DAYS = int(os.getenv("FEED_INITIAL_DAYS", "7"))
+
+# Top search results queued for speculative email generation (when enabled)
+SPECULATIVE_SEARCH_TOP_K = int(os.getenv("SPECULATIVE_SEARCH_TOP_K", "1"))
+
+
+@router.get("/search", response_model=InternshipSearchResponse)
 async def search_internships(
     role: str = Query(..., description="Internship role or title to search for"),
     location: Optional[str] = Query(None, description="Location filter"),
     limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
-    payload: dict = Depends(verify_token)
+    prefer_local: bool = Query(True, description="Serve stored listings first and use SerpAPI only to top up"),
+    sort: str = Query("relevance", pattern="^(relevance|match)$", description="Search order, or best match to the resume first"),
+    resume_id: Optional[str] = Query(None, description="Resume to match against (defaults to the latest)"),
+    payload: dict = Depends(rate_limit("internships.search"))
 ):
     """
-    Search for internship listings using SerpAPI
+    Search for internship listings
+
+    Recent stored listings are served from the local full-text index first;
+    SerpAPI is only called when the index returns fewer than `limit` results.
+    Every listing gets a `match_score` against the user's resume, and
+    `already_applied` / `last_sent_at` from the user's sent emails.
     
     Args:
         role: Internship title or role (e.g., "Software Engineer Intern")
         location: Optional location filter
         limit: Maximum number of results (1-50)
+        prefer_local: Serve from the local index before calling SerpAPI
+        sort: "relevance" (search order) or "match" (best match_score first)
+        resume_id: Resume to score against; the user's latest when omitted
     
     Returns:
-        List of internship listings from LinkedIn/Google Jobs
+        List of internship listings from LinkedIn/Google Jobs (stored rows,
+        sent as-is without response validation)
     """
     
     try:
+        user_id = extract_user_id(payload)
+        prefetch_service.record_search(role, location)
+        
+        local_internships = []
+        if prefer_local:
+            local_internships = await supabase_service.search_internships_local(
+                query=role,
+                location=location,
+                max_age_days=LOCAL_SEARCH_MAX_AGE_DAYS,
+                limit=limit
+            )
+        
+        if len(local_internships) >= limit:
+            local_internships = await _annotate(user_id, local_internships, sort, resume_id)
+            return ORJSONResponse({
+                "success": True,
+                "internships": local_internships,
+                "count": len(local_internships),
+                "source": "local"
+            })
+        
+        # Top up from SerpAPI (or its cache), unless SerpAPI is failing or its shared budget is exhausted
+        upstream_error = None
+        if not scraper_service.has_cached(role, location, limit):
+            if not scraper_service.breaker.available():
+                upstream_error = HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Internship search is temporarily unavailable. Please try again shortly."
+                )
+            else:
+                upstream_error = upstream_limit_exceeded("serpapi")
+        if upstream_error:
+            if local_internships:
+                local_internships = await _annotate(user_id, local_internships, sort, resume_id)
+                return ORJSONResponse({
+                    "success": True,
+                    "internships": local_internships,
+                    "count": len(local_internships),
+                    "source": "local"
+                })
+            raise upstream_error
+        
         # Search for internships
         internships = await scraper_service.search_internships(
             query=role,
@@ -35,62 +106,313 @@ async def search_internships(
             limit=limit
         )
         
-        if not internships:
-            return {
+        # Merge listings already served from the local index
+        local_ids = {id(internship) for internship in local_internships}
+        local_internships = dedup_service.deduplicate(local_internships)
+        internships = [
+            internship for internship in dedup_service.deduplicate(local_internships + internships)
+            if id(internship) not in local_ids
+        ]
+        
+        if not internships and not local_internships:
+            return ORJSONResponse({
                 "success": True,
                 "internships": [],
+                "count": 0,
                 "message": "No internships found matching your criteria. Try different keywords."
-            }
+            })
         
         # Save internships to database for future reference
-        saved_internships = []
-        for internship in internships:
-            try:
-                # Prepare internship data with new contact fields
-                internship_data = {
-                    "title": internship["title"],
-                    "company": internship["company"],
-                    "link": internship["link"],
-                    "description": internship["description"],
-                    "location": internship.get("location"),
-                    "contact_email": internship.get("contact_email"),
-                    "contact_phone": internship.get("contact_phone"),
-                    "contact_website": internship.get("contact_website")
-                }
-                
-                saved_internship = await supabase_service.save_internship(internship_data)
-                
-                if saved_internship:
-                    saved_internships.append(saved_internship)
-                else:
-                    # If saving fails, still include in results
-                    saved_internships.append(internship)
-            except Exception as e:
-                # Continue even if one internship fails to save
-                print(f"Failed to save internship '{internship.get('title')}': {e}")
-                saved_internships.append(internship)
+        saved_internships = await supabase_service.save_internships(
+            internships[:limit - len(local_internships)]
+        )
+        
+        results = await _annotate(user_id, local_internships + saved_internships, sort, resume_id)
+        
+        return ORJSONResponse({
+            "success": True,
+            "internships": results,
+            "count": len(results),
+            "source": "mixed" if local_internships else "serpapi"
+        })
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Internship search failed: {str(e)}"
+        )
+
+
+async def _annotate(user_id: str, internships: list, sort: str, resume_id: Optional[str]) -> list:
+    """
+    Per-user fields of search results: already_applied, last_sent_at and match_score
+    
+    The top results are queued for speculative email generation.
+    """
+    
+    if not internships:
+        return internships
+    
+    internships = await _with_applied(user_id, internships)
+    internships = await _with_match_scores(user_id, internships, sort, resume_id)
+    
+    for internship in internships[:SPECULATIVE_SEARCH_TOP_K]:
+        speculative_service.enqueue(user_id, internship, priority=PRIORITY_SEARCH)
+    
+    return internships
+
+
+async def _with_applied(user_id: str, internships: list) -> list:
+    """
+    Mark listings the user has already emailed
+    
+    One query for the whole page, matching stored listings by id and the
+    rest (and other copies of the same posting) by fingerprint.
+    """
+    
+    fingerprints = [
+        internship.get("fingerprint") or dedup_service.fingerprint(internship)
+        for internship in internships
+    ]
+    
+    applied = await supabase_service.get_applied_internships(
+        user_id,
+        internship_ids=[internship["id"] for internship in internships if internship.get("id")],
+        fingerprints=list(set(fingerprints))
+    )
+    
+    by_id = {row["internship_id"]: row["last_sent_at"] for row in applied}
+    by_fingerprint = {row["fingerprint"]: row["last_sent_at"] for row in applied if row.get("fingerprint")}
+    
+    annotated = []
+    for internship, fingerprint in zip(internships, fingerprints):
+        last_sent_at = max(
+            filter(None, (by_id.get(internship.get("id")), by_fingerprint.get(fingerprint))),
+            default=None
+        )
+        annotated.append({**internship, "already_applied": last_sent_at is not None, "last_sent_at": last_sent_at})
+    
+    return annotated
+
+
+async def _with_match_scores(user_id: str, internships: list, sort: str, resume_id: Optional[str]) -> list:
+    """
+    Score listings against the user's resume (see RankingService)
+    
+    Listings are returned unscored, in search order, when the user has no
+    resume or scoring fails: ranking must never fail the search.
+    """
+    
+    try:
+        resume = await resume_service.get_resume(user_id, resume_id)
+        if not resume:
+            return internships
+        
+        return ranking_service.rank(
+            internships,
+            resume_text=resume[1],
+            resume_id=resume[0],
+            sort_by_match=sort == "match"
+        )
+    
+    except Exception as e:
+        print(f"[RANKING] Failed to score listings: {e}")
+        return internships
+
+
+@router.get("/local-search", response_model=InternshipSearchResponse)
+async def search_local_internships(
+    role: str = Query(..., description="Internship role or title to search for"),
+    location: Optional[str] = Query(None, description="Location filter"),
+    max_age_days: Optional[int] = Query(None, ge=1, le=365, description="Only listings stored within this many days"),
+    sort: str = Query("relevance", pattern="^(relevance|recent)$", description="Order by relevance or recency"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
+    payload: dict = Depends(verify_token)
+):
+    """
+    Search stored internship listings through the full-text index
+    
+    Does not call SerpAPI, so it only finds listings that earlier searches saved.
+    
+    Args:
+        role: Internship title or role (e.g., "Software Engineer Intern")
+        location: Optional location filter
+        max_age_days: Optional recency filter
+        sort: "relevance" (ranked) or "recent"
+        limit: Maximum number of results (1-50)
+    
+    Returns:
+        Ranked list of stored internship listings
+    """
+    
+    try:
+        internships = await supabase_service.search_internships_local(
+            query=role,
+            location=location,
+            max_age_days=max_age_days,
+            limit=limit,
+            sort_by_recent=sort == "recent"
+        )
+        
+        return ORJSONResponse({
+            "success": True,
+            "internships": internships,
+            "count": len(internships),
+            "source": "local"
+        })
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Local internship search failed: {str(e)}"
+        )
+
+
+@router.get("/feed", response_model=InternshipFeedResponse)
+async def get_internships_feed(
+    role: str = Query(..., description="Internship role or title of the saved search"),
+    location: Optional[str] = Query(None, description="Location filter of the saved search"),
+    limit: int = Query(20, ge=1, le=50, description="Maximum number of new listings"),
+    payload: dict = Depends(verify_token)
+):
+    """
+    Get listings first seen since the user's last fetch of a saved search
+    
+    The first call subscribes the user to the search and returns listings stored
+    in the last FEED_INITIAL_DAYS days. Each call moves the search's high-water
+    mark (created_at and id) to the newest listing returned, so listings are
+    delivered once, including listings stored in the same batch.
+    
+    Args:
+        role: Internship title or role
+        location: Optional location filter
+        limit: Maximum number of listings (1-50); `has_more` is set when more are waiting
+    
+    Returns:
+        New internship listings, oldest first
+    """
+    
+    try:
+        user_id = extract_user_id(payload)
+        query = " ".join(role.lower().split())
+        location_key = " ".join((location or "").lower().split())
+        
+        # Subscribed searches count towards popularity, so the prefetcher keeps them fresh
+        prefetch_service.record_search(role, location)
+        
+        saved_search = await supabase_service.get_saved_search(user_id, query, location_key)
+        
+        # Cursor of the last listing delivered; the id orders listings stored in the same batch
+        since = saved_search.get("last_seen_at") if saved_search else None
+        since_id = saved_search.get("last_seen_id") if since else None
+        if not since:
+            since = (datetime.utcnow() - timedelta(days=FEED_INITIAL_DAYS)).isoformat()
+        
+        internships = await supabase_service.get_internships_feed(
+            query=query,
+            location=location_key or None,
+            since=since,
+            since_id=since_id,
+            limit=limit
+        )
+        
+        now = datetime.utcnow().isoformat()
+        await supabase_service.upsert_saved_search({
+            "user_id": user_id,
+            "query": query,
+            "location": location_key,
+            "last_seen_at": internships[-1]["created_at"] if internships else since,
+            "last_seen_id": internships[-1]["id"] if internships else since_id,
+            "last_fetched_at": now
+        })
+        
+        return ORJSONResponse({
+            "success": True,
+            "internships": internships,
+            "count": len(internships),
+            "has_more": len(internships) == limit,
+            "since": since
+        })
+    
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch internship feed: {str(e)}"
+        )
+
+
+@router.get("/saved-searches")
+async def get_saved_searches(payload: dict = Depends(verify_token)):
+    """
+    Get the user's saved searches and their high-water marks
+    """
+    
+    try:
+        user_id = extract_user_id(payload)
+        
+        saved_searches = await supabase_service.get_saved_searches(user_id)
         
         return {
             "success": True,
-            "internships": saved_internships,
-            "count": len(saved_internships)
+            "saved_searches": saved_searches,
+            "count": len(saved_searches)
         }
     
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Internship search failed: {str(e)}"
+            detail=f"Failed to fetch saved searches: {str(e)}"
+        )
+
+
+@router.delete("/saved-searches/{saved_search_id}")
+async def delete_saved_search(saved_search_id: str, payload: dict = Depends(verify_token)):
+    """
+    Unsubscribe from a saved search
+    
+    Args:
+        saved_search_id: Saved search ID
+    """
+    
+    try:
+        user_id = extract_user_id(payload)
+        
+        deleted = await supabase_service.delete_saved_search(saved_search_id, user_id)
+        
+        if not deleted:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to delete saved search"
+            )
+        
+        return {
+            "success": True,
+            "message": "Saved search deleted successfully"
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to delete saved search: {str(e)}"
         )
 
 
 @router.get("/{internship_id}")
 async def get_internship_details(
     internship_id: str,
+    request: Request,
     payload: dict = Depends(verify_token)
 ):
     """
     Get detailed information about a specific internship
     
+    Sends an ETag; returns 304 when If-None-Match matches. Queues the
+    listing for speculative email generation.
+    
     Args:
         internship_id: Internship ID from database
     
@@ -107,10 +429,13 @@ async def get_internship_details(
                 detail="Internship not found"
             )
         
-        return {
+        speculative_service.enqueue(extract_user_id(payload), internship, priority=PRIORITY_VIEW)
+        
+        # Stored listings are updated in place when re-scraped, so the ETag hashes the row itself
+        return conditional_json(request, {
             "success": True,
             "internship": internship
-        }
+        })
     
     except HTTPException:
         raise
@@ -125,7 +450,7 @@ async def get_internship_details(
 async def search_internships_by_company(
     company_name: str,
     role: Optional[str] = Query(None, description="Specific role at the company"),
-    payload: dict = Depends(verify_token)
+    payload: dict = Depends(rate_limit("internships.search", upstream="serpapi"))
 ):
     """
     Search for internships at a specific company
@@ -146,7 +471,7 @@ async def search_internships_by_company(
         
         return {
             "success": True,
-            "internships": internships,
+            "internships": [internship.to_dict() for internship in internships],
             "count": len(internships)
         }
     
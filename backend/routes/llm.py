@@ -1,7 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from routes.utils import verify_token, extract_user_id
+import asyncio
+from typing import Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from routes.utils import verify_token, extract_user_id, rate_limit, upstream_limit_exceeded
 from services.llm_service import llm_service
-from services.supabase_service import supabase_service
+from services.resume_service import resume_service
+from services.usage_service import usage_service
+from services.speculative_service import speculative_service
 from models.email import EmailGenerateRequest
 from pydantic import BaseModel
 
@@ -17,11 +21,16 @@ class EmailGenerateResponse(BaseModel):
 @router.post("/generate-email", response_model=EmailGenerateResponse)
 async def generate_email(
     request: EmailGenerateRequest,
-    payload: dict = Depends(verify_token)
+    payload: dict = Depends(rate_limit("llm.generate"))
 ):
     """
     Generate a personalized cold email using AI
     
+    With `internship_id`, an email pre-generated in the background after the
+    user viewed the listing is returned immediately when there is one. Only a
+    request that reaches the provider is charged to the LLM upstream bucket,
+    one token per provider call.
+    
     Args:
         request: Email generation request with internship details and resume
     
@@ -32,32 +41,52 @@ async def generate_email(
     try:
         user_id = extract_user_id(payload)
         
-        # If resume_text is empty, fetch from database
-        resume_text = request.resume_text
-        if not resume_text or resume_text.strip() == "":
-            print(f"[LLM] No resume_text in request, fetching from database for user: {user_id}")
-            resume = await supabase_service.get_latest_resume(user_id)
-            
-            if not resume:
-                raise HTTPException(
-                    status_code=status.HTTP_404_NOT_FOUND,
-                    detail="No resume found. Please upload a resume first."
+        if request.internship_id and not request.resume_text:
+            speculative = await speculative_service.take(user_id, request.internship_id, request.resume_id)
+            if speculative:
+                print(f"[LLM] Serving pre-generated email for internship {request.internship_id}")
+                return EmailGenerateResponse(
+                    subject=speculative["subject"],
+                    body=speculative["body"],
+                    success=True
                 )
-            
-            resume_text = resume["extracted_text"]
-            print(f"[LLM] Fetched resume from database, length: {len(resume_text)} characters")
-        else:
-            print(f"[LLM] Using resume_text from request, length: {len(resume_text)} characters")
+        
+        if not await usage_service.within_budget(user_id):
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Daily AI usage limit reached. Please try again tomorrow.",
+                headers={"Retry-After": str(usage_service.seconds_until_reset())}
+            )
+        
+        resume_key, resume_text = await _resolve_resume(user_id, request)
+        
+        # With the circuit open the email is built locally, without a provider call to charge
+        if llm_service.provider_available():
+            limited = upstream_limit_exceeded("llm", cost=llm_service.calls_per_email)
+            if limited:
+                raise limited
         
         # Log first 200 chars of resume to verify content
         print(f"[LLM] Resume preview: {resume_text[:200]}...")
         
-        # Generate email body using LLM
-        email_body = await llm_service.generate_email(
-            resume_text=resume_text,
-            internship_description=request.internship_description,
-            internship_title=request.internship_title,
-            company_name=request.company_name
+        # Generate email body and subject line concurrently; the subject
+        # uses a lightweight model and never fails (template fallback)
+        email_body, subject = await asyncio.gather(
+            llm_service.generate_email(
+                resume_text=resume_text,
+                internship_description=request.internship_description,
+                internship_title=request.internship_title,
+                company_name=request.company_name,
+                cache_key=_request_key(user_id, request, resume_key),
+                user_id=user_id
+            ),
+            llm_service.generate_subject_line(
+                job_title=request.internship_title,
+                company_name=request.company_name,
+                resume_text=resume_text,
+                internship_description=request.internship_description,
+                user_id=user_id
+            )
         )
         
         if not email_body:
@@ -66,12 +95,6 @@ async def generate_email(
                 detail="Failed to generate email. This may be due to AI safety filters. Please try a different internship or check your resume content."
             )
         
-        # Generate subject line
-        subject = await llm_service.generate_subject_line(
-            job_title=request.internship_title,
-            company_name=request.company_name
-        )
-        
         return EmailGenerateResponse(
             subject=subject,
             body=email_body,
@@ -90,18 +113,130 @@ async def generate_email(
 @router.post("/regenerate-email", response_model=EmailGenerateResponse)
 async def regenerate_email(
     request: EmailGenerateRequest,
-    payload: dict = Depends(verify_token)
+    payload: dict = Depends(rate_limit("llm.generate"))
 ):
     """
     Regenerate email with different variation
     
-    This endpoint is identical to generate-email but can be used
-    to regenerate if user is not satisfied with first version.
+    Serves the next-best candidate left over from the last generate-email
+    call for the same request when one is cached, otherwise generates anew
+    (charged to the LLM upstream bucket like generate-email). A cached
+    alternate costs one LLM token for its subject line, or gets a template
+    subject when the user is out of budget or the bucket is empty.
     """
     
+    try:
+        user_id = extract_user_id(payload)
+        resume_key, resume_text = await _resolve_resume(user_id, request)
+        
+        email_body = llm_service.take_alternate(_request_key(user_id, request, resume_key))
+        if email_body:
+            print(f"[LLM] Serving cached alternate for user: {user_id}")
+            
+            # The subject line is a provider call: within the user's budget and the shared
+            # LLM bucket only, otherwise the template (generate_subject_line without a resume)
+            generate_subject = (
+                await usage_service.within_budget(user_id)
+                and llm_service.provider_available()
+                and upstream_limit_exceeded("llm") is None
+            )
+            subject = await llm_service.generate_subject_line(
+                job_title=request.internship_title,
+                company_name=request.company_name,
+                resume_text=resume_text if generate_subject else None,
+                internship_description=request.internship_description,
+                user_id=user_id
+            )
+            
+            return EmailGenerateResponse(
+                subject=subject,
+                body=email_body,
+                success=True
+            )
+    
+    except Exception as e:
+        # The alternate is an optimisation; fall through to a fresh generation
+        print(f"[LLM] Failed to serve cached alternate: {e}")
+    
     return await generate_email(request, payload)
 
 
+@router.get("/usage")
+async def get_usage(
+    days: int = Query(7, ge=1, le=90, description="Number of days of history, including today"),
+    payload: dict = Depends(verify_token)
+):
+    """
+    Get the user's LLM token usage and estimated cost
+    
+    Args:
+        days: Number of days of history
+    
+    Returns:
+        Usage per day (newest first, broken down by model) and the daily token budget
+    """
+    
+    try:
+        user_id = extract_user_id(payload)
+        usage = await usage_service.get_usage(user_id, days)
+        
+        return {
+            "success": True,
+            **usage
+        }
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to fetch usage: {str(e)}"
+        )
+
+
+async def _resolve_resume(user_id: str, request: EmailGenerateRequest) -> Tuple[str, str]:
+    """
+    Resume for a generate request: the text sent inline, else the resume
+    referenced by resume_id, else the user's latest resume
+    
+    Returns:
+        (what the alternates are keyed on: the inline text or the resolved
+        resume id, resume text)
+    
+    Raises:
+        HTTPException: 404 if the referenced (or any) resume doesn't exist
+    """
+    
+    if request.resume_text and request.resume_text.strip():
+        print(f"[LLM] Using resume_text from request, length: {len(request.resume_text)} characters")
+        return request.resume_text, request.resume_text
+    
+    resume = await resume_service.get_resume(user_id, request.resume_id)
+    if resume is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Resume not found." if request.resume_id else "No resume found. Please upload a resume first."
+        )
+    
+    resume_id, resume_text = resume
+    print(f"[LLM] Using resume {resume_id} for user: {user_id}, length: {len(resume_text)} characters")
+    return resume_id, resume_text
+
+
+def _request_key(user_id: str, request: EmailGenerateRequest, resume_key: str) -> tuple:
+    """
+    Alternates cache key; keyed on the resolved resume (as speculative
+    generation does), so "latest" never matches alternates for an older resume
+    """
+    return llm_service.request_key(
+        user_id,
+        resume_key,
+        request.internship_description,
+        request.internship_title,
+        request.company_name
+    )
+
+
 @router.post("/improve-email")
 async def improve_email(
     current_email: str,
@@ -1,27 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status, UploadFile, File
 from routes.utils import verify_token, extract_user_id
 from services.supabase_service import supabase_service
-from models.resume import ResumeUploadResponse
+from services.resume_service import resume_service
+from models.resume import ResumeUploadResponse, LatestResumeResponse
+from responses import conditional_json
 import PyPDF2
 import io
+import os
+import asyncio
+from typing import BinaryIO
 from datetime import datetime
 
 router = APIRouter(prefix="/resume", tags=["Resume"])
 
+# Largest resume accepted; BodySizeLimitMiddleware enforces it while the upload streams in
+MAX_RESUME_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(10 * 1024 * 1024)))
 
-def extract_text_from_pdf(file_content: bytes) -> str:
+# Room for the multipart boundaries and headers around the file
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
+
+# PDF readers accept the header anywhere in the first 1 KB
+PDF_MAGIC = b"%PDF-"
+PDF_HEADER_WINDOW = 1024
+
+
+def extract_text_from_pdf(pdf_file: BinaryIO) -> str:
     """
     Extract text content from PDF file
     
     Args:
-        file_content: PDF file bytes
+        pdf_file: Seekable PDF file object (read in place, not copied)
     
     Returns:
         Extracted text content
     """
     
     try:
-        pdf_file = io.BytesIO(file_content)
         pdf_reader = PyPDF2.PdfReader(pdf_file)
         
         text = ""
@@ -95,11 +109,26 @@ async def upload_resume(
         else:
             print(f"[RESUME] User exists in database: {existing_user.get('email')}")
         
-        # Read file content
-        file_content = await file.read()
+        # Starlette has already spooled the upload in chunks (in memory up to 1 MB,
+        # then on disk); parse and upload straight from that file without copying it
+        if file.size is not None and file.size > MAX_RESUME_BYTES:
+            raise HTTPException(
+                status_code=status.HTTP_413_CONTENT_TOO_LARGE,
+                detail=f"Resume must be at most {MAX_RESUME_BYTES // (1024 * 1024)} MB"
+            )
+        
+        pdf_file = io.BufferedReader(file.file)
+        
+        # FileSignatureMiddleware checks this while the upload streams in; checked again
+        # here for requests it can't scan (e.g. file headers past its scan limit)
+        if PDF_MAGIC not in pdf_file.peek(PDF_HEADER_WINDOW)[:PDF_HEADER_WINDOW]:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="The file is not a valid PDF"
+            )
         
-        # Extract text from PDF
-        extracted_text = extract_text_from_pdf(file_content)
+        # Extract text from PDF (CPU-bound, off the event loop)
+        extracted_text = await asyncio.to_thread(extract_text_from_pdf, pdf_file)
         
         if not extracted_text:
             raise HTTPException(
@@ -112,10 +141,11 @@ async def upload_resume(
         file_path = f"{user_id}/resumes/resume_{timestamp}.pdf"
         
         # Upload to Supabase Storage
+        pdf_file.seek(0)
         uploaded_path = await supabase_service.upload_file(
             bucket="resumes",
             file_path=file_path,
-            file_data=file_content
+            file_data=pdf_file
         )
         
         if not uploaded_path:
@@ -141,6 +171,9 @@ async def upload_resume(
                 detail="Failed to save resume metadata to database. Please check if your user account exists in the database and try again. Check server logs for details."
             )
         
+        # The next generate-email request will most likely reference this resume
+        resume_service.remember(user_id, {**resume, "extracted_text": extracted_text}, latest=True)
+        
         return ResumeUploadResponse(
             id=resume["id"],
             file_path=file_path,
@@ -157,19 +190,29 @@ async def upload_resume(
         )
 
 
-@router.get("/latest")
-async def get_latest_resume(payload: dict = Depends(verify_token)):
+@router.get("/latest", response_model=LatestResumeResponse)
+async def get_latest_resume(
+    request: Request,
+    include_text: bool = Query(True, description="Include extracted_text; pass false for metadata only"),
+    payload: dict = Depends(verify_token)
+):
     """
     Get user's most recently uploaded resume
     
+    Sends an ETag and Last-Modified (the upload time); returns 304 without
+    serializing the resume when the client's copy is current.
+    
+    Args:
+        include_text: Whether to include the extracted text
+    
     Returns:
-        Latest resume data including extracted text
+        Latest resume data, with extracted text unless include_text is false
     """
     
     try:
         user_id = extract_user_id(payload)
         
-        resume = await supabase_service.get_latest_resume(user_id)
+        resume = await supabase_service.get_latest_resume(user_id, include_text=include_text)
         
         if not resume:
             raise HTTPException(
@@ -177,10 +220,16 @@ async def get_latest_resume(payload: dict = Depends(verify_token)):
                 detail="No resume found. Please upload a resume first."
             )
         
-        return {
-            "success": True,
-            "resume": resume
-        }
+        # Resumes never change after upload: a new id or upload time is a new version
+        return conditional_json(
+            request,
+            {
+                "success": True,
+                "resume": resume
+            },
+            version=(resume["id"], resume.get("uploaded_at"), include_text),
+            last_modified=resume.get("uploaded_at")
+        )
     
     except HTTPException:
         raise
@@ -223,6 +272,7 @@ async def delete_resume(resume_id: str, payload: dict = Depends(verify_token)):
         
         # Delete from database
         deleted = await supabase_service.delete_resume(resume_id, user_id)
+        resume_service.forget(user_id, resume_id)
         
         if not deleted:
             raise HTTPException(
@@ -1,8 +1,10 @@
 import jwt
 import os
-from fastapi import Header, HTTPException, status
+import math
+from fastapi import Depends, Header, HTTPException, status
 from typing import Optional
 from dotenv import load_dotenv
+from services.rate_limiter import rate_limiter
 
 load_dotenv()
 
@@ -120,3 +122,57 @@ def extract_user_email(payload: dict) -> str:
         )
     
     return email
+
+
+def rate_limit(route: str, upstream: Optional[str] = None):
+    """
+    Build a dependency that authenticates the request and enforces rate limits
+
+    Args:
+        route: Per-user route bucket (see RateLimiter.route_limits)
+        upstream: Optional global upstream bucket (see RateLimiter.upstream_limits)
+
+    Returns:
+        Dependency returning the decoded token payload, like verify_token
+
+    Raises:
+        HTTPException: 429 with a Retry-After header when a bucket is empty
+    """
+
+    async def dependency(payload: dict = Depends(verify_token)) -> dict:
+        user_id = extract_user_id(payload)
+        decision = rate_limiter.check(user_id, route, upstream)
+
+        if not decision.allowed:
+            raise _rate_limit_exceeded(decision)
+
+        return payload
+
+    return dependency
+
+
+def upstream_limit_exceeded(upstream: str, cost: float = 1.0) -> Optional[HTTPException]:
+    """
+    Take tokens from a global upstream bucket
+
+    Used by routes that only call the upstream on some requests (e.g. to top up
+    results served locally), or make several upstream calls per request.
+
+    Args:
+        upstream: Upstream provider key (see RateLimiter.upstream_limits)
+        cost: Number of upstream calls the request makes
+
+    Returns:
+        A 429 HTTPException to raise if the bucket is empty, otherwise None
+    """
+
+    decision = rate_limiter.check_upstream(upstream, cost)
+    return None if decision.allowed else _rate_limit_exceeded(decision)
+
+
+def _rate_limit_exceeded(decision) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+        detail="Rate limit exceeded. Please wait before trying again.",
+        headers={"Retry-After": str(max(1, math.ceil(decision.retry_after)))}
+    )
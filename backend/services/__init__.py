@@ -3,10 +3,14 @@ from .supabase_service import supabase_service
 from .llm_service import llm_service
 from .resend_service import resend_service
 from .scraper_service import scraper_service
+from .dedup_service import dedup_service
+from .email_quality import email_quality
 
 __all__ = [
     "supabase_service",
     "llm_service",
     "resend_service",
     "scraper_service",
+    "dedup_service",
+    "email_quality",
 ]
@@ -0,0 +1,250 @@
+import os
+import time
+import threading
+from collections import deque
+from typing import Callable, Dict, Optional
+from dotenv import load_dotenv
+
+from services.metrics import metrics
+
+load_dotenv()
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a dependency whose breaker is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable (circuit open, retry in {retry_after:.0f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def is_upstream_failure(exc: BaseException) -> bool:
+    """
+    Whether an exception says the dependency is unhealthy
+
+    Client errors (4xx other than 408/429) mean the request was bad, not the
+    service, so they don't count towards opening the breaker.
+    """
+    status = getattr(exc, "status_code", None)
+    if status is None:
+        status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status is None:
+        status = getattr(exc, "code", None)
+
+    try:
+        status = int(status)
+    except (TypeError, ValueError):
+        return True
+
+    return not (400 <= status < 500) or status in (408, 429)
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker over a rolling error-rate window
+
+    Closed: calls go through; when at least `min_calls` calls in the last
+    `window_seconds` failed at `error_rate` or more, the breaker opens.
+    Open: calls fail immediately with CircuitOpenError for `open_seconds`.
+    Half-open: up to `half_open_calls` trial calls go through; a success
+    closes the breaker, a failure re-opens it.
+
+    Use as a context manager around one call to the dependency:
+
+        with breaker:
+            response = requests.get(...)
+
+        async with breaker:
+            response = await client.create(...)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        error_rate: Optional[float] = None,
+        window_seconds: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        open_seconds: Optional[float] = None,
+        half_open_calls: int = 1,
+        is_failure: Callable[[BaseException], bool] = is_upstream_failure
+    ):
+        self.name = name
+        self.error_rate = error_rate if error_rate is not None else float(os.getenv("CIRCUIT_BREAKER_ERROR_RATE", "0.5"))
+        self.window_seconds = window_seconds if window_seconds is not None else float(os.getenv("CIRCUIT_BREAKER_WINDOW_SECONDS", "60"))
+        self.min_calls = min_calls if min_calls is not None else int(os.getenv("CIRCUIT_BREAKER_MIN_CALLS", "5"))
+        self.open_seconds = open_seconds if open_seconds is not None else float(os.getenv("CIRCUIT_BREAKER_OPEN_SECONDS", "30"))
+        self.half_open_calls = half_open_calls
+        self.is_failure = is_failure
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        # (monotonic time, failed) per call in the window
+        self._calls: deque = deque()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def before_call(self) -> None:
+        """Admit a call or raise CircuitOpenError"""
+        now = time.monotonic()
+
+        with self._lock:
+            state = self._current_state(now)
+
+            if state == OPEN:
+                metrics.inc("circuit_breaker_rejections_total", dependency=self.name)
+                raise CircuitOpenError(self.name, self._opened_at + self.open_seconds - now)
+
+            if state == HALF_OPEN:
+                if self._trials >= self.half_open_calls:
+                    metrics.inc("circuit_breaker_rejections_total", dependency=self.name)
+                    raise CircuitOpenError(self.name, 1.0)
+                self._trials += 1
+
+    def record_success(self) -> None:
+        now = time.monotonic()
+
+        with self._lock:
+            if self._current_state(now) == HALF_OPEN:
+                self._transition(CLOSED, now)
+            self._record(now, failed=False)
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+
+        with self._lock:
+            state = self._current_state(now)
+            self._record(now, failed=True)
+
+            if state == HALF_OPEN:
+                self._transition(OPEN, now)
+                return
+
+            if state == CLOSED and len(self._calls) >= self.min_calls:
+                failures = sum(1 for _, failed in self._calls if failed)
+                if failures / len(self._calls) >= self.error_rate:
+                    self._transition(OPEN, now)
+
+    def available(self) -> bool:
+        """Whether a call would currently be admitted (without reserving a trial slot)"""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            return state == CLOSED or (state == HALF_OPEN and self._trials < self.half_open_calls)
+
+    def snapshot(self) -> Dict:
+        """State and window statistics for health reporting"""
+        now = time.monotonic()
+
+        with self._lock:
+            state = self._current_state(now)
+            self._prune(now)
+            calls = len(self._calls)
+            failures = sum(1 for _, failed in self._calls if failed)
+
+            snapshot = {
+                "state": state,
+                "calls": calls,
+                "failures": failures,
+                "error_rate": round(failures / calls, 3) if calls else 0.0,
+            }
+            if state == OPEN:
+                snapshot["retry_in"] = round(max(0.0, self._opened_at + self.open_seconds - now), 1)
+            return snapshot
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now >= self._opened_at + self.open_seconds:
+            self._transition(HALF_OPEN, now)
+        return self._state
+
+    def _transition(self, state: str, now: float) -> None:
+        if state == self._state:
+            return
+
+        print(f"[BREAKER] {self.name}: {self._state} -> {state}")
+        self._state = state
+        self._trials = 0
+        if state == OPEN:
+            self._opened_at = now
+        if state == CLOSED:
+            # Start the closed state with a clean window
+            self._calls.clear()
+
+    def _record(self, now: float, failed: bool) -> None:
+        self._calls.append((now, failed))
+        self._prune(now)
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    def _exit(self, exc: Optional[BaseException]) -> None:
+        if exc is None:
+            self.record_success()
+        elif isinstance(exc, CircuitOpenError):
+            pass
+        elif not isinstance(exc, Exception):
+            # Cancelled: free the trial slot without judging the dependency
+            with self._lock:
+                self._trials = max(0, self._trials - 1)
+        elif self.is_failure(exc):
+            self.record_failure()
+        else:
+            # The dependency answered; the request itself was bad
+            self.record_success()
+
+    def __enter__(self) -> "CircuitBreaker":
+        self.before_call()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._exit(exc)
+        return False
+
+    async def __aenter__(self) -> "CircuitBreaker":
+        self.before_call()
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        self._exit(exc)
+        return False
+
+
+class CircuitBreakerRegistry:
+    """Named breakers shared by the services, reported on /health and /metrics"""
+
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+        metrics.describe("circuit_breaker_state", "gauge", "Circuit breaker state (0 closed, 1 half-open, 2 open)")
+        metrics.describe("circuit_breaker_rejections_total", "counter", "Calls rejected by an open circuit breaker")
+        metrics.register_collector(self._collect)
+
+    def get(self, name: str, **options) -> CircuitBreaker:
+        """The breaker for a dependency, created with `options` on first use"""
+        if name not in self._breakers:
+            self._breakers[name] = CircuitBreaker(name, **options)
+        return self._breakers[name]
+
+    def snapshot(self) -> Dict[str, Dict]:
+        return {name: breaker.snapshot() for name, breaker in sorted(self._breakers.items())}
+
+    def _collect(self):
+        for name, breaker in self._breakers.items():
+            yield "circuit_breaker_state", {"dependency": name}, _STATE_VALUES[breaker.state]
+
+
+# Singleton instance
+circuit_breakers = CircuitBreakerRegistry()
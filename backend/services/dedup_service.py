@@ -0,0 +1,179 @@
+import re
+import hashlib
+from typing import Optional, List, Dict, Any, Iterable, Tuple
+
+
+# Legal suffixes that differ between sources for the same company
+COMPANY_SUFFIXES = {
+    "pvt", "private", "ltd", "limited", "inc", "incorporated", "llc", "llp",
+    "corp", "corporation", "co", "company", "plc", "gmbh",
+}
+
+# Title words that don't distinguish one posting from another
+TITLE_NOISE = {"intern", "internship", "interns", "trainee", "opening", "hiring", "role", "position"}
+
+# City spellings used interchangeably by job boards
+LOCATION_ALIASES = {
+    "bengaluru": "bangalore",
+    "gurugram": "gurgaon",
+    "bombay": "mumbai",
+    "madras": "chennai",
+    "calcutta": "kolkata",
+    "new delhi": "delhi",
+    "anywhere": "remote",
+    "work from home": "remote",
+}
+
+# Sites that re-host postings; a company-site link is preferred over these
+AGGREGATOR_DOMAINS = ("linkedin.com", "indeed.com", "naukri.com", "glassdoor", "internshala.com", "google.com")
+
+_NON_ALNUM = re.compile(r"[^a-z0-9+#]+")
+_BRACKETS = re.compile(r"\([^)]*\)|\[[^\]]*\]")
+_YEAR = re.compile(r"\b20\d\d\b")
+
+
+def _fields(listing: Any) -> Iterable[Tuple[str, Any]]:
+    """(key, value) pairs of a stored listing dict or an InternshipRecord"""
+    if isinstance(listing, dict):
+        return listing.items()
+    return ((field, getattr(listing, field)) for field in listing.__struct_fields__)
+
+
+def _set(listing: Any, key: str, value: Any) -> None:
+    if isinstance(listing, dict):
+        listing[key] = value
+    elif key in listing.__struct_fields__:
+        # Stored-only columns (id, created_at, ...) don't apply to a scraped record
+        setattr(listing, key, value)
+
+
+class DedupService:
+    """Detects duplicate internship listings across sources, queries and links"""
+
+    def __init__(self, simhash_distance: int = 3, min_description_words: int = 20):
+        # Descriptions whose SimHashes differ in at most this many bits are near-duplicates
+        self.simhash_distance = simhash_distance
+        self.min_description_words = min_description_words
+
+    # Normalization
+    def normalize_company(self, company: Optional[str]) -> str:
+        words = _NON_ALNUM.sub(" ", (company or "").lower()).split()
+        while len(words) > 1 and words[-1] in COMPANY_SUFFIXES:
+            words.pop()
+        return " ".join(words)
+
+    def normalize_title(self, title: Optional[str]) -> str:
+        title = _YEAR.sub(" ", _BRACKETS.sub(" ", (title or "").lower()))
+        words = {word for word in _NON_ALNUM.sub(" ", title).split() if word not in TITLE_NOISE}
+        # Word order varies between sources ("Intern - Software Engineer")
+        return " ".join(sorted(words))
+
+    def normalize_location(self, location: Optional[str]) -> str:
+        city = (location or "").lower().split(",")[0].strip()
+        city = " ".join(_NON_ALNUM.sub(" ", city).split())
+        return LOCATION_ALIASES.get(city, city)
+
+    def fingerprint(self, internship: Dict[str, Any]) -> str:
+        """Stable identity of a posting: hash of normalized company, title and location"""
+        key = "|".join((
+            self.normalize_company(internship.get("company")),
+            self.normalize_title(internship.get("title")),
+            self.normalize_location(internship.get("location")),
+        ))
+        return hashlib.blake2b(key.encode("utf-8"), digest_size=8).hexdigest()
+
+    # Near-duplicate detection
+    def simhash(self, text: Optional[str]) -> Optional[int]:
+        """64-bit SimHash over word 3-shingles, or None for descriptions too short to compare"""
+
+        words = _NON_ALNUM.sub(" ", (text or "").lower()).split()
+        if len(words) < self.min_description_words:
+            return None
+
+        weights = [0] * 64
+        for i in range(len(words) - 2):
+            shingle = " ".join(words[i:i + 3]).encode("utf-8")
+            value = int.from_bytes(hashlib.blake2b(shingle, digest_size=8).digest(), "big")
+            for bit in range(64):
+                weights[bit] += 1 if value >> bit & 1 else -1
+
+        return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+    def is_near_duplicate(self, first: Optional[int], second: Optional[int]) -> bool:
+        if first is None or second is None:
+            return False
+        return bin(first ^ second).count("1") <= self.simhash_distance
+
+    # Merging
+    def merge(self, primary: Dict[str, Any], duplicate: Dict[str, Any]) -> Dict[str, Any]:
+        """Fill gaps in `primary` from `duplicate`, preferring company-site links and longer descriptions"""
+
+        for key, value in _fields(duplicate):
+            if value and not primary.get(key):
+                _set(primary, key, value)
+
+        if self._is_aggregator(primary.get("link")) and duplicate.get("link") and not self._is_aggregator(duplicate.get("link")):
+            _set(primary, "link", duplicate.get("link"))
+
+        if len(duplicate.get("description") or "") > len(primary.get("description") or ""):
+            _set(primary, "description", duplicate.get("description"))
+
+        return primary
+
+    def deduplicate(self, internships: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Merge duplicate listings, keeping the first occurrence's position
+
+        Listings are duplicates when their fingerprints match, or when they are
+        at the same company and their descriptions are near-duplicates.
+        Every returned listing has a `fingerprint` key.
+
+        Args:
+            internships: Scraped InternshipRecords and/or stored internship dictionaries
+
+        Returns:
+            De-duplicated listings (merged into the first occurrence)
+        """
+
+        unique: List[Dict[str, Any]] = []
+        by_fingerprint: Dict[str, Dict[str, Any]] = {}
+        # Per normalized company: (simhash, listing) pairs
+        by_company: Dict[str, List[tuple]] = {}
+
+        for internship in internships:
+            fingerprint = internship.get("fingerprint") or self.fingerprint(internship)
+
+            existing = by_fingerprint.get(fingerprint)
+            if existing is not None:
+                self.merge(existing, internship)
+                continue
+
+            company = self.normalize_company(internship.get("company"))
+            signature = self.simhash(internship.get("description"))
+
+            near = next(
+                (listing for other, listing in by_company.get(company, []) if self.is_near_duplicate(signature, other)),
+                None
+            )
+            if near is not None:
+                self.merge(near, internship)
+                by_fingerprint[fingerprint] = near
+                continue
+
+            _set(internship, "fingerprint", fingerprint)
+            by_fingerprint[fingerprint] = internship
+            by_company.setdefault(company, []).append((signature, internship))
+            unique.append(internship)
+
+        if len(unique) < len(internships):
+            print(f"[DEDUP] Merged {len(internships) - len(unique)} duplicate listings")
+
+        return unique
+
+    @staticmethod
+    def _is_aggregator(link: Optional[str]) -> bool:
+        return bool(link) and any(domain in link for domain in AGGREGATOR_DOMAINS)
+
+
+# Singleton instance
+dedup_service = DedupService()
@@ -0,0 +1,377 @@
+import re
+from dataclasses import dataclass, field
+from typing import Optional, List, Dict, Tuple
+from services.cache import TTLCache
+from services.prompt_builder import RESUME_HEADINGS
+
+
+# Red flags that indicate generic content
+GENERIC_PHRASES = [
+    "various projects",
+    "multiple projects",
+    "several projects",
+    "many projects",
+    "various technologies",
+    "multiple technologies",
+    "several technologies",
+    "different technologies",
+    "a recent project",
+    "one of my projects",
+    "some projects",
+    "i have experience",
+    "i am passionate",
+    "highly motivated",
+    "dear hiring",
+    "i am writing to",
+    "i would be grateful",
+]
+
+# Canonical technology name -> spellings found in resumes
+TECH_PATTERNS: Dict[str, List[str]] = {
+    "Python": ["python"],
+    "JavaScript": ["javascript", "js"],
+    "TypeScript": ["typescript", "ts"],
+    "React": ["react", "reactjs"],
+    "Node.js": ["node", "nodejs", "node.js"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi", "fast api"],
+    "TensorFlow": ["tensorflow", "tf"],
+    "PyTorch": ["pytorch", "torch"],
+    "C++": ["c++", "cpp"],
+    "C": ["c", "c programming"],
+    "Java": ["java"],
+    "SQL": ["sql", "mysql", "postgresql"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "AWS": ["aws", "amazon web services"],
+    "Git": ["git", "github"],
+    "Linux": ["linux", "ubuntu"],
+    "Arduino": ["arduino"],
+    "Raspberry Pi": ["raspberry pi", "raspi"],
+    "STM32": ["stm32", "stm"],
+    "ESP32": ["esp32", "esp"],
+    "FreeRTOS": ["freertos", "rtos"],
+    "TensorFlow Lite": ["tensorflow lite", "tflite"],
+    "MQTT": ["mqtt"],
+    "REST API": ["rest", "restful", "rest api"],
+    "Next.js": ["next.js", "nextjs"],
+    "Tailwind": ["tailwind"],
+    "Vue": ["vue", "vuejs"],
+    "Angular": ["angular"],
+    "Express": ["express", "expressjs"],
+    "Redis": ["redis"],
+    "Supabase": ["supabase"],
+    "Firebase": ["firebase"],
+    "LLM": ["llm", "large language model"],
+    "OpenAI": ["openai", "gpt"],
+    "Gemini": ["gemini"],
+    "NLP": ["nlp", "natural language"],
+    "Computer Vision": ["computer vision", "cv", "image processing"],
+}
+
+
+def _trie_pattern(phrases: List[str]) -> str:
+    """
+    Regex alternation of `phrases` factored into a prefix trie
+
+    Python's re tries alternatives one by one; sharing prefixes ("i am passionate",
+    "i am writing to") keeps a multi-phrase scan close to a single-phrase one.
+    Longer phrases win over their prefixes ("tensorflow lite" over "tensorflow").
+    """
+    trie: dict = {}
+    for phrase in phrases:
+        node = trie
+        for char in " ".join(phrase.lower().split()):
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: dict) -> str:
+        branches = [
+            (r"\s+" if char == " " else re.escape(char)) + build(child)
+            for char, child in sorted(node.items()) if char
+        ]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+def _first_chars(phrases: List[str]) -> str:
+    return "".join(sorted({re.escape(phrase[0].lower()) for phrase in phrases if phrase}))
+
+
+# Word boundaries that also treat + # . as part of a term (C++, C#, Node.js)
+_TERM_START = r"(?<![\w+#.])"
+_TERM_END = r"(?![\w+#]|\.\w)"
+
+# Matched against lowercased text; the first-character lookahead skips most positions cheaply
+_GENERIC = re.compile(rf"(?=[{_first_chars(GENERIC_PHRASES)}])\b{_trie_pattern(GENERIC_PHRASES)}\b")
+_TECH_SPELLINGS = [spelling for spellings in TECH_PATTERNS.values() for spelling in spellings]
+_TECH = re.compile(
+    rf"(?=[{_first_chars(_TECH_SPELLINGS)}]){_TERM_START}{_trie_pattern(_TECH_SPELLINGS)}{_TERM_END}",
+    re.IGNORECASE
+)
+_TECH_NAMES = {
+    " ".join(spelling.split()): name
+    for name, spellings in TECH_PATTERNS.items()
+    for spelling in spellings
+}
+# Spellings that are also everyday words ("the rest of", "express interest") only
+# count when capitalized as in a tech stack
+_CASED_SPELLINGS = {
+    "c", "ts", "tf", "cv", "esp", "stm", "git", "rest", "express", "react", "node", "torch",
+    "flask", "angular", "gemini", "java", "vue", "mongo",
+}
+_BULLET = re.compile(r"^\s*(?:[•●▪◦‣*\-–]|\d+[.)])\s+")
+# Separators between a project's name and its description ("Internify — AI outreach platform")
+_PROJECT_NAME_END = re.compile(r"\s+[—–\-|:]\s+|\s*[(:|]")
+_PROJECT_WORD = re.compile(r"\b[A-Z][a-z]*[A-Z0-9][A-Za-z0-9]*\b|\b[A-Z][a-z]{3,}\b")
+_PROJECT_CONTEXT = re.compile(r"\b(?:project|built|developed|created|designed|implemented)\b", re.IGNORECASE)
+_COMMON_WORDS = {
+    "The", "This", "That", "With", "From", "Into", "Built", "Developed", "Created", "Designed",
+    "Implemented", "Project", "Projects", "Professional", "Education", "Experience", "Skills",
+}
+
+
+@dataclass
+class QualityRules:
+    """Thresholds and weights for email validation and scoring"""
+    max_generic_phrases: int = 1
+    min_words: int = 100
+    max_words: Optional[int] = None
+    target_words: Tuple[int, int] = (140, 180)
+    # Resume projects / technologies the email must name (0 = scored but not required)
+    min_projects: int = 0
+    min_technologies: int = 0
+    entity_weight: float = 2.0
+    max_scored_entities: int = 8
+    generic_weight: float = 3.0
+    words_per_length_point: float = 20.0
+
+
+@dataclass
+class ResumeEntities:
+    """Projects and technologies named in a resume, with a compiled pattern to find them in an email"""
+    projects: List[str] = field(default_factory=list)
+    technologies: List[str] = field(default_factory=list)
+    _pattern: Optional[re.Pattern] = field(default=None, repr=False)
+
+    def __post_init__(self):
+        spellings = list(self.projects)
+        for name in self.technologies:
+            spellings.extend(spelling for spelling, canonical in _TECH_NAMES.items() if canonical == name)
+        if spellings:
+            self._pattern = re.compile(
+                f"(?=[{_first_chars(spellings)}]){_TERM_START}{_trie_pattern(spellings)}{_TERM_END}",
+                re.IGNORECASE
+            )
+
+    def mentioned_in(self, text: str) -> Tuple[List[str], List[str]]:
+        """Projects and technologies mentioned in `text`, in canonical form"""
+        if self._pattern is None:
+            return [], []
+
+        found = {_term(match) for match in self._pattern.finditer(text)}
+        found.discard(None)
+        projects = [project for project in self.projects if project.lower() in found]
+        technologies = sorted({_TECH_NAMES[term] for term in found if term in _TECH_NAMES} & set(self.technologies))
+        return projects, technologies
+
+
+@dataclass
+class QualityReport:
+    """Result of validating one email"""
+    word_count: int
+    generic_phrases: List[str]
+    projects: List[str]
+    technologies: List[str]
+    score: float
+    problems: List[str]
+
+    @property
+    def passed(self) -> bool:
+        return not self.problems
+
+
+class EmailQualityValidator:
+    """Validates and scores generated emails against a resume"""
+
+    def __init__(self, rules: Optional[QualityRules] = None, entity_cache_size: int = 256):
+        self.rules = rules or QualityRules()
+        # Resumes are re-checked for every candidate and chunk; extract their entities once
+        self._entities = TTLCache(maxsize=entity_cache_size, ttl=3600)
+
+    def extract_entities(self, resume_text: Optional[str]) -> ResumeEntities:
+        """Projects (entry lines under a projects heading) and known technologies in a resume"""
+        resume_text = resume_text or ""
+        cached = self._entities.get(resume_text)
+        if cached is not None:
+            return cached
+
+        entities = ResumeEntities(
+            projects=self._projects(resume_text),
+            technologies=technologies(resume_text),
+        )
+        self._entities.set(resume_text, entities)
+        return entities
+
+    def check(self, email_text: str, entities: Optional[ResumeEntities] = None) -> QualityReport:
+        """
+        Validate and score an email
+
+        Args:
+            email_text: Generated email body
+            entities: Entities of the resume the email was written from
+
+        Returns:
+            Quality report; `passed` is False when any rule is broken
+        """
+
+        rules = self.rules
+        word_count = len(email_text.split())
+        generic = [" ".join(match.group().split()) for match in _GENERIC.finditer(email_text.lower())]
+        projects, techs = entities.mentioned_in(email_text) if entities else ([], [])
+
+        problems = []
+        if len(set(generic)) > rules.max_generic_phrases:
+            problems.append(f"too generic ({len(set(generic))} generic phrases found)")
+        if word_count < rules.min_words:
+            problems.append(f"too short ({word_count} words)")
+        if rules.max_words is not None and word_count > rules.max_words:
+            problems.append(f"too long ({word_count} words)")
+        if entities and len(projects) < min(rules.min_projects, len(entities.projects)):
+            problems.append(f"names {len(projects)} resume projects, needs {rules.min_projects}")
+        if entities and len(techs) < min(rules.min_technologies, len(entities.technologies)):
+            problems.append(f"names {len(techs)} resume technologies, needs {rules.min_technologies}")
+
+        low, high = rules.target_words
+        length_penalty = max(0, low - word_count, word_count - high) / rules.words_per_length_point
+        score = (
+            rules.entity_weight * min(len(projects) + len(techs), rules.max_scored_entities)
+            - rules.generic_weight * len(set(generic))
+            - length_penalty
+        )
+
+        return QualityReport(
+            word_count=word_count,
+            generic_phrases=generic,
+            projects=projects,
+            technologies=techs,
+            score=score,
+            problems=problems,
+        )
+
+    def stream(self, entities: Optional[ResumeEntities] = None) -> "QualityStream":
+        """Incremental checker for an email arriving in chunks"""
+        return QualityStream(self, entities)
+
+    def _projects(self, resume_text: str) -> List[str]:
+        projects = []
+        in_projects = False
+
+        for raw_line in resume_text.splitlines():
+            line = raw_line.strip()
+            if not line:
+                continue
+
+            normalized = line.rstrip(":").strip().lower()
+            if normalized in RESUME_HEADINGS or (line.isupper() and len(line.split()) <= 4):
+                in_projects = "project" in normalized
+                continue
+
+            if in_projects and not _BULLET.match(line):
+                name = _PROJECT_NAME_END.split(line, maxsplit=1)[0].strip()
+                if name and len(name.split()) <= 5 and name not in projects:
+                    projects.append(name)
+
+        if projects:
+            return projects
+
+        # No projects section: capitalized names near project verbs
+        for line in resume_text.splitlines():
+            if not _PROJECT_CONTEXT.search(line):
+                continue
+            for word in _PROJECT_WORD.findall(line):
+                if word not in _COMMON_WORDS and word not in projects and word.lower() not in _TECH_NAMES:
+                    projects.append(word)
+
+        return projects[:5]
+
+
+class QualityStream:
+    """
+    Generic-phrase check over an email arriving in chunks
+
+    Each chunk is scanned together with a short tail of the previous text,
+    so phrases split across chunks are found without rescanning everything.
+    """
+
+    def __init__(self, validator: EmailQualityValidator, entities: Optional[ResumeEntities] = None):
+        self.validator = validator
+        self.entities = entities
+        self.text = ""
+        self._lower = ""
+        self.generic_phrases: List[str] = []
+        self._overlap = max(len(phrase) for phrase in GENERIC_PHRASES)
+        self._scanned = 0
+
+    def feed(self, chunk: str) -> int:
+        """
+        Add a chunk
+
+        Returns:
+            Distinct generic phrases seen so far
+        """
+
+        self.text += chunk
+        self._lower += chunk.lower()
+        # Only text up to the last whitespace is final; the last word may continue
+        boundary = max(self._lower.rfind(" "), self._lower.rfind("\n"))
+        if boundary <= self._scanned:
+            return len(set(self.generic_phrases))
+
+        start = max(0, self._scanned - self._overlap)
+        for match in _GENERIC.finditer(self._lower, start, boundary):
+            # Matches ending in already-scanned text were counted by an earlier chunk
+            if match.end() > self._scanned:
+                self.generic_phrases.append(" ".join(match.group().split()))
+
+        self._scanned = boundary
+        return len(set(self.generic_phrases))
+
+    @property
+    def too_generic(self) -> bool:
+        return len(set(self.generic_phrases)) > self.validator.rules.max_generic_phrases
+
+    def report(self) -> QualityReport:
+        """Full report over the text received so far"""
+        return self.validator.check(self.text, self.entities)
+
+
+def _term(match: re.Match) -> Optional[str]:
+    """Normalized matched term, or None for a lowercase everyday-word spelling"""
+    term = " ".join(match.group().lower().split())
+    if term in _CASED_SPELLINGS and not match.group()[0].isupper():
+        return None
+    return term
+
+
+def technologies(text: str) -> List[str]:
+    """Known technologies named in `text`, canonical names in first-seen order"""
+    found = []
+    for match in _TECH.finditer(text or ""):
+        term = _term(match)
+        if term is None:
+            continue
+        name = _TECH_NAMES[term]
+        if name not in found:
+            found.append(name)
+    return found
+
+
+# Singleton instance
+email_quality = EmailQualityValidator()
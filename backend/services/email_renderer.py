@@ -0,0 +1,180 @@
+import re
+from html import escape
+from string import Template
+from typing import Dict, Iterable, List, NamedTuple
+
+
+class RenderedEmail(NamedTuple):
+    """Both parts of an outbound email"""
+    html: str
+    text: str
+
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <style>
+        body {
+            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
+            line-height: 1.6;
+            color: #333;
+            max-width: 600px;
+            margin: 0 auto;
+            padding: 20px;
+        }
+        .email-content {
+            margin-bottom: 30px;
+        }
+        .email-content p {
+            margin: 0 0 1em;
+        }
+        .footer {
+            margin-top: 40px;
+            padding-top: 20px;
+            border-top: 1px solid #e0e0e0;
+            font-size: 12px;
+            color: #666;
+            text-align: center;
+        }
+        .footer a {
+            color: #4f46e5;
+            text-decoration: none;
+        }
+    </style>
+</head>
+<body>
+    <div class="email-content">
+        $content
+    </div>
+
+    <div class="footer">
+        <p>This email was sent via <a href="$site_url" target="_blank">$site_name</a></p>
+        <p style="font-size: 11px; color: #999;">
+            If you'd like to stop receiving emails from this sender, please reply directly to them.
+        </p>
+    </div>
+</body>
+</html>
+"""
+
+TEXT_TEMPLATE = """$content
+
+--
+This email was sent via $site_name ($site_url)
+If you'd like to stop receiving emails from this sender, please reply directly to them.
+"""
+
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+
+
+class CompiledTemplate:
+    """
+    A string.Template split into literal and placeholder parts once
+
+    `render` joins the parts instead of re-scanning the template source on
+    every call, and fills placeholders given at compile time up front.
+    """
+
+    def __init__(self, source: str, **constants: str):
+        self.parts: List[str] = []
+        # Index in `parts` -> placeholder name, for the per-render placeholders
+        self.slots: Dict[int, str] = {}
+
+        literal = []
+        position = 0
+        for match in Template.pattern.finditer(source):
+            literal.append(source[position:match.start()])
+            position = match.end()
+
+            if match.group("escaped") is not None:
+                literal.append("$")
+                continue
+
+            name = match.group("named") or match.group("braced")
+            if name is None:
+                raise ValueError(f"Invalid placeholder in template at offset {match.start()}")
+
+            if name in constants:
+                literal.append(constants[name])
+                continue
+
+            self.parts.append("".join(literal))
+            literal = []
+            self.slots[len(self.parts)] = name
+            self.parts.append("")
+
+        literal.append(source[position:])
+        self.parts.append("".join(literal))
+
+    def render(self, **values: str) -> str:
+        if len(self.slots) == 1:
+            # The common case: one document around one placeholder
+            (index, name), = self.slots.items()
+            return self.parts[0] + values[name] + self.parts[2]
+
+        parts = self.parts.copy()
+        for index, name in self.slots.items():
+            parts[index] = values[name]
+        return "".join(parts)
+
+
+class EmailRenderer:
+    """
+    Renders a plain-text email body into the HTML and text/plain parts sent via Resend
+
+    The body is always treated as text: it is HTML-escaped, blank lines become
+    paragraphs and single newlines line breaks.
+    """
+
+    def __init__(self, site_name: str = "Internify", site_url: str = "https://internify.app"):
+        constants = {"site_name": escape(site_name), "site_url": escape(site_url)}
+        self.html_template = CompiledTemplate(HTML_TEMPLATE, **constants)
+        self.text_template = CompiledTemplate(TEXT_TEMPLATE, site_name=site_name, site_url=site_url)
+
+    def render(self, body: str) -> RenderedEmail:
+        """
+        Render one email body
+
+        Args:
+            body: Email body as plain text
+
+        Returns:
+            RenderedEmail with the html and text parts
+        """
+
+        text = (body or "").replace("\r\n", "\n").replace("\r", "\n").strip()
+
+        return RenderedEmail(
+            html=self.html_template.render(content=self._to_html(text)),
+            text=self.text_template.render(content=text)
+        )
+
+    def render_batch(self, bodies: Iterable[str]) -> List[RenderedEmail]:
+        """
+        Render many email bodies, in order
+
+        Identical bodies (the same email to several recipients) are rendered once.
+        """
+
+        rendered: Dict[str, RenderedEmail] = {}
+        results = []
+        for body in bodies:
+            email = rendered.get(body)
+            if email is None:
+                email = rendered[body] = self.render(body)
+            results.append(email)
+        return results
+
+    @staticmethod
+    def _to_html(text: str) -> str:
+        if not text:
+            return ""
+        # Escape first: nothing in the body can open a tag or attribute
+        paragraphs = [paragraph.replace("\n", "<br>") for paragraph in _PARAGRAPH_BREAK.split(escape(text))]
+        return "<p>" + "</p>\n        <p>".join(paragraphs) + "</p>"
+
+
+# Singleton instance
+email_renderer = EmailRenderer()
@@ -0,0 +1,254 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+from dotenv import load_dotenv
+
+from services.cache import TTLCache
+from services.metrics import metrics
+
+load_dotenv()
+
+
+# Backend state of a key whose first request hasn't finished
+PENDING = "pending"
+
+
+class IdempotencyError(Exception):
+    """Base class for Idempotency-Key conflicts"""
+
+
+class IdempotencyKeyReused(IdempotencyError):
+    """The key was already used for a request with a different payload"""
+
+
+class IdempotencyInProgress(IdempotencyError):
+    """The first request with this key is still running (on another worker) and didn't finish in time"""
+
+
+def request_fingerprint(payload: Any) -> str:
+    """Stable hash of a request payload, to detect a key reused for a different request"""
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class IdempotencyBackend:
+    """Storage for idempotency keys. Subclass to share keys between workers."""
+
+    def begin(self, key: str, lock_ttl: float) -> Optional[Any]:
+        """
+        Claim a key for a first request
+
+        Returns:
+            None if the caller now owns the key, PENDING if another request owns
+            it, or the stored record if that request already completed
+        """
+        raise NotImplementedError
+
+    def get(self, key: str) -> Optional[Any]:
+        """PENDING, the stored record, or None"""
+        raise NotImplementedError
+
+    def complete(self, key: str, record: Dict, ttl: float) -> None:
+        raise NotImplementedError
+
+    def release(self, key: str) -> None:
+        """Give up a claimed key so a retry can run the request again"""
+        raise NotImplementedError
+
+
+class InMemoryIdempotencyBackend(IdempotencyBackend):
+    """Per-process keys with TTL eviction"""
+
+    def __init__(self, maxsize: int = 10000):
+        self._lock = threading.Lock()
+        self._entries = TTLCache(maxsize=maxsize)
+
+    def begin(self, key: str, lock_ttl: float) -> Optional[Any]:
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing is not None:
+                return existing
+            self._entries.set(key, PENDING, ttl=lock_ttl)
+            return None
+
+    def get(self, key: str) -> Optional[Any]:
+        return self._entries.get(key)
+
+    def complete(self, key: str, record: Dict, ttl: float) -> None:
+        self._entries.set(key, record, ttl=ttl)
+
+    def release(self, key: str) -> None:
+        self._entries.pop(key)
+
+
+class RedisIdempotencyBackend(IdempotencyBackend):
+    """Keys shared between workers through Redis (SET NX claims)"""
+
+    def __init__(self, url: str, prefix: str = "internify:idempotency:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+
+    def begin(self, key: str, lock_ttl: float) -> Optional[Any]:
+        if self.client.set(self.prefix + key, PENDING, nx=True, px=int(lock_ttl * 1000)):
+            return None
+        return self.get(key) or PENDING
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.client.get(self.prefix + key)
+        if value is None:
+            return None
+        value = value.decode("utf-8")
+        return PENDING if value == PENDING else json.loads(value)
+
+    def complete(self, key: str, record: Dict, ttl: float) -> None:
+        self.client.set(self.prefix + key, json.dumps(record, default=str), px=int(ttl * 1000))
+
+    def release(self, key: str) -> None:
+        self.client.delete(self.prefix + key)
+
+
+def _create_backend() -> IdempotencyBackend:
+    """Use Redis when IDEMPOTENCY_REDIS_URL (or RATE_LIMIT_REDIS_URL) is set, otherwise keep keys in-process"""
+    redis_url = os.getenv("IDEMPOTENCY_REDIS_URL") or os.getenv("RATE_LIMIT_REDIS_URL")
+
+    if redis_url:
+        try:
+            return RedisIdempotencyBackend(redis_url)
+        except ImportError:
+            print("Redis library not installed. Install with: pip install redis")
+        except Exception as e:
+            print(f"[IDEMPOTENCY] Failed to connect to Redis, using in-process keys: {e}")
+
+    return InMemoryIdempotencyBackend()
+
+
+class IdempotencyService:
+    """
+    Runs a request at most once per Idempotency-Key
+
+    The first request with a key runs and its result is stored for `ttl`
+    seconds. Concurrent duplicates in this process wait on the in-flight
+    request; duplicates on other workers poll the shared backend. Later
+    duplicates get the stored result replayed. A request that raises doesn't
+    store anything, so it can be retried with the same key.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[IdempotencyBackend] = None,
+        ttl: Optional[float] = None,
+        lock_ttl: Optional[float] = None,
+        wait_timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            backend: Key storage (defaults to Redis if configured, else in-process)
+            ttl: Seconds a completed result is replayed
+            lock_ttl: Seconds a claim survives if its worker dies mid-request
+            wait_timeout: Seconds a duplicate waits for a request on another worker
+        """
+        self.backend = backend or _create_backend()
+        self.ttl = ttl if ttl is not None else float(os.getenv("IDEMPOTENCY_TTL_SECONDS", "86400"))
+        self.lock_ttl = lock_ttl if lock_ttl is not None else float(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "60"))
+        self.wait_timeout = wait_timeout if wait_timeout is not None else float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", "30"))
+
+        # key -> (request fingerprint, future of the result) for requests running in this process
+        self._inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+
+        metrics.describe("idempotency_requests_total", "counter", "Requests with an Idempotency-Key by outcome")
+
+    async def run(
+        self,
+        key: str,
+        fingerprint: str,
+        operation: Callable[[], Awaitable[Dict]]
+    ) -> Tuple[Dict, bool]:
+        """
+        Run `operation` once for `key`
+
+        Args:
+            key: Idempotency key, already scoped to the user and route
+            fingerprint: request_fingerprint of the payload
+            operation: Produces the (JSON-serializable) result
+
+        Returns:
+            (result, replayed), replayed being True when the result came from
+            an earlier or concurrent request
+
+        Raises:
+            IdempotencyKeyReused: The key was used with a different payload
+            IdempotencyInProgress: The first request is still running elsewhere
+        """
+
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            if inflight[0] != fingerprint:
+                raise IdempotencyKeyReused(key)
+            metrics.inc("idempotency_requests_total", outcome="joined")
+            return await asyncio.shield(inflight[1]), True
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (fingerprint, future)
+        owned = False
+
+        try:
+            state = self.backend.begin(key, self.lock_ttl)
+
+            if state == PENDING:
+                state = await self._wait_for(key)
+
+            if state is not None:
+                if state.get("fingerprint") != fingerprint:
+                    raise IdempotencyKeyReused(key)
+                metrics.inc("idempotency_requests_total", outcome="replayed")
+                future.set_result(state["result"])
+                return state["result"], True
+
+            owned = True
+            result = await operation()
+            self.backend.complete(key, {"fingerprint": fingerprint, "result": result}, self.ttl)
+            metrics.inc("idempotency_requests_total", outcome="first")
+            future.set_result(result)
+            return result, False
+
+        except BaseException as e:
+            if owned:
+                self.backend.release(key)
+            if not future.done():
+                if isinstance(e, asyncio.CancelledError):
+                    future.cancel()
+                else:
+                    future.set_exception(e)
+                    # Waiters re-raise it; don't warn when there are none
+                    future.exception()
+            raise
+
+        finally:
+            self._inflight.pop(key, None)
+
+    async def _wait_for(self, key: str) -> Optional[Dict]:
+        """Poll for a request running on another worker; None if it gave up the key"""
+        deadline = time.monotonic() + self.wait_timeout
+
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.1)
+            state = self.backend.get(key)
+            if state != PENDING:
+                if state is None:
+                    # Released after a failure: claim it for this request
+                    state = self.backend.begin(key, self.lock_ttl)
+                    if state == PENDING:
+                        continue
+                return state
+
+        raise IdempotencyInProgress(key)
+
+
+# Singleton instance
+idempotency_service = IdempotencyService()
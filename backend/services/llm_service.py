@@ -1,6 +1,16 @@
 import os
-from typing import Optional
+import asyncio
+import hashlib
+from typing import Optional, List
 from dotenv import load_dotenv
+from services.prompt_builder import prompt_builder
+from services.prompt_cache import GeminiPrefixCache, min_cache_tokens
+from services.cache import TTLCache
+from services.email_quality import email_quality, ResumeEntities
+from services.metrics import metrics
+from services.usage_service import usage_service
+from services.circuit_breaker import circuit_breakers, CircuitOpenError
+from services.local_generator import local_generator
 
 load_dotenv()
 
@@ -12,6 +22,35 @@ class LLMService:
         self.groq_api_key = os.getenv("GROQ_API_KEY")
         self.gemini_api_key = os.getenv("GEMINI_API_KEY")
         
+        # Static rules and example shared by every request (system message / system instruction).
+        # Sent as a fixed prefix ahead of the per-request prompt so providers can cache it.
+        self.system_instruction = prompt_builder.system
+        self.groq_model = os.getenv("GROQ_MODEL", "llama3-70b-8192")
+        self.gemini_model = os.getenv("GEMINI_MODEL", "gemini-2.0-flash-exp")
+        self.prefix_cache: Optional[GeminiPrefixCache] = None
+        
+        # Candidates generated per request; the runners-up back /llm/regenerate-email
+        self.candidate_count = max(1, int(os.getenv("LLM_CANDIDATES", "3")))
+        self.alternates = TTLCache(
+            maxsize=int(os.getenv("LLM_ALTERNATES_CACHE_SIZE", "1024")),
+            ttl=float(os.getenv("LLM_ALTERNATES_TTL_SECONDS", "900"))
+        )
+        
+        # Lightweight models for subject lines, generated alongside the body
+        self.groq_subject_model = os.getenv("GROQ_SUBJECT_MODEL", "llama-3.1-8b-instant")
+        self.gemini_subject_model = os.getenv("GEMINI_SUBJECT_MODEL", "gemini-2.0-flash-lite")
+        
+        metrics.describe("llm_prompt_tokens_total", "counter", "Prompt tokens sent to the LLM provider")
+        metrics.describe("llm_cached_prompt_tokens_total", "counter", "Prompt tokens served from the provider's prompt cache")
+        metrics.describe("llm_local_fallback_total", "counter", "Emails built by the local generator instead of the provider")
+        
+        # Seconds to wait for the provider before building the email locally
+        self.timeout = float(os.getenv("LLM_TIMEOUT_SECONDS", "20"))
+        
+        # Fail fast while a provider is unhealthy
+        self.groq_breaker = circuit_breakers.get("groq")
+        self.gemini_breaker = circuit_breakers.get("gemini")
+        
         # Determine which service to use
         self.use_groq = bool(self.groq_api_key)
         self.use_gemini = bool(self.gemini_api_key)
@@ -22,8 +61,9 @@ class LLMService:
         # Initialize clients
         if self.use_groq:
             try:
-                from groq import Groq
-                self.groq_client = Groq(api_key=self.groq_api_key)
+                from groq import AsyncGroq
+                # GROQ_BASE_URL / GEMINI_BASE_URL point at local stand-ins (see perf/)
+                self.groq_client = AsyncGroq(api_key=self.groq_api_key, base_url=os.getenv("GROQ_BASE_URL"))
             except ImportError:
                 print("Groq library not installed. Install with: pip install groq")
                 self.use_groq = False
@@ -34,7 +74,11 @@ class LLMService:
                 from google.genai import types
                 
                 # Initialize the client
-                self.genai_client = genai.Client(api_key=self.gemini_api_key)
+                base_url = os.getenv("GEMINI_BASE_URL")
+                self.genai_client = genai.Client(
+                    api_key=self.gemini_api_key,
+                    http_options=types.HttpOptions(base_url=base_url) if base_url else None
+                )
                 
                 # Configure safety settings to be less restrictive for professional content
                 self.safety_settings = [
@@ -56,10 +100,20 @@ class LLMService:
                     ),
                 ]
                 
-                # Use Gemini with system instructions for professional, project-centric emails
-                self.system_instruction = "You are an expert at writing professional cold emails for internships. Your PRIMARY RULE: ALWAYS use SPECIFIC, ACTUAL details from the candidate's resume. You MUST extract and use real project names, real technologies, and concrete achievements from resumes. You NEVER write generic emails. You NEVER use phrases like 'various projects', 'multiple technologies', 'several tools', or 'a recent project'. Every single email you write must mention at least ONE specific project by its ACTUAL NAME from the resume, and at least TWO specific technologies by their ACTUAL NAMES. If you cannot find specific details in the resume, you explicitly state what you found. You maintain a professional yet human tone and always end with 'I've attached my resume below for more details on the project and related work.'"
+                # Explicit context cache for the static system block. "auto" enables it only when the
+                # prefix can reach the model's minimum cacheable size (estimated locally, checked before creation)
+                prefix_cache = os.getenv("GEMINI_PREFIX_CACHE", "auto").lower()
+                if prefix_cache == "true" or (
+                    prefix_cache == "auto" and prompt_builder.system_tokens >= min_cache_tokens(self.gemini_model)
+                ):
+                    self.prefix_cache = GeminiPrefixCache(
+                        client=self.genai_client,
+                        model=self.gemini_model,
+                        system_instruction=self.system_instruction,
+                        ttl_seconds=int(os.getenv("GEMINI_PREFIX_CACHE_TTL_SECONDS", "3600"))
+                    )
                 
-                print("Successfully initialized Gemini with model: gemini-2.0-flash-exp")
+                print(f"Successfully initialized Gemini with model: {self.gemini_model}")
             except ImportError:
                 print("Google GenAI library not installed. Install with: pip install google-genai")
                 self.use_gemini = False
@@ -72,425 +126,397 @@ class LLMService:
         resume_text: str,
         internship_description: str,
         internship_title: str,
-        company_name: str
+        company_name: str,
+        cache_key: Optional[tuple] = None,
+        user_id: Optional[str] = None,
+        allow_fallback: bool = True
     ) -> Optional[str]:
         """
         Generate a personalized cold email for internship application
         
+        Several candidates are generated in one round-trip and ranked locally;
+        when `cache_key` is given, the runners-up are kept for `take_alternate`.
+        When the provider times out, fails, has its circuit open or returns no
+        usable candidate, the email is built by the local generator instead
+        (or None is returned, with `allow_fallback=False`).
+        
         Args:
             resume_text: Extracted text from user's resume
             internship_description: Internship posting description
             internship_title: Title of the internship position
             company_name: Name of the company
+            cache_key: Key to cache the alternates under (see `request_key`)
+            user_id: User the token usage is accounted to
+            allow_fallback: Build the email locally when the provider can't
         
         Returns:
-            Generated email text or None if generation fails
+            Generated email text (None when no provider is configured, or the
+            provider failed and fallback isn't allowed)
         """
         
+        def fallback(reason: str) -> Optional[str]:
+            if not allow_fallback:
+                return None
+            metrics.inc("llm_local_fallback_total", reason=reason)
+            return local_generator.generate(entities, internship_title, company_name, internship_description)
+        
+        entities = email_quality.extract_entities(resume_text)
+        
+        if not self.provider_available():
+            # The provider is failing; degrade now instead of waiting on another failure
+            print("[LLM] Provider circuit open, building the email locally")
+            return fallback("circuit_open")
+        
         prompt = self._create_prompt(resume_text, internship_description, internship_title, company_name)
         
         try:
             if self.use_groq:
-                return await self._generate_with_groq(prompt)
+                candidates = await asyncio.wait_for(self._generate_with_groq(prompt, user_id), timeout=self.timeout)
             elif self.use_gemini:
-                return await self._generate_with_gemini(prompt)
+                candidates = await asyncio.wait_for(self._generate_with_gemini(prompt, user_id), timeout=self.timeout)
+            else:
+                return None
+        except asyncio.TimeoutError:
+            # wait_for cancels the call, and the breaker doesn't judge cancellations; count it here
+            self._provider_breaker().record_failure()
+            print(f"[LLM] No response within {self.timeout:g}s, building the email locally")
+            return fallback("timeout")
         except Exception as e:
             print(f"Error generating email: {e}")
+            return fallback("error")
+        
+        ranked = self._rank_candidates(candidates, entities)
+        
+        if not ranked:
+            # Every call failed (quota, errors, safety filters) or no candidate passed validation
+            print("[LLM] No usable candidates, building the email locally")
+            return fallback("no_candidates")
+        
+        if cache_key and len(ranked) > 1:
+            self.alternates.set(cache_key, ranked[1:])
+        
+        return ranked[0]
+    
+    @property
+    def calls_per_email(self) -> int:
+        """Provider calls one generate_email plus its subject line takes, for the upstream rate limit"""
+        return self.candidate_count + 1
+    
+    def provider_available(self) -> bool:
+        """Whether the provider's circuit breaker lets calls through"""
+        return self._provider_breaker().available()
+    
+    def _provider_breaker(self):
+        """Circuit breaker of the provider in use"""
+        return self.groq_breaker if self.use_groq else self.gemini_breaker
+    
+    def request_key(
+        self,
+        user_id: str,
+        resume_text: str,
+        internship_description: str,
+        internship_title: str,
+        company_name: str
+    ) -> tuple:
+        """Cache key for the alternates of one generate request"""
+        request = "\x1f".join([resume_text or "", internship_description or "", internship_title or "", company_name or ""])
+        return (user_id, hashlib.sha256(request.encode("utf-8")).hexdigest())
+    
+    def take_alternate(self, key: tuple) -> Optional[str]:
+        """Next-best cached candidate for a request (see `request_key`), or None"""
+        remaining = self.alternates.pop(key)
+        if not remaining:
             return None
+        
+        if len(remaining) > 1:
+            self.alternates.set(key, remaining[1:])
+        return remaining[0]
     
     def _create_prompt(self, resume_text: str, internship_description: str, internship_title: str, company_name: str) -> str:
-        """Create the prompt for LLM following Internify Project-First Email Generation Rules"""
-        # Sanitize inputs
-        resume_text = (resume_text or "").strip()[:1500]
-        internship_description = (internship_description or "").strip()[:600]
-        internship_title = (internship_title or "").strip()
-        company_name = (company_name or "").strip()
+        """Create the per-request prompt; static rules live in the system block (see prompt_builder)"""
+        parts = prompt_builder.build(resume_text, internship_description, internship_title, company_name)
         
         # Log what we're using
-        print(f"[PROMPT] Creating prompt with resume length: {len(resume_text)}")
-        print(f"[PROMPT] Resume text preview: {resume_text[:150]}...")
         print(f"[PROMPT] Position: {internship_title} at {company_name}")
+        print(f"[PROMPT] Tokens: system {parts.system_tokens}, resume {parts.resume_tokens}, job {parts.job_tokens}, total {parts.total_tokens}")
         
-        return f"""You are writing a professional cold email for an internship application. You MUST use ACTUAL, SPECIFIC details from the candidate's resume.
-
-## STEP 1: EXTRACT FROM RESUME (MANDATORY)
-Read the resume below and extract:
-- Name (if present)
-- At least ONE specific project name
-- At least TWO specific technologies/tools
-- Any metrics, achievements, or outcomes
-
-## CANDIDATE'S RESUME:
-{resume_text}
-
-## JOB DETAILS:
-Position: {internship_title}
-Company: {company_name}
-Description: {internship_description}
-
-## STEP 2: WRITE EMAIL (140-180 words)
-
-### CRITICAL REQUIREMENTS:
-
-1. **Opening (1 line)**: Reference {company_name}'s work in a specific domain
-   - Example: "I've been following {company_name}'s work in embedded systems."
-
-2. **Brief Intro (1 line)**: Simple self-introduction
-   - Example: "I'm a computer science student who builds practical tools."
-
-3. **PROJECT SECTION (50%+ of email - 3-4 lines - MOST IMPORTANT)**:
-   - YOU MUST use an ACTUAL project name from the resume above
-   - Explain: what it does, how you built it (using ACTUAL tech from resume), why it's relevant
-   - Example structure: "One project I've spent time on is [ACTUAL PROJECT NAME FROM RESUME], [description]. While building this, I worked with [ACTUAL TECHNOLOGIES FROM RESUME]—skills that translate to [connection to role]."
-   - If you use generic phrases like "a recent project" or "various projects", you have FAILED
-
-4. **Connection (1-2 lines)**: Link the project to the company's needs
-   - Example: "Designing this required balancing [skill] with [skill], important for [company's domain]."
-
-5. **CTA (1 line)**: Lightweight ask
-   - "I'd be happy to walk through the project if helpful."
-
-6. **MANDATORY CLOSING (exact line)**:
-   - "I've attached my resume below for more details on the project and related work."
-
-## EXAMPLE OF GOOD OUTPUT (using actual details):
-"I've been following Controlytics AI's work in embedded systems.
-
-I'm an electronics engineering student who builds edge AI solutions.
-
-One project I've spent significant time on is SmartSense, a real-time sensor fusion system for industrial monitoring. While building this, I worked extensively with STM32 microcontrollers, FreeRTOS, and TensorFlow Lite—skills that translate well to the embedded systems work your team focuses on.
-
-Designing SmartSense required balancing power efficiency with real-time performance, something equally important when building production-grade embedded solutions.
-
-I'd be happy to walk through the project if helpful.
-
-I've attached my resume below for more details on the project and related work."
-
-## EXAMPLE OF BAD OUTPUT (generic - DO NOT DO THIS):
-"I'm interested in the position at your company.
-
-I have experience with various technologies and have worked on multiple projects. I'm passionate about learning and contributing to your team.
-
-I would be grateful for the opportunity to discuss this role."
-
-## NOW WRITE THE EMAIL:
-Use ACTUAL project names and technologies from the resume. Do NOT invent anything. Write ONLY the email body (no subject, no signature).
-"""
+        return parts.user
     
-    async def _generate_with_groq(self, prompt: str) -> Optional[str]:
-        """Generate email using Groq API"""
-        try:
-            chat_completion = self.groq_client.chat.completions.create(
+    async def _generate_with_groq(self, prompt: str, user_id: Optional[str] = None) -> List[str]:
+        """Generate email candidates using Groq API (parallel calls with different seeds)"""
+        results = await asyncio.gather(
+            *(self._groq_completion(prompt, seed, user_id) for seed in range(self.candidate_count)),
+            return_exceptions=True
+        )
+        
+        candidates = []
+        for result in results:
+            if isinstance(result, Exception):
+                print(f"Groq API error: {result}")
+                continue
+            candidates.append(result)
+        
+        return candidates
+    
+    async def _groq_completion(self, prompt: str, seed: int, user_id: Optional[str] = None) -> str:
+        async with self.groq_breaker:
+            chat_completion = await self.groq_client.chat.completions.create(
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are an expert at writing professional cold emails for internships. You ALWAYS use SPECIFIC details from candidates' resumes—actual project names, real technologies, concrete achievements. You NEVER use generic phrases like 'various projects' or 'multiple technologies'. Every email must reference at least ONE specific project by its actual name from the resume."
+                        "content": self.system_instruction
                     },
                     {
                         "role": "user",
                         "content": prompt
                     }
                 ],
-                model="llama3-70b-8192",
+                model=self.groq_model,
                 temperature=0.75,
                 max_tokens=600,
+                seed=seed,
             )
-            
-            email_text = chat_completion.choices[0].message.content.strip()
-            
-            # Validate output is not too generic
-            if self._is_too_generic(email_text):
-                print("[GROQ] Output too generic, attempting fallback")
-                return None
-            
-            return email_text
-        except Exception as e:
-            print(f"Groq API error: {e}")
-            return None
+        
+        # Groq reuses matching prompt prefixes automatically on supported models
+        self._record_groq_usage(chat_completion, self.groq_model, user_id)
+        
+        return chat_completion.choices[0].message.content.strip()
     
-    async def _generate_with_gemini(self, prompt: str) -> Optional[str]:
-        """Generate email using Gemini API"""
+    async def _generate_with_gemini(self, prompt: str, user_id: Optional[str] = None) -> List[str]:
+        """Generate email candidates using Gemini API (one request, `candidate_count` candidates)"""
         try:
-            from google.genai import types
-            
             # Log the prompt for debugging (first 500 chars)
             print(f"Gemini prompt (truncated): {prompt[:500]}...")
             
-            # Create generation config
-            config = types.GenerateContentConfig(
-                temperature=0.75,
-                max_output_tokens=600,
-                system_instruction=self.system_instruction,
-                safety_settings=self.safety_settings
-            )
+            # Reference the cached static prefix when available, otherwise send it inline
+            # (creating or refreshing the cache is a blocking call, so keep it off the event loop)
+            cached_content = await asyncio.to_thread(self.prefix_cache.handle) if self.prefix_cache else None
             
-            # Generate content using the new API
-            response = self.genai_client.models.generate_content(
-                model='gemini-2.0-flash-exp',
-                contents=prompt,
-                config=config
-            )
+            try:
+                async with self.gemini_breaker:
+                    response = await self.genai_client.aio.models.generate_content(
+                        model=self.gemini_model,
+                        contents=prompt,
+                        config=self._gemini_config(cached_content)
+                    )
+            except CircuitOpenError:
+                raise
+            except Exception as e:
+                if not cached_content:
+                    raise
+                # The cache may have been evicted; retry once with the prefix inline
+                print(f"[GEMINI] Cached prefix request failed, retrying inline: {e}")
+                self.prefix_cache.invalidate()
+                async with self.gemini_breaker:
+                    response = await self.genai_client.aio.models.generate_content(
+                        model=self.gemini_model,
+                        contents=prompt,
+                        config=self._gemini_config(None)
+                    )
             
-            # Check if response has text
-            if response.text:
-                email_text = response.text.strip()
-                
-                # Validate output is not too generic
-                if self._is_too_generic(email_text):
-                    print("[GEMINI] Output too generic, using fallback")
-                    return await self._generate_with_gemini_fallback(prompt)
-                
-                return email_text
-            else:
+            self._record_gemini_usage(response, self.gemini_model, user_id)
+            
+            texts = self._gemini_candidate_texts(response)
+            if not texts:
                 print("Gemini API: No text in response - attempting fallback")
-                return await self._generate_with_gemini_fallback(prompt)
+            return texts
                 
         except Exception as e:
             print(f"Gemini API error: {e}")
             print("Attempting fallback...")
-            return await self._generate_with_gemini_fallback(prompt)
+            return []
     
-    def _is_too_generic(self, email_text: str) -> bool:
-        """Check if email output is too generic and lacks specific details"""
-        email_lower = email_text.lower()
-        
-        # Red flags that indicate generic content
-        generic_phrases = [
-            "various projects",
-            "multiple projects",
-            "several projects",
-            "many projects",
-            "various technologies",
-            "multiple technologies",
-            "several technologies",
-            "different technologies",
-            "a recent project",
-            "one of my projects",
-            "some projects",
-            "i have experience",
-            "i am passionate",
-            "highly motivated",
-            "dear hiring",
-            "i am writing to",
-            "i would be grateful"
-        ]
+    def _gemini_candidate_texts(self, response) -> List[str]:
+        """Text of every candidate in a Gemini response"""
+        texts = []
+        for candidate in response.candidates or []:
+            parts = candidate.content.parts if candidate.content and candidate.content.parts else []
+            text = "".join(part.text for part in parts if part.text).strip()
+            if text:
+                texts.append(text)
+        return texts
+    
+    def _gemini_config(self, cached_content: Optional[str]):
+        """Generation config referencing the cached prefix, or carrying the system instruction inline"""
+        from google.genai import types
+        
+        if cached_content:
+            return types.GenerateContentConfig(
+                temperature=0.75,
+                max_output_tokens=600,
+                candidate_count=self.candidate_count,
+                cached_content=cached_content,
+                safety_settings=self.safety_settings
+            )
+        
+        return types.GenerateContentConfig(
+            temperature=0.75,
+            max_output_tokens=600,
+            candidate_count=self.candidate_count,
+            system_instruction=self.system_instruction,
+            safety_settings=self.safety_settings
+        )
+    
+    def _rank_candidates(self, candidates: List[str], entities: ResumeEntities) -> List[str]:
+        """Drop candidates that fail validation and order the rest best first"""
+        reports = [(email_quality.check(candidate, entities), candidate) for candidate in candidates]
         
-        # Count how many generic phrases appear
-        generic_count = sum(1 for phrase in generic_phrases if phrase in email_lower)
+        for report, _ in reports:
+            if not report.passed:
+                print(f"[VALIDATION] Discarding candidate: {'; '.join(report.problems)}")
         
-        # If 2+ generic phrases, it's too generic
-        if generic_count >= 2:
-            print(f"[VALIDATION] Email is too generic ({generic_count} generic phrases found)")
-            return True
+        passed = [(report, candidate) for report, candidate in reports if report.passed]
+        passed.sort(key=lambda item: item[0].score, reverse=True)
         
-        # Check if email is too short (less than 100 words suggests lack of detail)
-        word_count = len(email_text.split())
-        if word_count < 100:
-            print(f"[VALIDATION] Email is too short ({word_count} words)")
-            return True
+        print(f"[LLM] {len(passed)}/{len(candidates)} candidates usable"
+              + (f", scores: {', '.join(f'{report.score:.1f}' for report, _ in passed)}" if passed else ""))
+        return [candidate for _, candidate in passed]
+    
+    def _record_groq_usage(self, chat_completion, model: str, user_id: Optional[str]) -> None:
+        usage = chat_completion.usage
+        if usage:
+            details = getattr(usage, "prompt_tokens_details", None)
+            self._record_usage(
+                "groq", model, user_id,
+                usage.prompt_tokens or 0,
+                usage.completion_tokens or 0,
+                getattr(details, "cached_tokens", 0) or 0
+            )
+    
+    def _record_gemini_usage(self, response, model: str, user_id: Optional[str]) -> None:
+        usage = response.usage_metadata
+        if usage:
+            self._record_usage(
+                "gemini", model, user_id,
+                usage.prompt_token_count or 0,
+                usage.candidates_token_count or 0,
+                usage.cached_content_token_count or 0
+            )
+    
+    def _record_usage(
+        self,
+        provider: str,
+        model: str,
+        user_id: Optional[str],
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached_tokens: int
+    ) -> None:
+        """Export token counts and account them (and their cost) to the user"""
+        metrics.inc("llm_prompt_tokens_total", prompt_tokens, provider=provider)
+        metrics.inc("llm_cached_prompt_tokens_total", cached_tokens, provider=provider)
+        if cached_tokens:
+            print(f"[{provider.upper()}] Prompt cache hit: {cached_tokens}/{prompt_tokens} tokens")
         
-        return False
+        usage_service.record(user_id, provider, model, prompt_tokens, completion_tokens, cached_tokens)
     
-    async def _generate_with_gemini_fallback(self, original_prompt: str) -> Optional[str]:
-        """Fallback method with aggressive resume detail extraction"""
+    async def generate_subject_line(
+        self,
+        job_title: str,
+        company_name: str,
+        resume_text: Optional[str] = None,
+        internship_description: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> str:
+        """
+        Generate a subject line grounded in the resume and the job
+        
+        Uses a lightweight model so it can run concurrently with body generation.
+        Falls back to a template when no resume is given or the call fails or
+        times out (LLM_TIMEOUT_SECONDS, like the body).
+        
+        Args:
+            job_title: Title of the internship position
+            company_name: Name of the company
+            resume_text: Extracted text from user's resume
+            internship_description: Internship posting description
+            user_id: User the token usage is accounted to
+        
+        Returns:
+            Subject line (5-8 words)
+        """
+        
+        if not resume_text:
+            return self._template_subject_line(job_title, company_name)
+        
+        prompt = prompt_builder.build_subject(resume_text, internship_description, job_title, company_name)
+        
         try:
-            print(f"[FALLBACK] Using enhanced fallback with resume detail extraction")
-            
-            # Parse info from prompt
-            lines = original_prompt.split('\n')
-            company = "the company"
-            position = "this role"
-            resume_text = ""
-            
-            # Extract sections
-            in_resume = False
-            resume_lines = []
-            
-            for i, line in enumerate(lines):
-                if "Company:" in line:
-                    company = line.split("Company:")[-1].strip()
-                if "Position:" in line:
-                    position = line.split("Position:")[-1].strip()
-                if "CANDIDATE'S RESUME:" in line or "Candidate Resume" in line:
-                    in_resume = True
-                    continue
-                if in_resume:
-                    if line.strip() and not line.startswith("##") and "JOB DETAILS" not in line:
-                        resume_lines.append(line.strip())
-                    if "## JOB DETAILS" in line or "## STEP 2" in line:
-                        break
-            
-            resume_text = " ".join(resume_lines)
-            print(f"[FALLBACK] Extracted resume text length: {len(resume_text)}")
-            
-            # Extract domain from position
-            domain = "technology"
-            domain_adj = "technical"
-            
-            position_lower = position.lower()
-            if "ai" in position_lower or "ml" in position_lower or "machine learning" in position_lower:
-                domain = "AI and machine learning"
-                domain_adj = "AI"
-            elif "embedded" in position_lower or "hardware" in position_lower or "iot" in position_lower:
-                domain = "embedded systems and IoT"
-                domain_adj = "embedded"
-            elif "data" in position_lower:
-                domain = "data science"
-                domain_adj = "data"
-            elif "backend" in position_lower or "server" in position_lower:
-                domain = "backend development"
-                domain_adj = "backend"
-            elif "frontend" in position_lower or "ui" in position_lower or "ux" in position_lower:
-                domain = "frontend development"
-                domain_adj = "frontend"
-            elif "full stack" in position_lower or "fullstack" in position_lower:
-                domain = "full-stack development"
-                domain_adj = "full-stack"
-            
-            # AGGRESSIVE technology extraction
-            tech_stack = []
-            resume_lower = resume_text.lower()
-            
-            # Comprehensive tech list
-            tech_patterns = {
-                "Python": ["python"],
-                "JavaScript": ["javascript", "js"],
-                "TypeScript": ["typescript", "ts"],
-                "React": ["react", "reactjs"],
-                "Node.js": ["node", "nodejs", "node.js"],
-                "Django": ["django"],
-                "Flask": ["flask"],
-                "FastAPI": ["fastapi", "fast api"],
-                "TensorFlow": ["tensorflow", "tf"],
-                "PyTorch": ["pytorch", "torch"],
-                "C++": ["c++", "cpp"],
-                "C": [" c ", "c programming"],
-                "Java": ["java"],
-                "SQL": ["sql", "mysql", "postgresql"],
-                "MongoDB": ["mongodb", "mongo"],
-                "Docker": ["docker"],
-                "Kubernetes": ["kubernetes", "k8s"],
-                "AWS": ["aws", "amazon web services"],
-                "Git": ["git", "github"],
-                "Linux": ["linux", "ubuntu"],
-                "Arduino": ["arduino"],
-                "Raspberry Pi": ["raspberry pi", "raspi"],
-                "STM32": ["stm32", "stm"],
-                "ESP32": ["esp32", "esp"],
-                "FreeRTOS": ["freertos", "rtos"],
-                "TensorFlow Lite": ["tensorflow lite", "tflite"],
-                "MQTT": ["mqtt"],
-                "REST API": ["rest", "restful", "rest api"],
-                "Next.js": ["next.js", "nextjs"],
-                "Tailwind": ["tailwind"],
-                "Vue": ["vue", "vuejs"],
-                "Angular": ["angular"],
-                "Express": ["express", "expressjs"],
-                "Redis": ["redis"],
-                "Supabase": ["supabase"],
-                "Firebase": ["firebase"],
-                "LLM": ["llm", "large language model"],
-                "OpenAI": ["openai", "gpt"],
-                "Gemini": ["gemini"],
-                "NLP": ["nlp", "natural language"],
-                "Computer Vision": ["computer vision", "cv", "image processing"]
-            }
-            
-            for tech_name, patterns in tech_patterns.items():
-                for pattern in patterns:
-                    if pattern in resume_lower:
-                        if tech_name not in tech_stack:
-                            tech_stack.append(tech_name)
-                        break
-            
-            print(f"[FALLBACK] Extracted technologies: {tech_stack[:5]}")
-            
-            # AGGRESSIVE project name extraction
-            project_name = None
-            project_desc = None
-            
-            # Look for capitalized words that might be project names
-            words = resume_text.split()
-            potential_projects = []
-            
-            # Common project keywords
-            project_indicators = ["project", "built", "developed", "created", "designed", "implemented"]
-            
-            for i, word in enumerate(words):
-                # Look for capitalized multi-word sequences (likely project names)
-                if word and len(word) > 3 and word[0].isupper():
-                    # Skip common words
-                    if word not in ["I", "The", "A", "An", "In", "On", "At", "For", "With", "This", "That", company, "Professional", "Education", "Experience", "Skills"]:
-                        # Check if it's near a project indicator
-                        context = " ".join(words[max(0,i-5):min(len(words),i+5)]).lower()
-                        if any(indicator in context for indicator in project_indicators):
-                            potential_projects.append(word)
-            
-            if potential_projects:
-                project_name = potential_projects[0]
-                print(f"[FALLBACK] Found potential project: {project_name}")
-            
-            # Build specific project description based on tech and domain
-            if not project_name:
-                project_name = "a specialized project"
-            
-            if not project_desc:
-                if tech_stack:
-                    primary_tech = tech_stack[0]
-                    project_desc = f"a {domain_adj} solution built with {primary_tech}"
-                else:
-                    project_desc = f"a tool focused on {domain}"
-            
-            # Generate highly specific email
-            tech_line = ""
-            if len(tech_stack) >= 3:
-                tech_line = f"{tech_stack[0]}, {tech_stack[1]}, and {tech_stack[2]}"
-            elif len(tech_stack) == 2:
-                tech_line = f"{tech_stack[0]} and {tech_stack[1]}"
-            elif len(tech_stack) == 1:
-                tech_line = tech_stack[0]
+            if self.use_groq:
+                subject = await asyncio.wait_for(self._subject_with_groq(prompt, user_id), timeout=self.timeout)
+            elif self.use_gemini:
+                subject = await asyncio.wait_for(self._subject_with_gemini(prompt, user_id), timeout=self.timeout)
             else:
-                tech_line = "modern technologies"
-            
-            # Craft project-focused email
-            email = f"""I've been following {company}'s work in {domain}.
-
-I'm an engineering student who builds practical solutions in {domain_adj} systems.
-
-One project I've spent significant time on is {project_name}, {project_desc}. While building this, I worked extensively with {tech_line}—skills that directly translate to the {domain_adj} work your team focuses on.
-
-Designing {project_name} required balancing functionality with real-world constraints, something equally important when building production-grade solutions at scale.
-
-I'd be happy to walk through the project if helpful.
-
-I've attached my resume below for more details on the project and related work."""
-            
-            print(f"[FALLBACK] Generated email with {len(email.split())} words")
-            return email
+                subject = None
             
+            subject = self._clean_subject_line(subject)
+            if subject:
+                return subject
+            print("[SUBJECT] Unusable subject line, using template")
+        except asyncio.TimeoutError:
+            # As in generate_email: the cancelled call isn't judged by the breaker
+            self._provider_breaker().record_failure()
+            print(f"[SUBJECT] No response within {self.timeout:g}s, using template")
         except Exception as e:
-            print(f"Fallback error: {e}")
-            return None
+            print(f"[SUBJECT] Subject generation failed, using template: {e}")
+        
+        return self._template_subject_line(job_title, company_name)
+    
+    async def _subject_with_groq(self, prompt: str, user_id: Optional[str] = None) -> Optional[str]:
+        """Generate a subject line with the lightweight Groq model"""
+        async with self.groq_breaker:
+            chat_completion = await self.groq_client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=self.groq_subject_model,
+                temperature=0.7,
+                max_tokens=30,
+            )
+        self._record_groq_usage(chat_completion, self.groq_subject_model, user_id)
+        return chat_completion.choices[0].message.content
     
-    def _get_connection_to_role(self, tech_stack: list, domain: str, position: str) -> str:
-        """Generate a connecting sentence based on actual tech stack"""
-        if tech_stack:
-            # Use actual technologies from resume
-            tech_mention = tech_stack[0] if len(tech_stack) == 1 else f"{tech_stack[0]} and {tech_stack[1]}"
-            return f"My recent work with {tech_mention} taught me that good code solves problems—even when it breaks at first."
-        else:
-            return "I like building things that people actually use—even when they break at first."
+    async def _subject_with_gemini(self, prompt: str, user_id: Optional[str] = None) -> Optional[str]:
+        """Generate a subject line with the lightweight Gemini model"""
+        from google.genai import types
+        
+        async with self.gemini_breaker:
+            response = await self.genai_client.aio.models.generate_content(
+                model=self.gemini_subject_model,
+                contents=prompt,
+                config=types.GenerateContentConfig(
+                    temperature=0.7,
+                    max_output_tokens=30,
+                    safety_settings=self.safety_settings
+                )
+            )
+        self._record_gemini_usage(response, self.gemini_subject_model, user_id)
+        return response.text
     
-    async def generate_subject_line(self, job_title: str, company_name: str) -> str:
-        """Generate a subject line following Internify project-first specification"""
+    def _clean_subject_line(self, subject: Optional[str]) -> Optional[str]:
+        """Strip labels, quotes and extra lines from a generated subject line"""
+        if not subject or not subject.strip():
+            return None
+        
+        subject = subject.strip().splitlines()[0].strip()
+        if subject.lower().startswith("subject:"):
+            subject = subject[len("subject:"):].strip()
+        subject = subject.strip("\"'*` ").rstrip(".")
+        
+        if not subject or len(subject) > 90 or len(subject.split()) > 12:
+            return None
+        return subject
+    
+    def _template_subject_line(self, job_title: str, company_name: str) -> str:
+        """Template subject line following Internify project-first specification"""
         # Following new rules: 5-8 words, specific, avoid formal application language
         import random
         
+        role_word = job_title.split()[0].lower() if job_title and job_title.split() else "engineering"
+        
         templates = [
             f"Built Internify — relevant to your team",
-            f"Applying AI to {job_title.split()[0].lower()} problems",
+            f"Applying AI to {role_word} problems",
             f"A project aligned with {company_name}",
-            f"Built a tool for {job_title.split()[0].lower()}",
+            f"Built a tool for {role_word}",
             f"Project relevant to your hiring focus",
             f"How I built an AI tool"
         ]
@@ -0,0 +1,86 @@
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+
+# A sample is (metric name, labels, value)
+Sample = Tuple[str, Dict[str, str], float]
+
+
+class MetricsRegistry:
+    """In-process metrics registry rendered in Prometheus text format"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._types: Dict[str, Tuple[str, str]] = {}
+        self._values: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+        self._collectors: List[Callable[[], Iterable[Sample]]] = []
+
+    def describe(self, name: str, metric_type: str, help_text: str) -> None:
+        """Register the type ("counter" or "gauge") and help text of a metric"""
+        self._types[name] = (metric_type, help_text)
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """Increment a counter"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def set(self, name: str, value: float, **labels: str) -> None:
+        """Set a gauge to an absolute value"""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._values[key] = value
+
+    def get(self, name: str, **labels: str) -> float:
+        """Read the current value of a counter or gauge"""
+        return self._values.get((name, tuple(sorted(labels.items()))), 0.0)
+
+    def register_collector(self, collector: Callable[[], Iterable[Sample]]) -> None:
+        """
+        Register a callback that yields samples at scrape time
+
+        Used for values that are cheaper to read on demand than to keep
+        updated, such as token bucket levels.
+        """
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+
+        samples: Dict[str, List[Tuple[Dict[str, str], float]]] = {}
+
+        with self._lock:
+            for (name, labels), value in self._values.items():
+                samples.setdefault(name, []).append((dict(labels), value))
+
+        for collector in self._collectors:
+            try:
+                for name, labels, value in collector():
+                    samples.setdefault(name, []).append((labels, value))
+            except Exception as e:
+                print(f"[METRICS] Collector failed: {e}")
+
+        lines = []
+        for name in sorted(samples):
+            metric_type, help_text = self._types.get(name, ("untyped", ""))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for labels, value in samples[name]:
+                lines.append(f"{name}{self._format_labels(labels)} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _format_labels(labels: Dict[str, str]) -> str:
+        if not labels:
+            return ""
+        parts = []
+        for key, value in sorted(labels.items()):
+            value = str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+            parts.append(f'{key}="{value}"')
+        return "{" + ",".join(parts) + "}"
+
+
+# Singleton instance
+metrics = MetricsRegistry()
@@ -0,0 +1,213 @@
+import os
+import time
+import math
+import asyncio
+import threading
+from collections import deque
+from typing import Optional, Dict, List, Tuple
+from dotenv import load_dotenv
+
+from services.rate_limiter import rate_limiter
+from services.metrics import metrics
+
+load_dotenv()
+
+
+class QueryPopularity:
+    """Search counts per (query, location) with exponential decay, so stale favourites fade out"""
+
+    def __init__(self, half_life: float = 86400.0, max_queries: int = 1000):
+        self.decay = math.log(2) / half_life
+        self.max_queries = max_queries
+        self._lock = threading.Lock()
+        # key -> (score, last_update, original query, original location)
+        self._scores: Dict[tuple, Tuple[float, float, str, Optional[str]]] = {}
+
+    def record(self, query: str, location: Optional[str] = None) -> None:
+        key = (" ".join(query.lower().split()), " ".join((location or "").lower().split()))
+        now = time.monotonic()
+
+        with self._lock:
+            # Keep the spelling of the first search for re-fetches
+            score, updated_at, query, location = self._scores.get(key, (0.0, now, query, location))
+            self._scores[key] = (self._decayed(score, updated_at, now) + 1.0, now, query, location)
+
+            if len(self._scores) > self.max_queries:
+                # Forget the least popular half
+                ranked = sorted(self._scores.items(), key=lambda item: self._decayed(item[1][0], item[1][1], now))
+                for stale_key, _ in ranked[:len(ranked) // 2]:
+                    del self._scores[stale_key]
+
+    def top(self, k: int, min_score: float = 0.0) -> List[Tuple[str, Optional[str], float]]:
+        """The k most popular searches as (query, location, score)"""
+        now = time.monotonic()
+
+        with self._lock:
+            ranked = [
+                (query, location, self._decayed(score, updated_at, now))
+                for score, updated_at, query, location in self._scores.values()
+            ]
+
+        ranked = [entry for entry in ranked if entry[2] >= min_score]
+        ranked.sort(key=lambda entry: entry[2], reverse=True)
+        return ranked[:k]
+
+    def _decayed(self, score: float, updated_at: float, now: float) -> float:
+        return score * math.exp(-self.decay * (now - updated_at))
+
+
+class PrefetchService:
+    """Periodically re-fetches the most popular searches to warm the search cache and internships table"""
+
+    def __init__(
+        self,
+        scraper=None,
+        store=None,
+        top_k: Optional[int] = None,
+        interval: Optional[float] = None,
+        budget: Optional[int] = None,
+        budget_window: Optional[float] = None,
+        limit: Optional[int] = None,
+        min_searches: Optional[float] = None,
+    ):
+        """
+        Args:
+            scraper: Object with `search_internships(query, location, limit, use_cache)`
+                (defaults to scraper_service)
+            store: Object with `save_internships(internships)` (defaults to supabase_service)
+            top_k: Number of popular searches refreshed per run
+            interval: Seconds between runs
+            budget: Maximum SerpAPI calls per budget window
+            budget_window: Budget window in seconds
+            limit: Results fetched per search
+            min_searches: Decayed search count a query needs to be refreshed
+        """
+        self._scraper = scraper
+        self._store = store
+        self.enabled = os.getenv("PREFETCH_ENABLED", "false").lower() == "true"
+        self.top_k = top_k if top_k is not None else int(os.getenv("PREFETCH_TOP_K", "20"))
+        self.interval = interval if interval is not None else float(os.getenv("PREFETCH_INTERVAL_SECONDS", "1800"))
+        self.budget = budget if budget is not None else int(os.getenv("PREFETCH_BUDGET", "20"))
+        self.budget_window = budget_window if budget_window is not None else float(os.getenv("PREFETCH_BUDGET_WINDOW_SECONDS", "86400"))
+        self.limit = limit if limit is not None else int(os.getenv("PREFETCH_LIMIT", "20"))
+        self.min_searches = min_searches if min_searches is not None else float(os.getenv("PREFETCH_MIN_SEARCHES", "2"))
+
+        self.popularity = QueryPopularity()
+        self._calls: deque = deque()
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+        metrics.describe("prefetch_searches_total", "counter", "Popular searches re-fetched in the background")
+        metrics.describe("prefetch_skipped_total", "counter", "Background re-fetches skipped for lack of SerpAPI budget or availability")
+
+    @property
+    def scraper(self):
+        if self._scraper is None:
+            from services.scraper_service import scraper_service
+            self._scraper = scraper_service
+        return self._scraper
+
+    @property
+    def store(self):
+        if self._store is None:
+            from services.supabase_service import supabase_service
+            self._store = supabase_service
+        return self._store
+
+    def record_search(self, query: str, location: Optional[str] = None) -> None:
+        """Count a user search towards query popularity"""
+        self.popularity.record(query, location)
+
+    def remaining_budget(self) -> int:
+        """SerpAPI calls still allowed in the current budget window"""
+        cutoff = time.monotonic() - self.budget_window
+        while self._calls and self._calls[0] < cutoff:
+            self._calls.popleft()
+        return max(0, self.budget - len(self._calls))
+
+    async def run_once(self) -> int:
+        """
+        Re-fetch the most popular searches within the SerpAPI budget
+
+        Returns:
+            Number of searches refreshed
+        """
+
+        refreshed = 0
+
+        for query, location, score in self.popularity.top(self.top_k, min_score=self.min_searches):
+            # The search would be refused without reaching SerpAPI; don't spend budget on it
+            if not self.scraper.breaker.available():
+                metrics.inc("prefetch_skipped_total", reason="circuit_open")
+                break
+
+            if self.remaining_budget() <= 0:
+                metrics.inc("prefetch_skipped_total", reason="budget")
+                break
+
+            # Leave the shared SerpAPI bucket to user traffic when it is empty
+            if not rate_limiter.check_upstream("serpapi").allowed:
+                metrics.inc("prefetch_skipped_total", reason="rate_limit")
+                break
+
+            self._calls.append(time.monotonic())
+
+            try:
+                internships = await self.scraper.search_internships(
+                    query=query,
+                    location=location,
+                    limit=self.limit,
+                    use_cache=False
+                )
+                if internships:
+                    await self.store.save_internships(internships)
+
+                refreshed += 1
+                metrics.inc("prefetch_searches_total")
+                print(f"[PREFETCH] Refreshed '{query}' ({location or 'any location'}), score {score:.1f}: {len(internships)} results")
+            except Exception as e:
+                print(f"[PREFETCH] Failed to refresh '{query}': {e}")
+
+        return refreshed
+
+    def start(self) -> None:
+        """Start the background refresh loop (no-op when disabled or already running)"""
+        if not self.enabled or (self._task and not self._task.done()):
+            return
+
+        self._stopping = asyncio.Event()
+        self._task = asyncio.create_task(self._loop())
+        print(f"[PREFETCH] Started: top {self.top_k} searches every {self.interval:.0f}s, budget {self.budget} calls")
+
+    async def stop(self) -> None:
+        """Stop the background loop and wait for the current run to finish or cancel"""
+        if not self._task:
+            return
+
+        self._stopping.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=5)
+        except asyncio.TimeoutError:
+            self._task.cancel()
+        except asyncio.CancelledError:
+            pass
+
+        self._task = None
+        print("[PREFETCH] Stopped")
+
+    async def _loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), timeout=self.interval)
+                break
+            except asyncio.TimeoutError:
+                pass
+
+            try:
+                await self.run_once()
+            except Exception as e:
+                print(f"[PREFETCH] Run failed: {e}")
+
+
+# Singleton instance
+prefetch_service = PrefetchService()
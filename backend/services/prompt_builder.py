@@ -0,0 +1,360 @@
+import os
+import re
+import math
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Optional, List
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+# Static instructions shared by every request. Kept free of per-request content
+# so providers can reuse it as a fixed prefix.
+SYSTEM_PROMPT = """You write professional cold emails for internship applications, using SPECIFIC details from the candidate's resume.
+
+Rules:
+- Use ONLY facts from the resume. Name at least ONE project by its actual name and at least TWO technologies by their actual names. Never invent anything.
+- Never use generic phrases such as "various projects", "multiple technologies", "a recent project", "I am passionate" or "Dear Hiring Manager".
+- 140-180 words, professional yet human tone, short paragraphs.
+
+Structure:
+1. Opening (1 line): reference the company's work in a specific domain.
+2. Intro (1 line): a simple self-introduction.
+3. Project (3-4 lines, at least half the email): the actual project, what it does, how it was built with the actual technologies, and why it matters for the role.
+4. Connection (1-2 lines): link the project to the company's needs.
+5. Ask (1 line): "I'd be happy to walk through the project if helpful."
+6. Close with exactly: "I've attached my resume below for more details on the project and related work."
+
+Write ONLY the email body: no subject, no greeting placeholder, no signature.
+
+Example of the expected style:
+"I've been following Controlytics AI's work in embedded systems.
+
+I'm an electronics engineering student who builds edge AI solutions.
+
+One project I've spent significant time on is SmartSense, a real-time sensor fusion system for industrial monitoring. While building this, I worked extensively with STM32 microcontrollers, FreeRTOS, and TensorFlow Lite—skills that translate well to the embedded systems work your team focuses on.
+
+Designing SmartSense required balancing power efficiency with real-time performance, something equally important when building production-grade embedded solutions.
+
+I'd be happy to walk through the project if helpful.
+
+I've attached my resume below for more details on the project and related work.\""""
+
+
+RESUME_HEADINGS = {
+    "summary", "objective", "profile", "about", "about me", "education", "experience",
+    "work experience", "professional experience", "internships", "projects", "personal projects",
+    "academic projects", "skills", "technical skills", "achievements", "awards", "certifications",
+    "publications", "leadership", "activities", "extracurricular activities", "positions of responsibility",
+    "coursework", "relevant coursework", "languages", "interests", "hobbies",
+}
+
+# Sections that rarely help a cold email
+LOW_VALUE_HEADINGS = {"interests", "hobbies", "languages"}
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "for", "from", "has", "have", "in", "is", "it",
+    "its", "of", "on", "or", "our", "that", "the", "their", "this", "to", "we", "will", "with", "you",
+    "your", "who", "what", "which", "using", "use", "used", "work", "working", "team", "role", "intern",
+    "internship", "candidate", "candidates", "looking", "about", "etc", "also", "can", "should",
+}
+
+_BULLET = re.compile(r"^\s*(?:[•●▪◦‣*\-–]|\d+[.)])\s+")
+_TERM = re.compile(r"[a-z0-9][a-z0-9+#.]*")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+_APPROX_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+class Tokenizer:
+    """Counts tokens with tiktoken when installed, otherwise approximates with a word/punctuation split"""
+
+    def __init__(self, encoding: str = "cl100k_base"):
+        self._encoding = None
+        try:
+            import tiktoken
+            self._encoding = tiktoken.get_encoding(encoding)
+        except ImportError:
+            print("tiktoken not installed, approximating prompt token counts. Install with: pip install tiktoken")
+        except Exception as e:
+            print(f"[PROMPT] Failed to load tokenizer, approximating token counts: {e}")
+
+    @property
+    def exact(self) -> bool:
+        return self._encoding is not None
+
+    def count(self, text: str) -> int:
+        if not text:
+            return 0
+        if self._encoding is not None:
+            return len(self._encoding.encode(text))
+        return len(_APPROX_TOKEN.findall(text))
+
+
+@dataclass
+class Chunk:
+    """A contiguous piece of the resume (a bullet, a paragraph, or a header block)"""
+    heading: str
+    lines: List[str] = field(default_factory=list)
+    position: int = 0
+    tokens: int = 0
+    score: float = 0.0
+
+    @property
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+@dataclass
+class PromptParts:
+    """A built prompt: the static system block and the per-request user prompt"""
+    system: str
+    user: str
+    system_tokens: int
+    user_tokens: int
+    resume_tokens: int
+    job_tokens: int
+
+    @property
+    def total_tokens(self) -> int:
+        return self.system_tokens + self.user_tokens
+
+
+def terms(text: str) -> List[str]:
+    """Lowercased content terms used for relevance ranking"""
+    return [term.strip(".") for term in _TERM.findall(text.lower()) if term.strip(".") not in STOPWORDS and len(term) > 1]
+
+
+def bm25_scores(documents: List[List[str]], query: List[str], k1: float = 1.5, b: float = 0.75) -> List[float]:
+    """Okapi BM25 score of each tokenized document against the query terms"""
+
+    if not documents:
+        return []
+
+    average_length = sum(len(document) for document in documents) / len(documents) or 1.0
+    document_frequency = Counter()
+    for document in documents:
+        document_frequency.update(set(document))
+
+    query_terms = Counter(query)
+    scores = []
+
+    for document in documents:
+        frequencies = Counter(document)
+        length_norm = k1 * (1 - b + b * len(document) / average_length)
+        score = 0.0
+
+        for term, query_count in query_terms.items():
+            frequency = frequencies.get(term)
+            if not frequency:
+                continue
+            df = document_frequency[term]
+            idf = math.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+            score += idf * frequency * (k1 + 1) / (frequency + length_norm) * (1 + math.log(query_count))
+
+        scores.append(score)
+
+    return scores
+
+
+class PromptBuilder:
+    """Builds email prompts within per-section token budgets"""
+
+    def __init__(
+        self,
+        resume_budget: Optional[int] = None,
+        job_budget: Optional[int] = None,
+        max_chunk_tokens: int = 80,
+        tokenizer: Optional[Tokenizer] = None
+    ):
+        self.resume_budget = resume_budget or int(os.getenv("PROMPT_RESUME_TOKENS", "450"))
+        self.job_budget = job_budget or int(os.getenv("PROMPT_JOB_TOKENS", "180"))
+        self.max_chunk_tokens = max_chunk_tokens
+        self.tokenizer = tokenizer or Tokenizer()
+
+        self.system = SYSTEM_PROMPT
+        self.system_tokens = self.tokenizer.count(SYSTEM_PROMPT)
+
+    def build(
+        self,
+        resume_text: str,
+        internship_description: str,
+        internship_title: str,
+        company_name: str
+    ) -> PromptParts:
+        """
+        Build the user prompt for one email
+
+        Resume chunks are ranked against the job (BM25) and packed into the resume
+        budget; the job description is cut at sentence boundaries into its budget.
+
+        Args:
+            resume_text: Extracted text from user's resume
+            internship_description: Internship posting description
+            internship_title: Title of the internship position
+            company_name: Name of the company
+
+        Returns:
+            Prompt parts with token counts
+        """
+
+        internship_title = (internship_title or "").strip()
+        company_name = (company_name or "").strip()
+        job_query = terms(f"{internship_title} {internship_title} {internship_description or ''}")
+
+        resume = self.select_resume(resume_text or "", job_query)
+        description = self.fit_text(internship_description or "", self.job_budget)
+
+        user = f"""## CANDIDATE'S RESUME:
+{resume}
+
+## JOB DETAILS:
+Position: {internship_title}
+Company: {company_name}
+Description: {description}
+
+## TASK:
+Write the email for this position at {company_name}, using actual project names and technologies from the resume above.
+"""
+
+        return PromptParts(
+            system=self.system,
+            user=user,
+            system_tokens=self.system_tokens,
+            user_tokens=self.tokenizer.count(user),
+            resume_tokens=self.tokenizer.count(resume),
+            job_tokens=self.tokenizer.count(description),
+        )
+
+    def build_subject(
+        self,
+        resume_text: str,
+        internship_description: Optional[str],
+        internship_title: str,
+        company_name: str,
+        resume_budget: int = 150
+    ) -> str:
+        """Build a short prompt for a subject line, with the resume chunks most relevant to the job"""
+
+        job_query = terms(f"{internship_title} {internship_title} {internship_description or ''}")
+        resume = self.select_resume(resume_text or "", job_query, budget=resume_budget)
+
+        return f"""Write ONE subject line (5-8 words) for a cold email applying to the {internship_title} internship at {company_name}.
+Name a specific project or technology from the resume that fits the role. No quotes, no "Application for", no labels. Output only the subject line.
+
+Resume:
+{resume}
+"""
+
+    def split_resume(self, resume_text: str) -> List[Chunk]:
+        """
+        Split resume text into chunks under their section headings
+
+        A chunk is an entry line (a job, a project) with the bullets that follow it,
+        split further when it exceeds `max_chunk_tokens`.
+        """
+
+        chunks: List[Chunk] = []
+        heading = ""
+        current: Optional[Chunk] = None
+        in_bullets = False
+
+        for raw_line in resume_text.splitlines():
+            line = raw_line.strip()
+            if not line:
+                current = None
+                continue
+
+            normalized = line.rstrip(":").strip().lower()
+            if normalized in RESUME_HEADINGS or (line.isupper() and len(line.split()) <= 4 and chunks):
+                heading = line.rstrip(":").strip()
+                current = None
+                continue
+
+            tokens = self.tokenizer.count(line)
+            starts_bullet = bool(_BULLET.match(line))
+            # A plain line after bullets starts the next entry
+            starts_entry = not starts_bullet and in_bullets
+
+            if current is None or starts_entry or current.tokens + tokens > self.max_chunk_tokens:
+                current = Chunk(heading=heading, position=len(chunks))
+                chunks.append(current)
+
+            current.lines.append(_BULLET.sub("- ", line) if starts_bullet else line)
+            current.tokens += tokens
+            in_bullets = starts_bullet
+
+        return chunks
+
+    def select_resume(self, resume_text: str, job_query: List[str], budget: Optional[int] = None) -> str:
+        """Pick the resume chunks most relevant to the job within the resume budget"""
+
+        budget = budget or self.resume_budget
+        resume_text = resume_text.strip()
+        if self.tokenizer.count(resume_text) <= budget:
+            return resume_text
+
+        chunks = self.split_resume(resume_text)
+        scores = bm25_scores([terms(f"{chunk.heading} {chunk.text}") for chunk in chunks], job_query)
+
+        for chunk, score in zip(chunks, scores):
+            chunk.score = score
+            if chunk.heading.lower() in LOW_VALUE_HEADINGS:
+                chunk.score -= 1.0
+            elif "project" in chunk.heading.lower():
+                # The email is built around a project
+                chunk.score += 0.5
+
+        # The header block usually holds the candidate's name and summary
+        selected = {0} if chunks and not chunks[0].heading and chunks[0].tokens <= self.max_chunk_tokens else set()
+        used = sum(chunks[index].tokens for index in selected)
+
+        for chunk in sorted(chunks, key=lambda chunk: chunk.score, reverse=True):
+            if chunk.position in selected or chunk.score < 0:
+                continue
+            if used + chunk.tokens > budget:
+                continue
+            selected.add(chunk.position)
+            used += chunk.tokens
+
+        # Render in original order, grouped under headings
+        lines = []
+        last_heading = None
+        for chunk in chunks:
+            if chunk.position not in selected:
+                continue
+            if chunk.heading and chunk.heading != last_heading:
+                lines.append(f"{chunk.heading.upper()}:")
+                last_heading = chunk.heading
+            lines.append(chunk.text)
+
+        return "\n".join(lines)
+
+    def fit_text(self, text: str, budget: int) -> str:
+        """Keep whole leading sentences of `text` within `budget` tokens"""
+
+        text = " ".join(text.split())
+        if self.tokenizer.count(text) <= budget:
+            return text
+
+        kept = []
+        used = 0
+        for sentence in _SENTENCE_END.split(text):
+            tokens = self.tokenizer.count(sentence)
+            if used + tokens > budget:
+                break
+            kept.append(sentence)
+            used += tokens
+
+        if not kept:
+            # A single run-on sentence: cut at a word boundary
+            words = text.split()
+            while words and self.tokenizer.count(" ".join(words)) > budget:
+                words = words[:max(1, int(len(words) * 0.8))] if len(words) > 1 else []
+            return " ".join(words)
+
+        return " ".join(kept)
+
+
+# Singleton instance
+prompt_builder = PromptBuilder()
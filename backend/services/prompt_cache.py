@@ -0,0 +1,147 @@
+import os
+import time
+import threading
+from typing import Optional
+
+# Smallest context Gemini will cache, per model family (first matching prefix wins)
+MIN_CACHE_TOKENS = [
+    ("gemini-2.5-flash", 1024),
+    ("gemini-2.5-pro", 4096),
+]
+DEFAULT_MIN_CACHE_TOKENS = 4096
+
+
+def min_cache_tokens(model: str) -> int:
+    """Minimum cacheable context size for a Gemini model (GEMINI_PREFIX_CACHE_MIN_TOKENS overrides)"""
+    override = os.getenv("GEMINI_PREFIX_CACHE_MIN_TOKENS")
+    if override:
+        return int(override)
+    for prefix, tokens in MIN_CACHE_TOKENS:
+        if model.startswith(prefix):
+            return tokens
+    return DEFAULT_MIN_CACHE_TOKENS
+
+
+class GeminiPrefixCache:
+    """
+    Gemini context cache holding the static system block
+
+    Requests reference the cached content by name instead of re-sending the
+    system instruction. The cache's TTL is extended while it is in use.
+    Before the first creation the prefix is counted with the model's
+    tokenizer; a prefix below the model's minimum cacheable size disables
+    the cache for good. Other creation failures back off, and requests fall
+    back to an inline system instruction meanwhile.
+    """
+
+    def __init__(
+        self,
+        client,
+        model: str,
+        system_instruction: str,
+        ttl_seconds: int = 3600,
+        refresh_margin: int = 300,
+        retry_after: int = 600,
+        min_tokens: Optional[int] = None
+    ):
+        self.client = client
+        self.model = model
+        self.system_instruction = system_instruction
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = refresh_margin
+        self.retry_after = retry_after
+        self.min_tokens = min_tokens if min_tokens is not None else min_cache_tokens(model)
+
+        self._lock = threading.Lock()
+        self._name: Optional[str] = None
+        self._expires_at = 0.0
+        self._disabled_until = 0.0
+        # Set once the prefix has been counted and is large enough to cache
+        self._qualified = False
+        self._disabled = False
+
+    def handle(self) -> Optional[str]:
+        """
+        Name of a live cached-content handle, creating or refreshing it as needed
+
+        Returns:
+            Cached content name, or None when the prefix must be sent inline
+        """
+
+        now = time.time()
+
+        with self._lock:
+            if self._disabled or now < self._disabled_until:
+                return None
+
+            if self._name and now < self._expires_at - self.refresh_margin:
+                return self._name
+
+            if self._name and now < self._expires_at:
+                if self._refresh(now):
+                    return self._name
+
+            if not self._qualified and not self._qualify(now):
+                return None
+
+            return self._create(now)
+
+    def invalidate(self) -> None:
+        """Forget the handle (e.g. after the provider reports it missing)"""
+        with self._lock:
+            self._name = None
+            self._expires_at = 0.0
+
+    def _qualify(self, now: float) -> bool:
+        try:
+            tokens = self.client.models.count_tokens(model=self.model, contents=self.system_instruction).total_tokens
+        except Exception as e:
+            print(f"[GEMINI] Failed to count prompt prefix tokens, sending prefix inline: {e}")
+            self._disabled_until = now + self.retry_after
+            return False
+
+        if tokens < self.min_tokens:
+            # The prefix is static, so it will never qualify; stop trying
+            print(f"[GEMINI] Prompt prefix is {tokens} tokens, below the {self.min_tokens}-token minimum for {self.model}; prefix caching disabled")
+            self._disabled = True
+            return False
+
+        self._qualified = True
+        return True
+
+    def _create(self, now: float) -> Optional[str]:
+        from google.genai import types
+
+        try:
+            cache = self.client.caches.create(
+                model=self.model,
+                config=types.CreateCachedContentConfig(
+                    display_name="internify-email-prefix",
+                    system_instruction=self.system_instruction,
+                    ttl=f"{self.ttl_seconds}s",
+                )
+            )
+            self._name = cache.name
+            self._expires_at = now + self.ttl_seconds
+            print(f"[GEMINI] Created prompt prefix cache {cache.name} (TTL {self.ttl_seconds}s)")
+            return self._name
+        except Exception as e:
+            print(f"[GEMINI] Prompt prefix caching unavailable, sending prefix inline: {e}")
+            self._name = None
+            self._disabled_until = now + self.retry_after
+            return None
+
+    def _refresh(self, now: float) -> bool:
+        from google.genai import types
+
+        try:
+            self.client.caches.update(
+                name=self._name,
+                config=types.UpdateCachedContentConfig(ttl=f"{self.ttl_seconds}s")
+            )
+            self._expires_at = now + self.ttl_seconds
+            return True
+        except Exception as e:
+            print(f"[GEMINI] Failed to refresh prompt prefix cache, recreating: {e}")
+            self._name = None
+            return False
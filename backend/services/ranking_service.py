@@ -0,0 +1,199 @@
+import os
+import re
+import zlib
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+import numpy as np
+from dotenv import load_dotenv
+
+from services.cache import TTLCache
+
+load_dotenv()
+
+
+# Words that carry no signal about fit (on top of what IDF already discounts)
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could do does
+during each etc for from had has have having he her his how i if in into is it its just may me
+more most must my no not of on or other our out over own same she should so some such than that
+the their them then there these they this those through to too under up us very was we were what
+when where which while who will with would you your
+ability able apply candidate candidates experience including intern interns internship internships
+join looking opportunity preferred required requirements responsibilities role strong team work
+working years
+""".split())
+
+_TOKEN = re.compile(r"[a-z0-9][a-z0-9+#]*(?:\.[a-z0-9]+)*")
+
+# A sparse term-frequency vector: (sorted feature columns, weights)
+SparseVector = Tuple[np.ndarray, np.ndarray]
+
+
+class RankingService:
+    """
+    Scores internship listings against a resume
+
+    Hashed-feature TF-IDF: tokens are hashed into a fixed number of columns,
+    term frequencies are sublinear (1 + log tf) and IDF comes from the batch
+    of listings being ranked. All listings of a search are scored at once as
+    one sparse matrix-vector product (cosine similarity) in NumPy.
+    """
+
+    def __init__(self):
+        self.dimensions = 1 << int(os.getenv("RANKING_HASH_BITS", "18"))
+        self.title_weight = 2  # title tokens count this many times
+
+        # resume_id -> SparseVector
+        self.resume_vectors = TTLCache(
+            maxsize=int(os.getenv("RANKING_RESUME_CACHE_SIZE", "512")),
+            ttl=float(os.getenv("RANKING_CACHE_TTL_SECONDS", "3600"))
+        )
+        # (listing id, content hash) -> SparseVector; the same stored listings come back across
+        # searches, and re-scraped duplicates are merged into the same id with new text
+        self.listing_vectors = TTLCache(
+            maxsize=int(os.getenv("RANKING_LISTING_CACHE_SIZE", "4096")),
+            ttl=float(os.getenv("RANKING_CACHE_TTL_SECONDS", "3600"))
+        )
+        # token -> column, so each distinct token is hashed once
+        self._columns: Dict[str, int] = {}
+
+    def tokenize(self, text: str) -> List[str]:
+        return [token for token in _TOKEN.findall((text or "").lower()) if token not in STOPWORDS]
+
+    def vectorize(self, tokens: List[str]) -> SparseVector:
+        """Sparse sublinear term-frequency vector of a token list"""
+        columns = self._columns
+        if len(columns) > 200_000:
+            columns.clear()
+
+        counts = Counter(tokens)
+        if not counts:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        hashed = []
+        for token in counts:
+            column = columns.get(token)
+            if column is None:
+                column = columns[token] = zlib.crc32(token.encode("utf-8")) % self.dimensions
+            hashed.append(column)
+
+        hashed = np.array(hashed, dtype=np.int64)
+        tf = 1.0 + np.log(np.fromiter(counts.values(), dtype=np.float64, count=len(counts)))
+
+        # Sort, merging tokens that hashed to the same column
+        unique, inverse = np.unique(hashed, return_inverse=True)
+        return unique, np.bincount(inverse, weights=tf, minlength=len(unique))
+
+    def resume_vector(self, resume_id: Optional[str], resume_text: str) -> SparseVector:
+        """Resume vector, cached per resume_id (resumes are never edited in place)"""
+        if resume_id is not None:
+            cached = self.resume_vectors.get(resume_id)
+            if cached is not None:
+                return cached
+
+        vector = self.vectorize(self.tokenize(resume_text))
+        if resume_id is not None:
+            self.resume_vectors.set(resume_id, vector)
+        return vector
+
+    def listing_tokens(self, internship: Dict[str, Any]) -> List[str]:
+        title = self.tokenize(internship.get("title") or "")
+        return title * self.title_weight + self.tokenize(internship.get("description") or "")
+
+    def listing_vector(self, internship: Dict[str, Any]) -> SparseVector:
+        """Listing vector, cached per stored listing id and text (listings are updated in place)"""
+        key = None
+        if internship.get("id") is not None:
+            text = f"{internship.get('title') or ''}\0{internship.get('description') or ''}"
+            key = (internship["id"], zlib.crc32(text.encode("utf-8")))
+            cached = self.listing_vectors.get(key)
+            if cached is not None:
+                return cached
+
+        vector = self.vectorize(self.listing_tokens(internship))
+        if key is not None:
+            self.listing_vectors.set(key, vector)
+        return vector
+
+    def score(self, resume: SparseVector, internships: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Cosine similarity of every listing to the resume
+
+        Returns:
+            Array of scores in [0, 1], one per listing
+        """
+
+        count = len(internships)
+        if count == 0:
+            return np.zeros(0)
+
+        vectors = [self.listing_vector(internship) for internship in internships]
+        lengths = np.array([len(columns) for columns, _ in vectors])
+        if not lengths.sum():
+            return np.zeros(count)
+
+        # COO form of the listings x features matrix
+        rows = np.repeat(np.arange(count), lengths)
+        columns = np.concatenate([columns for columns, _ in vectors])
+        tf = np.concatenate([weights for _, weights in vectors])
+
+        # Work in the batch vocabulary rather than all hashed dimensions
+        vocabulary, inverse = np.unique(columns, return_inverse=True)
+        document_frequency = np.bincount(inverse, minlength=len(vocabulary))
+        idf = np.log((1.0 + count) / (1.0 + document_frequency)) + 1.0
+        unseen_idf = np.log(1.0 + count) + 1.0
+
+        weights = tf * idf[inverse]
+        listing_norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=count))
+
+        # Resume projected onto the batch vocabulary; its other terms only add to its norm
+        resume_columns, resume_tf = resume
+        positions = np.searchsorted(vocabulary, resume_columns)
+        positions[positions == len(vocabulary)] = 0
+        shared = vocabulary[positions] == resume_columns
+
+        resume_dense = np.zeros(len(vocabulary))
+        resume_dense[positions[shared]] = resume_tf[shared] * idf[positions[shared]]
+        resume_norm = np.sqrt(
+            np.dot(resume_dense, resume_dense) + np.sum((resume_tf[~shared] * unseen_idf) ** 2)
+        )
+
+        dots = np.bincount(rows, weights=weights * resume_dense[inverse], minlength=count)
+        denominators = listing_norms * resume_norm
+        return np.divide(dots, denominators, out=np.zeros(count), where=denominators > 0)
+
+    def rank(
+        self,
+        internships: List[Dict[str, Any]],
+        resume_text: str,
+        resume_id: Optional[str] = None,
+        sort_by_match: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        Add a `match_score` (0-1) to each listing
+
+        Args:
+            internships: Listings with title and description
+            resume_text: Resume to match against
+            resume_id: Cache key for the resume vector
+            sort_by_match: Order by match_score (best first) instead of keeping the input order
+
+        Returns:
+            New listing dicts with match_score
+        """
+
+        scores = self.score(self.resume_vector(resume_id, resume_text), internships)
+        ranked = [
+            {**internship, "match_score": round(float(score), 3)}
+            for internship, score in zip(internships, scores)
+        ]
+
+        if sort_by_match:
+            # Stable, so equal scores keep their search order
+            ranked.sort(key=lambda internship: internship["match_score"], reverse=True)
+
+        return ranked
+
+
+# Singleton instance
+ranking_service = RankingService()
@@ -0,0 +1,267 @@
+import os
+import time
+import threading
+from dataclasses import dataclass
+from typing import Optional, Dict, Tuple, Iterable
+from dotenv import load_dotenv
+
+from services.metrics import metrics, Sample
+
+load_dotenv()
+
+
+@dataclass(frozen=True)
+class BucketConfig:
+    """Token bucket shape: `capacity` tokens, refilled fully every `period` seconds"""
+    capacity: float
+    period: float
+
+    @property
+    def refill_rate(self) -> float:
+        return self.capacity / self.period
+
+
+@dataclass
+class BucketDecision:
+    """Outcome of taking tokens from a bucket"""
+    allowed: bool
+    level: float
+    retry_after: float = 0.0
+
+
+def parse_limit(value: Optional[str], default: str) -> Optional[BucketConfig]:
+    """
+    Parse a limit written as "<capacity>/<seconds>" (e.g. "10/60")
+
+    An empty value or "off" disables the bucket.
+    """
+    raw = (value if value is not None else default).strip()
+    if not raw or raw.lower() == "off":
+        return None
+
+    capacity, _, period = raw.partition("/")
+    return BucketConfig(capacity=float(capacity), period=float(period or 1))
+
+
+class BucketBackend:
+    """Storage for token bucket state. Subclass to share buckets between workers."""
+
+    def take(self, key: str, config: BucketConfig, cost: float = 1.0) -> BucketDecision:
+        raise NotImplementedError
+
+    def refund(self, key: str, config: BucketConfig, cost: float = 1.0) -> None:
+        """Give back tokens taken for a request that didn't go ahead (reads cap the level at capacity)"""
+        self.take(key, config, -cost)
+
+    def levels(self) -> Dict[str, float]:
+        """Current token level of every known bucket"""
+        raise NotImplementedError
+
+
+class InMemoryBucketBackend(BucketBackend):
+    """Per-process bucket state, guarded by a lock"""
+
+    # Drop full buckets once this many are tracked
+    PRUNE_THRESHOLD = 10000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float, BucketConfig]] = {}
+
+    def take(self, key: str, config: BucketConfig, cost: float = 1.0) -> BucketDecision:
+        now = time.monotonic()
+
+        with self._lock:
+            if len(self._buckets) > self.PRUNE_THRESHOLD:
+                self._prune(now)
+
+            tokens, updated_at, _ = self._buckets.get(key, (config.capacity, now, config))
+            tokens = min(config.capacity, tokens + (now - updated_at) * config.refill_rate)
+
+            if tokens >= cost:
+                tokens -= cost
+                self._buckets[key] = (tokens, now, config)
+                return BucketDecision(allowed=True, level=tokens)
+
+            self._buckets[key] = (tokens, now, config)
+            retry_after = (cost - tokens) / config.refill_rate
+            return BucketDecision(allowed=False, level=tokens, retry_after=retry_after)
+
+    def _prune(self, now: float) -> None:
+        """Forget buckets that have refilled completely; they behave like new ones"""
+        self._buckets = {
+            key: state for key, state in self._buckets.items()
+            if state[0] + (now - state[1]) * state[2].refill_rate < state[2].capacity
+        }
+
+    def levels(self) -> Dict[str, float]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                key: min(config.capacity, tokens + (now - updated_at) * config.refill_rate)
+                for key, (tokens, updated_at, config) in self._buckets.items()
+            }
+
+
+class RedisBucketBackend(BucketBackend):
+    """Bucket state shared between workers through Redis (atomic Lua script)"""
+
+    _SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local now = tonumber(ARGV[4])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+    def __init__(self, url: str, prefix: str = "internify:ratelimit:"):
+        import redis
+
+        self.client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._script = self.client.register_script(self._SCRIPT)
+        # Last level seen by this worker, for metrics
+        self._levels: Dict[str, float] = {}
+
+    def take(self, key: str, config: BucketConfig, cost: float = 1.0) -> BucketDecision:
+        allowed, tokens = self._script(
+            keys=[self.prefix + key],
+            args=[config.capacity, config.refill_rate, cost, time.time()]
+        )
+        tokens = float(tokens)
+        self._levels[key] = tokens
+
+        if allowed:
+            return BucketDecision(allowed=True, level=tokens)
+
+        return BucketDecision(
+            allowed=False,
+            level=tokens,
+            retry_after=(cost - tokens) / config.refill_rate
+        )
+
+    def levels(self) -> Dict[str, float]:
+        return dict(self._levels)
+
+
+def _create_backend() -> BucketBackend:
+    """Use Redis when RATE_LIMIT_REDIS_URL is set, otherwise keep state in-process"""
+    redis_url = os.getenv("RATE_LIMIT_REDIS_URL")
+
+    if redis_url:
+        try:
+            return RedisBucketBackend(redis_url)
+        except ImportError:
+            print("Redis library not installed. Install with: pip install redis")
+        except Exception as e:
+            print(f"[RATE LIMIT] Failed to connect to Redis, using in-process buckets: {e}")
+
+    return InMemoryBucketBackend()
+
+
+class RateLimiter:
+    """Token bucket rate limiting per user and route, and globally per upstream provider"""
+
+    def __init__(self, backend: Optional[BucketBackend] = None):
+        self.backend = backend or _create_backend()
+
+        # Per-user limits for each rate limited route
+        self.route_limits: Dict[str, Optional[BucketConfig]] = {
+            "internships.search": parse_limit(os.getenv("RATE_LIMIT_SEARCH"), "10/60"),
+            "llm.generate": parse_limit(os.getenv("RATE_LIMIT_GENERATE"), "10/60"),
+            "email.send": parse_limit(os.getenv("RATE_LIMIT_SEND"), "20/3600"),
+        }
+
+        # Global limits shared by all users of an upstream provider
+        self.upstream_limits: Dict[str, Optional[BucketConfig]] = {
+            "serpapi": parse_limit(os.getenv("RATE_LIMIT_SERPAPI"), "30/60"),
+            "llm": parse_limit(os.getenv("RATE_LIMIT_LLM"), "30/60"),
+            "resend": parse_limit(os.getenv("RATE_LIMIT_RESEND"), "2/1"),
+        }
+
+        metrics.describe("rate_limit_bucket_tokens", "gauge", "Tokens left in each rate limit bucket")
+        metrics.describe("rate_limit_rejections_total", "counter", "Requests rejected by a rate limit bucket")
+        metrics.register_collector(self._collect_levels)
+
+    def check(
+        self,
+        user_id: str,
+        route: str,
+        upstream: Optional[str] = None,
+        cost: float = 1.0
+    ) -> BucketDecision:
+        """
+        Take tokens for a request from the user's route bucket and the upstream bucket
+
+        Args:
+            user_id: Authenticated user ID
+            route: Route key from `route_limits`
+            upstream: Optional upstream provider key from `upstream_limits`
+            cost: Number of tokens the request consumes
+
+        Returns:
+            The first rejecting decision, or the last allowing one. When the
+            upstream bucket rejects, the user's tokens are given back.
+        """
+
+        decision = BucketDecision(allowed=True, level=float("inf"))
+
+        route_key = f"user:{user_id}:{route}"
+        route_config = self.route_limits.get(route)
+        if route_config:
+            decision = self.backend.take(route_key, route_config, cost)
+            if not decision.allowed:
+                metrics.inc("rate_limit_rejections_total", scope="user", bucket=route)
+                return decision
+
+        if upstream:
+            upstream_decision = self.check_upstream(upstream, cost)
+            if not upstream_decision.allowed and route_config:
+                # The request won't run; don't charge the user for it
+                self.backend.refund(route_key, route_config, cost)
+            decision = upstream_decision
+
+        return decision
+
+    def check_upstream(self, upstream: str, cost: float = 1.0) -> BucketDecision:
+        """Take tokens from a global upstream bucket only"""
+
+        upstream_config = self.upstream_limits.get(upstream)
+        if not upstream_config:
+            return BucketDecision(allowed=True, level=float("inf"))
+
+        decision = self.backend.take(f"upstream:{upstream}", upstream_config, cost)
+        if not decision.allowed:
+            metrics.inc("rate_limit_rejections_total", scope="upstream", bucket=upstream)
+
+        return decision
+
+    def _collect_levels(self) -> Iterable[Sample]:
+        """Export bucket levels. Per-user buckets report the lowest level per route to bound label cardinality."""
+
+        per_route: Dict[str, float] = {}
+
+        for key, level in self.backend.levels().items():
+            if key.startswith("upstream:"):
+                yield ("rate_limit_bucket_tokens", {"scope": "upstream", "bucket": key.split(":", 1)[1]}, level)
+            else:
+                route = key.rsplit(":", 1)[-1]
+                per_route[route] = min(per_route.get(route, level), level)
+
+        for route, level in per_route.items():
+            yield ("rate_limit_bucket_tokens", {"scope": "user", "bucket": route}, level)
+
+
+# Singleton instance
+rate_limiter = RateLimiter()
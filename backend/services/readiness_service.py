@@ -0,0 +1,182 @@
+import os
+import re
+import time
+import asyncio
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional
+from dotenv import load_dotenv
+
+from services.metrics import metrics
+
+load_dotenv()
+
+
+Probe = Callable[[], Awaitable[Optional[str]]]
+
+# /ready is unauthenticated; keep credentials in request URLs out of error messages
+_SECRET_PARAM = re.compile(r"((?:api_key|apikey|key|token)=)[^&\s'\")]+", re.IGNORECASE)
+
+
+class ReadinessService:
+    """
+    Dependency probes behind /ready
+
+    Probes run concurrently, each bounded by `timeout`. Results are cached
+    for `ttl` seconds and concurrent checks share one in-flight probe, so
+    frequent load balancer polling doesn't turn into upstream traffic.
+    """
+
+    def __init__(
+        self,
+        timeout: Optional[float] = None,
+        ttl: Optional[float] = None,
+        required: Optional[List[str]] = None,
+        probes: Optional[Dict[str, Probe]] = None,
+    ):
+        """
+        Args:
+            timeout: Seconds each probe may take
+            ttl: Seconds a probe result is reused
+            required: Dependencies that must be up for the instance to be ready;
+                the others are reported but don't fail readiness
+            probes: Name -> async callable raising on failure (defaults to the
+                Supabase, SerpAPI, LLM and Resend probes)
+        """
+        self.timeout = timeout if timeout is not None else float(os.getenv("READY_PROBE_TIMEOUT_SECONDS", "2"))
+        self.ttl = ttl if ttl is not None else float(os.getenv("READY_CACHE_TTL_SECONDS", "10"))
+        self.required = required if required is not None else [
+            name.strip() for name in os.getenv("READY_REQUIRED", "supabase,llm").split(",") if name.strip()
+        ]
+        self.probes: Dict[str, Probe] = probes if probes is not None else {
+            "supabase": self._probe_supabase,
+            "serpapi": self._probe_serpapi,
+            "llm": self._probe_llm,
+            "resend": self._probe_resend,
+        }
+
+        # name -> (result, monotonic expiry)
+        self._results: Dict[str, tuple] = {}
+        self._inflight: Dict[str, asyncio.Task] = {}
+
+        metrics.describe("readiness_probe_latency_ms", "gauge", "Latency of the last readiness probe per dependency")
+        metrics.describe("readiness_probe_up", "gauge", "Whether the last readiness probe succeeded (1) or not (0)")
+
+    async def check(self) -> Dict:
+        """
+        Probe every dependency (or reuse recent results)
+
+        Returns:
+            Dict with `ready` and a result per dependency: status (ok, error or
+            timeout), latency_ms, checked_at, cached, and error when it failed
+        """
+
+        names = list(self.probes)
+        results = await asyncio.gather(*(self._result(name) for name in names))
+        dependencies = dict(zip(names, results))
+
+        ready = all(
+            dependencies[name]["status"] == "ok"
+            for name in self.required if name in dependencies
+        )
+
+        return {
+            "ready": ready,
+            "required": [name for name in self.required if name in dependencies],
+            "dependencies": dependencies,
+        }
+
+    async def _result(self, name: str) -> Dict:
+        cached = self._results.get(name)
+        if cached and cached[1] > time.monotonic():
+            return {**cached[0], "cached": True}
+
+        task = self._inflight.get(name)
+        if task is None:
+            task = asyncio.create_task(self._run(name))
+            self._inflight[name] = task
+            task.add_done_callback(lambda _, name=name: self._inflight.pop(name, None))
+
+        return {**await asyncio.shield(task), "cached": False}
+
+    async def _run(self, name: str) -> Dict:
+        started = time.perf_counter()
+        result = {"status": "ok"}
+
+        try:
+            detail = await asyncio.wait_for(self.probes[name](), timeout=self.timeout)
+            if detail:
+                result["detail"] = detail
+        except asyncio.TimeoutError:
+            result = {"status": "timeout", "error": f"no response within {self.timeout:g}s"}
+        except Exception as e:
+            result = {"status": "error", "error": _SECRET_PARAM.sub(r"\1***", f"{type(e).__name__}: {e}")[:300]}
+
+        latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        result["latency_ms"] = latency_ms
+        result["checked_at"] = datetime.now(timezone.utc).isoformat()
+
+        metrics.set("readiness_probe_latency_ms", latency_ms, dependency=name)
+        metrics.set("readiness_probe_up", 1 if result["status"] == "ok" else 0, dependency=name)
+        if result["status"] != "ok":
+            print(f"[READY] {name} probe failed: {result['error']}")
+
+        self._results[name] = (result, time.monotonic() + self.ttl)
+        return result
+
+    # Probes: return an optional detail string, raise on failure.
+    # They call the clients directly rather than through the circuit breakers,
+    # so a probe reports the dependency's actual state and doesn't count as traffic.
+
+    async def _probe_supabase(self) -> Optional[str]:
+        from services.supabase_service import supabase_service
+
+        query = supabase_service.client.table("users").select("id").limit(1)
+        await asyncio.to_thread(query.execute)
+        return None
+
+    async def _probe_serpapi(self) -> Optional[str]:
+        import requests
+        from services.scraper_service import scraper_service
+
+        # The account endpoint doesn't count against the search quota
+        def fetch():
+            response = requests.get(
+                scraper_service.base_url.rsplit("/", 1)[0] + "/account.json",
+                params={"api_key": scraper_service.api_key},
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            return response.json()
+
+        account = await asyncio.to_thread(fetch)
+        left = account.get("total_searches_left")
+        return f"{left} searches left" if left is not None else None
+
+    async def _probe_llm(self) -> Optional[str]:
+        from services.llm_service import llm_service
+
+        if llm_service.use_groq:
+            # No client retries: the probe has its own timeout
+            await llm_service.groq_client.with_options(max_retries=0).models.retrieve(llm_service.groq_model)
+            return f"groq {llm_service.groq_model}"
+        if llm_service.use_gemini:
+            await llm_service.genai_client.aio.models.get(model=llm_service.gemini_model)
+            return f"gemini {llm_service.gemini_model}"
+        raise RuntimeError("no LLM provider configured")
+
+    async def _probe_resend(self) -> Optional[str]:
+        import resend
+        from resend.exceptions import ResendError
+
+        try:
+            await asyncio.to_thread(resend.Domains.list)
+        except ResendError as e:
+            # Sending-only keys can't list domains, but the API answered and accepted the key
+            if e.error_type == "restricted_api_key":
+                return "reachable (sending-only key)"
+            raise
+        return None
+
+
+# Singleton instance
+readiness_service = ReadinessService()
@@ -2,6 +2,8 @@ import os
 from typing import Optional
 from dotenv import load_dotenv
 import resend
+from services.circuit_breaker import circuit_breakers, CircuitOpenError
+from services.email_renderer import email_renderer, RenderedEmail
 
 load_dotenv()
 
@@ -16,7 +18,11 @@ class ResendService:
             raise ValueError("RESEND_API_KEY not found in environment variables")
         
         resend.api_key = api_key
+        # Overridable to point at a local stand-in (see perf/)
+        resend.api_url = os.getenv("RESEND_API_URL", resend.api_url)
         self.from_email = os.getenv("RESEND_FROM_EMAIL", "onboarding@resend.dev")
+        self.breaker = circuit_breakers.get("resend")
+        self.batch_size = 100  # Resend's limit per batch request
     
     async def send_email(
         self,
@@ -32,7 +38,7 @@ class ResendService:
         Args:
             to_email: Recipient email address
             subject: Email subject line
-            body: Email body (plain text or HTML)
+            body: Email body as plain text (escaped and wrapped in the HTML template)
             from_name: Name to display as sender
             reply_to: Email to use for replies
         
@@ -41,111 +47,87 @@ class ResendService:
         """
         
         try:
-            # Add professional footer
-            email_body = self._format_email_body(body)
+            params = self._build_params(to_email, subject, email_renderer.render(body), from_name, reply_to)
             
-            params = {
-                "from": f"{from_name} <{self.from_email}>",
-                "to": [to_email],
-                "subject": subject,
-                "html": email_body,
-            }
-            
-            # Add reply-to if provided
-            if reply_to:
-                params["reply_to"] = reply_to
-            
-            # Send email
-            response = resend.Emails.send(params)
+            # Send email (fails fast while Resend is unhealthy)
+            with self.breaker:
+                response = resend.Emails.send(params)
             
             return response
         
+        except CircuitOpenError as e:
+            print(f"[RESEND] Not sending: {e}")
+            return None
         except Exception as e:
             print(f"Error sending email via Resend: {e}")
             return None
     
-    def _format_email_body(self, body: str) -> str:
-        """Format email body with HTML and footer"""
-        
-        # Convert plain text to HTML if needed
-        if not body.startswith("<"):
-            # Convert line breaks to <br> tags
-            body = body.replace("\n", "<br>")
-        
-        # Add professional HTML wrapper
-        html_body = f"""
-<!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <style>
-        body {{
-            font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 600px;
-            margin: 0 auto;
-            padding: 20px;
-        }}
-        .email-content {{
-            margin-bottom: 30px;
-        }}
-        .footer {{
-            margin-top: 40px;
-            padding-top: 20px;
-            border-top: 1px solid #e0e0e0;
-            font-size: 12px;
-            color: #666;
-            text-align: center;
-        }}
-        .footer a {{
-            color: #4f46e5;
-            text-decoration: none;
-        }}
-    </style>
-</head>
-<body>
-    <div class="email-content">
-        {body}
-    </div>
-    
-    <div class="footer">
-        <p>This email was sent via <a href="https://internify.app" target="_blank">Internify</a></p>
-        <p style="font-size: 11px; color: #999;">
-            If you'd like to stop receiving emails from this sender, please reply directly to them.
-        </p>
-    </div>
-</body>
-</html>
-"""
-        return html_body
-    
     async def send_batch_emails(
         self,
-        emails: list[dict]
+        emails: list[dict],
+        from_name: str = "Internify"
     ) -> list[Optional[dict]]:
         """
         Send multiple emails in batch
         
+        Renders every body up front and sends up to `batch_size` emails per
+        Resend batch request.
+        
         Args:
-            emails: List of email dictionaries with keys: to, subject, body
+            emails: List of email dictionaries with keys: to, subject, body, reply_to (optional)
+            from_name: Name to display as sender
         
         Returns:
-            List of responses from Resend API
+            Per email, in order: {"id": ...} from Resend, or None if its batch failed
         """
-        results = []
+        rendered = email_renderer.render_batch(email.get("body") for email in emails)
+        params = [
+            self._build_params(email.get("to"), email.get("subject"), parts, from_name, email.get("reply_to"))
+            for email, parts in zip(emails, rendered)
+        ]
         
-        for email in emails:
-            result = await self.send_email(
-                to_email=email.get("to"),
-                subject=email.get("subject"),
-                body=email.get("body"),
-                reply_to=email.get("reply_to")
-            )
-            results.append(result)
+        results: list[Optional[dict]] = []
+        
+        for start in range(0, len(params), self.batch_size):
+            chunk = params[start:start + self.batch_size]
+            
+            try:
+                with self.breaker:
+                    response = resend.Batch.send(chunk)
+                
+                sent = response.get("data") or []
+                results.extend(sent[i] if i < len(sent) else None for i in range(len(chunk)))
+            
+            except CircuitOpenError as e:
+                print(f"[RESEND] Not sending batch: {e}")
+                results.extend([None] * len(chunk))
+            except Exception as e:
+                print(f"Error sending batch via Resend: {e}")
+                results.extend([None] * len(chunk))
         
         return results
+    
+    def _build_params(
+        self,
+        to_email: str,
+        subject: str,
+        parts: RenderedEmail,
+        from_name: str,
+        reply_to: Optional[str]
+    ) -> dict:
+        params = {
+            "from": f"{from_name} <{self.from_email}>",
+            "to": [to_email],
+            "subject": subject,
+            "html": parts.html,
+            "text": parts.text,
+        }
+        
+        # Add reply-to if provided
+        if reply_to:
+            params["reply_to"] = reply_to
+        
+        return params
 
 
 # Singleton instance
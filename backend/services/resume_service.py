@@ -0,0 +1,98 @@
+import os
+from typing import Optional, Tuple
+from dotenv import load_dotenv
+
+from services.cache import TTLCache
+from services.metrics import metrics
+from services.supabase_service import supabase_service
+
+load_dotenv()
+
+
+class ResumeService:
+    """
+    Resolves resume text for email generation
+
+    Keeps a per-process LRU of recently used resumes so generate requests can
+    reference a resume by id instead of posting its extracted text, and most
+    of them don't reach the database either.
+    """
+
+    def __init__(self):
+        # (user_id, resume_id) -> extracted text; resumes are never edited in place
+        self.texts = TTLCache(
+            maxsize=int(os.getenv("RESUME_CACHE_SIZE", "512")),
+            ttl=float(os.getenv("RESUME_CACHE_TTL_SECONDS", "1800"))
+        )
+        # user_id -> latest resume_id; short-lived since an upload handled by
+        # another worker doesn't invalidate it here
+        self.latest = TTLCache(
+            maxsize=int(os.getenv("RESUME_CACHE_SIZE", "512")),
+            ttl=float(os.getenv("RESUME_LATEST_TTL_SECONDS", "60"))
+        )
+
+        metrics.describe("resume_cache_requests_total", "counter", "Resume text lookups by result (hit or miss)")
+
+    async def get_text(self, user_id: str, resume_id: Optional[str] = None) -> Optional[str]:
+        """
+        Extracted text of one of the user's resumes
+
+        Args:
+            user_id: Owner of the resume
+            resume_id: Resume to read; the user's latest resume when omitted
+
+        Returns:
+            Extracted text, or None if the resume doesn't exist (or isn't the user's)
+        """
+
+        resume = await self.get_resume(user_id, resume_id)
+        return resume[1] if resume else None
+
+    async def get_resume(self, user_id: str, resume_id: Optional[str] = None) -> Optional[Tuple[str, str]]:
+        """
+        Like `get_text`, but also returns which resume was used
+
+        Returns:
+            (resume_id, extracted text), or None if the resume doesn't exist
+        """
+
+        if resume_id is None:
+            resume_id = self.latest.get(user_id)
+
+        if resume_id is not None:
+            text = self.texts.get((user_id, resume_id))
+            if text is not None:
+                metrics.inc("resume_cache_requests_total", result="hit")
+                return resume_id, text
+
+        metrics.inc("resume_cache_requests_total", result="miss")
+
+        if resume_id is not None:
+            resume = await supabase_service.get_resume_by_id(resume_id, user_id)
+        else:
+            resume = await supabase_service.get_latest_resume(user_id)
+
+        if not resume:
+            return None
+
+        self.remember(user_id, resume, latest=resume_id is None)
+        return resume["id"], resume.get("extracted_text") or ""
+
+    def remember(self, user_id: str, resume: dict, latest: bool = False) -> None:
+        """Cache a resume row (with extracted_text), e.g. right after upload"""
+        if resume.get("extracted_text") is None:
+            return
+
+        self.texts.set((user_id, resume["id"]), resume["extracted_text"])
+        if latest:
+            self.latest.set(user_id, resume["id"])
+
+    def forget(self, user_id: str, resume_id: str) -> None:
+        """Drop a deleted resume"""
+        self.texts.pop((user_id, resume_id))
+        if self.latest.get(user_id) == resume_id:
+            self.latest.pop(user_id)
+
+
+# Singleton instance
+resume_service = ResumeService()
@@ -1,11 +1,29 @@
 import os
+import re
+import copy
+import msgspec
 import requests
 from typing import Optional, List, Dict, Any
 from dotenv import load_dotenv
+from models.internship import InternshipRecord, SerpJob, SerpJobsPage
+from services.dedup_service import dedup_service
+from services.cache import TTLCache
+from services.circuit_breaker import circuit_breakers, CircuitOpenError
 
 load_dotenv()
 
 
+_page_decoder = msgspec.json.Decoder(SerpJobsPage)
+_job_decoder = msgspec.json.Decoder(SerpJob)
+
+_EMAIL = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
+# Indian phone numbers (various formats)
+# Matches: +91-XXXXXXXXXX, 91XXXXXXXXXX, 0XXXXXXXXXX, XXXXXXXXXX
+# The lookahead skips positions that can't start a number (every match starts
+# with two of these characters) without trying each alternative there.
+_PHONE = re.compile(r'(?=[+\d\s-][+\d\s-])(?:\+91|91)?[\s-]?(?:\d{5}[\s-]?\d{5}|\d{10}|\d{3}[\s-]?\d{3}[\s-]?\d{4})')
+
+
 class ScraperService:
     """Service for scraping internship listings using SerpAPI"""
     
@@ -15,14 +33,34 @@ class ScraperService:
         if not self.api_key:
             raise ValueError("SERPAPI_KEY not found in environment variables")
         
-        self.base_url = "https://serpapi.com/search"
+        # Overridable to point at a local stand-in (see perf/)
+        self.base_url = os.getenv("SERPAPI_BASE_URL", "https://serpapi.com/search")
+        self.timeout = float(os.getenv("SERPAPI_TIMEOUT_SECONDS", "15"))
+        self.breaker = circuit_breakers.get("serpapi")
+        
+        # Recent SerpAPI results, keyed by normalized (query, location)
+        self.search_cache = TTLCache(
+            maxsize=int(os.getenv("SEARCH_CACHE_SIZE", "256")),
+            ttl=float(os.getenv("SEARCH_CACHE_TTL_SECONDS", "3600"))
+        )
+    
+    @staticmethod
+    def cache_key(query: str, location: Optional[str] = None) -> tuple:
+        """Normalized search cache key"""
+        return (" ".join(query.lower().split()), " ".join((location or "").lower().split()))
+    
+    def has_cached(self, query: str, location: Optional[str] = None, limit: int = 10) -> bool:
+        """Whether search_internships can answer this search without calling SerpAPI"""
+        cached = self.search_cache.get(self.cache_key(query, location))
+        return bool(cached) and cached[0] >= limit
     
     async def search_internships(
         self,
         query: str,
         location: Optional[str] = None,
-        limit: int = 10
-    ) -> List[Dict[str, Any]]:
+        limit: int = 10,
+        use_cache: bool = True
+    ) -> List[InternshipRecord]:
         """
         Search for internship listings on LinkedIn via SerpAPI
         
@@ -30,11 +68,23 @@ class ScraperService:
             query: Internship search query (e.g., "Software Engineer Intern")
             location: Location filter (e.g., "Bangalore, India")
             limit: Maximum number of results to return
+            use_cache: Serve recent results for the same search from the cache.
+                When False, SerpAPI is always called and the cache is refreshed.
         
         Returns:
-            List of internship dictionaries
+            List of internship records
         """
         
+        key = self.cache_key(query, location)
+        
+        if use_cache:
+            cached = self.search_cache.get(key)
+            # Only serve entries fetched with at least the requested limit
+            if cached and cached[0] >= limit:
+                print(f"[SCRAPER] Search cache hit: {key}")
+                # Callers merge and annotate listings in place
+                return [copy.copy(internship) for internship in cached[1][:limit]]
+        
         try:
             # Build search query with focus on India
             search_query = f"{query} internship"
@@ -60,62 +110,69 @@ class ScraperService:
                 "hl": "en",  # Language
             }
             
-            # Make API request
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
+            # Make API request (fails fast while SerpAPI is unhealthy)
+            with self.breaker:
+                response = requests.get(self.base_url, params=params, timeout=self.timeout)
+                response.raise_for_status()
             
-            data = response.json()
+            # Parse results and merge duplicate postings
+            internships = dedup_service.deduplicate(self._parse_internship_results(response.content))[:limit]
             
-            # Parse results
-            internships = self._parse_internship_results(data)
+            if internships:
+                self.search_cache.set(key, (limit, [copy.copy(internship) for internship in internships]))
             
-            return internships[:limit]
+            return internships
         
+        except CircuitOpenError as e:
+            print(f"[SCRAPER] Skipping search: {e}")
+            return []
         except Exception as e:
             print(f"Error searching internships: {e}")
             return []
     
-    def _parse_internship_results(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Parse SerpAPI response into internship dictionaries"""
+    def _parse_internship_results(self, content: bytes) -> List[InternshipRecord]:
+        """
+        Parse a SerpAPI response body into internship records
         
-        internships = []
+        Decodes straight from the raw JSON, materializing only the fields in
+        SerpJob. Jobs that don't match the schema are skipped.
+        """
         
-        if "jobs_results" not in data:
-            return internships
+        internships = []
         
-        for job in data["jobs_results"]:
-            # Extract contact information
-            contact_info = self._extract_contact_info(job)
+        for raw_job in _page_decoder.decode(content).jobs_results:
+            try:
+                job = _job_decoder.decode(raw_job)
+            except msgspec.ValidationError as e:
+                print(f"[SCRAPER] Skipping malformed job: {e}")
+                continue
             
-            parsed_internship = {
-                "title": job.get("title", ""),
-                "company": job.get("company_name", ""),
-                "location": job.get("location", ""),
-                "description": job.get("description", ""),
-                "link": job.get("share_url") or job.get("apply_link", ""),
-                "posted_at": job.get("detected_extensions", {}).get("posted_at"),
-                "job_type": ", ".join(job.get("detected_extensions", {}).get("schedule_type", [])),
-                "salary": self._extract_salary(job),
-                "contact_email": contact_info.get("email"),
-                "contact_phone": contact_info.get("phone"),
-                "contact_website": contact_info.get("website"),
-            }
+            extensions = job.detected_extensions
+            schedule_type = extensions.schedule_type if extensions else None
             
-            internships.append(parsed_internship)
+            internships.append(InternshipRecord(
+                title=job.title or "",
+                company=job.company_name or "",
+                location=job.location or "",
+                description=job.description or "",
+                link=job.share_url or job.apply_link or "",
+                posted_at=extensions.posted_at if extensions else None,
+                job_type=", ".join(schedule_type) if isinstance(schedule_type, list) else schedule_type or "",
+                salary=self._extract_salary(job),
+                **self._extract_contact_info(job)
+            ))
         
         return internships
     
-    def _extract_salary(self, job: Dict[str, Any]) -> Optional[str]:
+    def _extract_salary(self, job: SerpJob) -> Optional[str]:
         """Extract salary information from internship listing"""
         
-        extensions = job.get("detected_extensions", {})
-        
         # Check for salary in extensions
-        if "salary" in extensions:
-            return extensions["salary"]
+        if job.detected_extensions and job.detected_extensions.salary:
+            return job.detected_extensions.salary
         
         # Check in description
-        description = job.get("description", "").lower()
+        description = (job.description or "").lower()
         if "$" in description or "salary" in description or "₹" in description or "inr" in description:
             # Simple extraction - could be improved
             words = description.split()
@@ -125,54 +182,43 @@ class ScraperService:
         
         return None
     
-    def _extract_contact_info(self, job: Dict[str, Any]) -> Dict[str, Optional[str]]:
+    def _extract_contact_info(self, job: SerpJob) -> Dict[str, Optional[str]]:
         """Extract contact information from job listing"""
-        import re
         
         contact_info = {
-            "email": None,
-            "phone": None,
-            "website": None
+            "contact_email": None,
+            "contact_phone": None,
+            "contact_website": None
         }
         
-        # Get description and other text fields
-        description = job.get("description", "")
-        title = job.get("title", "")
-        company_name = job.get("company_name", "")
+        company_name = job.company_name or ""
         
         # Combine all text for searching
-        full_text = f"{description} {title} {company_name}"
-        
-        # Extract email using regex
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        emails = re.findall(email_pattern, full_text)
-        if emails:
-            contact_info["email"] = emails[0]
-        
-        # Extract Indian phone numbers (various formats)
-        # Matches: +91-XXXXXXXXXX, 91XXXXXXXXXX, 0XXXXXXXXXX, XXXXXXXXXX
-        phone_pattern = r'(?:\+91|91)?[\s-]?(?:\d{5}[\s-]?\d{5}|\d{10}|\d{3}[\s-]?\d{3}[\s-]?\d{4})'
-        phones = re.findall(phone_pattern, full_text)
-        if phones:
+        full_text = f"{job.description or ''} {job.title or ''} {company_name}"
+        
+        email = _EMAIL.search(full_text) if "@" in full_text else None
+        if email:
+            contact_info["contact_email"] = email.group(0)
+        
+        phone = _PHONE.search(full_text)
+        if phone:
             # Clean up the phone number
-            phone = phones[0].strip()
-            contact_info["phone"] = phone
+            contact_info["contact_phone"] = phone.group(0).strip()
         
         # Extract website/email from apply link
-        apply_link = job.get("apply_link", "")
+        apply_link = job.apply_link or ""
         if apply_link and "mailto:" in apply_link:
             email_from_link = apply_link.replace("mailto:", "").split("?")[0]
-            if not contact_info["email"]:
-                contact_info["email"] = email_from_link
+            if not contact_info["contact_email"]:
+                contact_info["contact_email"] = email_from_link
         
         # Check for company website in related links
-        related_links = job.get("related_links", [])
-        for link in related_links:
-            if isinstance(link, dict) and "link" in link:
-                url = link.get("link", "")
-                if "careers" in url or "jobs" in url or company_name.lower().replace(" ", "") in url.lower():
-                    contact_info["website"] = url
-                    break
+        company_slug = company_name.lower().replace(" ", "")
+        for related in job.related_links:
+            url = related.link
+            if url and ("careers" in url or "jobs" in url or company_slug in url.lower()):
+                contact_info["contact_website"] = url
+                break
         
         return contact_info
     
@@ -194,8 +240,9 @@ class ScraperService:
                 "api_key": self.api_key,
             }
             
-            response = requests.get(self.base_url, params=params)
-            response.raise_for_status()
+            with self.breaker:
+                response = requests.get(self.base_url, params=params, timeout=self.timeout)
+                response.raise_for_status()
             
             data = response.json()
             
@@ -218,7 +265,7 @@ class ScraperService:
         self,
         company_name: str,
         role: Optional[str] = None
-    ) -> List[Dict[str, Any]]:
+    ) -> List[InternshipRecord]:
         """
         Search for internships at a specific company
         
@@ -227,7 +274,7 @@ class ScraperService:
             role: Optional role filter
         
         Returns:
-            List of internship dictionaries
+            List of internship records
         """
         
         query = f"{role + ' at ' if role else ''}{company_name}"
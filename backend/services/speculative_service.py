@@ -0,0 +1,337 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from typing import Any, Dict, List, Optional, Tuple
+from dotenv import load_dotenv
+
+from services.cache import TTLCache
+from services.rate_limiter import rate_limiter
+from services.metrics import metrics
+
+load_dotenv()
+
+
+# Job priorities (lower runs first)
+PRIORITY_VIEW = 0      # The user opened the listing's detail view
+PRIORITY_SEARCH = 1    # A top-ranked search result
+
+
+class SpeculativeService:
+    """
+    Generates emails for listings a user is likely to apply to, before they ask
+
+    Viewing a listing (or getting it as a top search result) enqueues a
+    low-priority background generation with the user's latest resume. The
+    result is cached per user and internship for a short TTL, and `take` hands
+    it to /llm/generate-email. Speculation is opt-in (SPECULATIVE_ENABLED) and
+    never competes with user traffic:
+
+    - the queue is bounded; when full, a new job evicts a queued job of lower
+      priority or is dropped itself
+    - jobs that waited too long are discarded
+    - a job only runs when the user has SPECULATIVE_MIN_TOKENS of daily
+      token budget left and the shared LLM bucket has room
+    """
+
+    def __init__(
+        self,
+        llm=None,
+        resumes=None,
+        usage=None,
+        enabled: Optional[bool] = None,
+        workers: Optional[int] = None,
+        queue_size: Optional[int] = None,
+        per_user: Optional[int] = None,
+        ttl: Optional[float] = None,
+        max_wait: Optional[float] = None,
+        min_tokens: Optional[int] = None,
+    ):
+        """
+        Args:
+            llm: Object with `generate_email`, `generate_subject_line`,
+                `request_key`, `provider_available` and `calls_per_email`
+                (defaults to llm_service)
+            resumes: Object with `get_resume(user_id, resume_id)` (defaults to resume_service)
+            usage: Object with `remaining_tokens(user_id)` (defaults to usage_service)
+            enabled: Accept jobs at all
+            workers: Concurrent background generations
+            queue_size: Maximum queued jobs
+            per_user: Maximum queued jobs per user
+            ttl: Seconds a generated email is kept
+            max_wait: Seconds a job may wait in the queue before it is discarded
+            min_tokens: Daily budget tokens a user must have left for a job to run
+        """
+        self._llm = llm
+        self._resumes = resumes
+        self._usage = usage
+        self.enabled = enabled if enabled is not None else os.getenv("SPECULATIVE_ENABLED", "false").lower() == "true"
+        self.workers = workers if workers is not None else int(os.getenv("SPECULATIVE_WORKERS", "2"))
+        self.queue_size = queue_size if queue_size is not None else int(os.getenv("SPECULATIVE_QUEUE_SIZE", "32"))
+        self.per_user = per_user if per_user is not None else int(os.getenv("SPECULATIVE_MAX_PER_USER", "3"))
+        self.max_wait = max_wait if max_wait is not None else float(os.getenv("SPECULATIVE_MAX_WAIT_SECONDS", "120"))
+        self.min_tokens = min_tokens if min_tokens is not None else int(os.getenv("SPECULATIVE_MIN_TOKENS", "4000"))
+
+        # (user_id, internship_id) -> {"resume_id", "subject", "body"}
+        self.results = TTLCache(
+            maxsize=int(os.getenv("SPECULATIVE_CACHE_SIZE", "1000")),
+            ttl=ttl if ttl is not None else float(os.getenv("SPECULATIVE_TTL_SECONDS", "600"))
+        )
+
+        # Heap of (priority, sequence, key); entries whose key left `_pending` are skipped
+        self._heap: List[Tuple[int, int, tuple]] = []
+        # key -> (priority, sequence, internship, enqueued_at)
+        self._pending: Dict[tuple, Tuple[int, int, Dict[str, Any], float]] = {}
+        self._sequence = itertools.count()
+        # key -> generation task, for requests arriving mid-generation
+        self._running: Dict[tuple, asyncio.Task] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._tasks: List[asyncio.Task] = []
+
+        metrics.describe("speculative_jobs_total", "counter", "Speculative generation jobs by outcome")
+        metrics.describe("speculative_lookups_total", "counter", "generate-email lookups of speculative results")
+        metrics.describe("speculative_queue_depth", "gauge", "Speculative generation jobs waiting")
+        metrics.register_collector(self._collect)
+
+    @property
+    def llm(self):
+        if self._llm is None:
+            from services.llm_service import llm_service
+            self._llm = llm_service
+        return self._llm
+
+    @property
+    def resumes(self):
+        if self._resumes is None:
+            from services.resume_service import resume_service
+            self._resumes = resume_service
+        return self._resumes
+
+    @property
+    def usage(self):
+        if self._usage is None:
+            from services.usage_service import usage_service
+            self._usage = usage_service
+        return self._usage
+
+    def enqueue(self, user_id: str, internship: Dict[str, Any], priority: int = PRIORITY_VIEW) -> bool:
+        """
+        Queue a speculative generation for a stored listing (doesn't block)
+
+        Args:
+            user_id: User the email is for
+            internship: Stored listing (needs id, title and company)
+            priority: PRIORITY_VIEW or PRIORITY_SEARCH
+
+        Returns:
+            Whether the job was queued (False when disabled, redundant or the queue is full)
+        """
+
+        if not self.enabled or not self._tasks or not internship.get("id") or internship.get("already_applied"):
+            return False
+
+        key = (user_id, str(internship["id"]))
+        if key in self._running or self.results.get(key) is not None:
+            return False
+
+        queued = self._pending.get(key)
+        if queued is not None:
+            if priority < queued[0]:
+                # Viewed after showing up in search: move it ahead
+                self._push(key, priority, internship)
+            return True
+
+        if sum(1 for pending in self._pending if pending[0] == user_id) >= self.per_user:
+            metrics.inc("speculative_jobs_total", outcome="dropped_user_limit")
+            return False
+
+        if len(self._pending) >= self.queue_size and not self._evict_below(priority):
+            metrics.inc("speculative_jobs_total", outcome="dropped_queue_full")
+            return False
+
+        self._push(key, priority, internship)
+        metrics.inc("speculative_jobs_total", outcome="queued")
+        return True
+
+    async def take(self, user_id: str, internship_id: str, resume_id: Optional[str] = None) -> Optional[Dict[str, str]]:
+        """
+        The speculatively generated email for a generate request, if any
+
+        Waits for a generation that is already running. A result is handed out
+        once; asking again generates afresh. A queued job that hasn't started
+        is cancelled, since the caller is about to generate the email itself.
+
+        Args:
+            user_id: Requesting user
+            internship_id: Stored listing the email is for
+            resume_id: Resume the email should use (the latest when None)
+
+        Returns:
+            {"subject", "body"} or None
+        """
+
+        if not self.enabled:
+            return None
+
+        key = (user_id, str(internship_id))
+
+        running = self._running.get(key)
+        if running is not None:
+            # Doesn't raise, whether the generation fails or is cancelled
+            await asyncio.wait({running})
+
+        result = self.results.pop(key)
+        if result is not None:
+            if resume_id is None:
+                latest = await self.resumes.get_resume(user_id, None)
+                resume_id = latest[0] if latest else None
+            # Generated with another resume than the one asked for (or since replaced)
+            if result["resume_id"] == resume_id:
+                metrics.inc("speculative_lookups_total", outcome="hit")
+                return {"subject": result["subject"], "body": result["body"]}
+
+        if self._pending.pop(key, None) is not None:
+            metrics.inc("speculative_jobs_total", outcome="cancelled")
+        metrics.inc("speculative_lookups_total", outcome="miss")
+        return None
+
+    def _push(self, key: tuple, priority: int, internship: Dict[str, Any]) -> None:
+        sequence = next(self._sequence)
+        self._pending[key] = (priority, sequence, internship, time.monotonic())
+        heapq.heappush(self._heap, (priority, sequence, key))
+        self._wakeup.set()
+
+    def _evict_below(self, priority: int) -> bool:
+        """Drop the newest queued job of lower priority than `priority`, if there is one"""
+        victims = [(job[0], job[1], key) for key, job in self._pending.items() if job[0] > priority]
+        if not victims:
+            return False
+
+        _, _, key = max(victims)
+        del self._pending[key]
+        metrics.inc("speculative_jobs_total", outcome="evicted")
+        return True
+
+    def _pop(self) -> Optional[Tuple[tuple, Dict[str, Any], float]]:
+        """Highest-priority, oldest queued job"""
+        while self._heap:
+            _, sequence, key = heapq.heappop(self._heap)
+            job = self._pending.get(key)
+            # Skip entries that were evicted, cancelled or re-pushed with a new priority
+            if job is not None and job[1] == sequence:
+                del self._pending[key]
+                return key, job[2], job[3]
+        return None
+
+    async def _worker(self) -> None:
+        while True:
+            job = self._pop()
+            if job is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            key, internship, enqueued_at = job
+            if time.monotonic() - enqueued_at > self.max_wait:
+                metrics.inc("speculative_jobs_total", outcome="expired")
+                continue
+
+            task = asyncio.create_task(self._generate(key, internship))
+            self._running[key] = task
+            try:
+                await asyncio.shield(task)
+            except asyncio.CancelledError:
+                task.cancel()
+                raise
+            except Exception as e:
+                print(f"[SPECULATIVE] Generation failed for internship {key[1]}: {e}")
+            finally:
+                self._running.pop(key, None)
+
+    async def _generate(self, key: tuple, internship: Dict[str, Any]) -> None:
+        user_id = key[0]
+
+        remaining = await self.usage.remaining_tokens(user_id)
+        if remaining is not None and remaining < self.min_tokens:
+            metrics.inc("speculative_jobs_total", outcome="skipped_budget")
+            return
+
+        # Don't queue up calls to a provider that is down
+        if not self.llm.provider_available():
+            metrics.inc("speculative_jobs_total", outcome="skipped_provider_down")
+            return
+
+        # Leave the shared LLM bucket to user traffic when it is empty
+        if not rate_limiter.check_upstream("llm", cost=self.llm.calls_per_email).allowed:
+            metrics.inc("speculative_jobs_total", outcome="skipped_rate_limit")
+            return
+
+        resume = await self.resumes.get_resume(user_id, None)
+        if not resume:
+            return
+        resume_id, resume_text = resume
+
+        description = internship.get("description") or internship.get("title") or ""
+        title = internship.get("title") or ""
+        company = internship.get("company") or ""
+
+        body, subject = await asyncio.gather(
+            self.llm.generate_email(
+                resume_text=resume_text,
+                internship_description=description,
+                internship_title=title,
+                company_name=company,
+                # Same key as the generate request, so regenerate finds the alternates
+                cache_key=self.llm.request_key(user_id, resume_id, description, title, company),
+                user_id=user_id,
+                # A locally built email isn't worth caching; the request can build it just as fast
+                allow_fallback=False
+            ),
+            self.llm.generate_subject_line(
+                job_title=title,
+                company_name=company,
+                resume_text=resume_text,
+                internship_description=description,
+                user_id=user_id
+            )
+        )
+
+        if not body:
+            metrics.inc("speculative_jobs_total", outcome="failed")
+            return
+
+        self.results.set(key, {"resume_id": resume_id, "subject": subject, "body": body})
+        metrics.inc("speculative_jobs_total", outcome="generated")
+        print(f"[SPECULATIVE] Pre-generated email for user {user_id}, internship {key[1]}")
+
+    def _collect(self):
+        yield "speculative_queue_depth", {}, len(self._pending)
+
+    def start(self) -> None:
+        """Start the background workers (no-op when disabled or already running)"""
+        if not self.enabled or self._tasks:
+            return
+
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        print(f"[SPECULATIVE] Started {self.workers} workers, queue of {self.queue_size}")
+
+    async def stop(self) -> None:
+        """Cancel the workers, any generation in progress and the queued jobs"""
+        if not self._tasks:
+            return
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._running.values(), return_exceptions=True)
+
+        self._tasks = []
+        self._running.clear()
+        self._pending.clear()
+        self._heap.clear()
+        print("[SPECULATIVE] Stopped")
+
+
+# Singleton instance
+speculative_service = SpeculativeService()
@@ -1,10 +1,23 @@
 import os
 from supabase import create_client, Client
-from typing import Optional, Dict, Any
+from io import BufferedReader
+from typing import Optional, Dict, Any, List, Union
 from dotenv import load_dotenv
+from postgrest.exceptions import APIError
+from storage3.exceptions import StorageApiError
+from models.internship import InternshipRecord
+from services.circuit_breaker import circuit_breakers
 
 load_dotenv()
 
+# Resume columns other than extracted_text, which can be tens of KB
+RESUME_METADATA_COLUMNS = "id, user_id, file_path, uploaded_at"
+
+
+def _is_transport_failure(exc: BaseException) -> bool:
+    """Error responses (constraint violations, missing rows or files) mean Supabase answered"""
+    return not isinstance(exc, (APIError, StorageApiError))
+
 
 class SupabaseService:
     """Service for Supabase database, auth, and storage operations"""
@@ -17,13 +30,19 @@ class SupabaseService:
             raise ValueError("Supabase credentials not found in environment variables")
         
         self.client: Client = create_client(supabase_url, supabase_key)
+        self.breaker = circuit_breakers.get("supabase", is_failure=_is_transport_failure)
+    
+    def _execute(self, query):
+        """Run a query builder, failing fast while Supabase is unreachable"""
+        with self.breaker:
+            return query.execute()
     
     # User Operations
     async def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user by ID"""
         try:
             print(f"[SUPABASE] Fetching user by ID: {user_id}")
-            result = self.client.table("users").select("*").eq("id", user_id).execute()
+            result = self._execute(self.client.table("users").select("*").eq("id", user_id))
             if result.data:
                 print(f"[SUPABASE] User found: {result.data[0].get('email')}")
                 return result.data[0]
@@ -37,7 +56,7 @@ class SupabaseService:
     async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email"""
         try:
-            result = self.client.table("users").select("*").eq("email", email).execute()
+            result = self._execute(self.client.table("users").select("*").eq("email", email))
             return result.data[0] if result.data else None
         except Exception as e:
             print(f"Error fetching user: {e}")
@@ -57,7 +76,7 @@ class SupabaseService:
             print(f"[SUPABASE] Creating user with data: {user_data}")
             
             # Try insert first
-            result = self.client.table("users").insert(user_data).execute()
+            result = self._execute(self.client.table("users").insert(user_data))
             
             if result.data:
                 print(f"[SUPABASE] User created successfully: {result.data[0]}")
@@ -96,11 +115,11 @@ class SupabaseService:
             print(f"[SUPABASE] File path: {file_path}")
             print(f"[SUPABASE] Extracted text length: {len(extracted_text)}")
             
-            result = self.client.table("resumes").insert({
+            result = self._execute(self.client.table("resumes").insert({
                 "user_id": user_id,
                 "file_path": file_path,
                 "extracted_text": extracted_text
-            }).execute()
+            }))
             
             print(f"[SUPABASE] Resume save result: {result}")
             
@@ -116,15 +135,14 @@ class SupabaseService:
             print(f"[SUPABASE] Full traceback: {traceback.format_exc()}")
             return None
     
-    async def get_latest_resume(self, user_id: str) -> Optional[Dict[str, Any]]:
-        """Get user's latest resume"""
+    async def get_latest_resume(self, user_id: str, include_text: bool = True) -> Optional[Dict[str, Any]]:
+        """Get user's latest resume (metadata only, without extracted_text, if include_text is False)"""
         try:
-            result = self.client.table("resumes")\
-                .select("*")\
+            result = self._execute(self.client.table("resumes")\
+                .select("*" if include_text else RESUME_METADATA_COLUMNS)\
                 .eq("user_id", user_id)\
                 .order("uploaded_at", desc=True)\
-                .limit(1)\
-                .execute()
+                .limit(1))
             return result.data[0] if result.data else None
         except Exception as e:
             print(f"Error fetching resume: {e}")
@@ -133,11 +151,10 @@ class SupabaseService:
     async def get_resume_by_id(self, resume_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Get resume by ID for specific user"""
         try:
-            result = self.client.table("resumes")\
+            result = self._execute(self.client.table("resumes")\
                 .select("*")\
                 .eq("id", resume_id)\
-                .eq("user_id", user_id)\
-                .execute()
+                .eq("user_id", user_id))
             return result.data[0] if result.data else None
         except Exception as e:
             print(f"Error fetching resume by ID: {e}")
@@ -146,11 +163,10 @@ class SupabaseService:
     async def delete_resume(self, resume_id: str, user_id: str) -> bool:
         """Delete resume from database"""
         try:
-            result = self.client.table("resumes")\
+            result = self._execute(self.client.table("resumes")\
                 .delete()\
                 .eq("id", resume_id)\
-                .eq("user_id", user_id)\
-                .execute()
+                .eq("user_id", user_id))
             return True
         except Exception as e:
             print(f"Error deleting resume: {e}")
@@ -158,9 +174,13 @@ class SupabaseService:
     
     # Internship Operations
     async def save_internship(self, internship_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Save internship posting to database"""
+        """Save internship posting to database, updating the stored copy of a known posting"""
         try:
-            result = self.client.table("internships").insert(internship_data).execute()
+            if internship_data.get("fingerprint"):
+                query = self.client.table("internships").upsert(internship_data, on_conflict="fingerprint")
+            else:
+                query = self.client.table("internships").insert(internship_data)
+            result = self._execute(query)
             return result.data[0] if result.data else None
         except Exception as e:
             error_msg = str(e)
@@ -168,54 +188,225 @@ class SupabaseService:
             if "PGRST205" in error_msg or "schema cache" in error_msg:
                 print(f"Error saving internship: Internships table not found in schema cache.")
                 print(f"Please run the database migration: docs/database/migration_add_contact_info.sql")
+            elif "fingerprint" in error_msg or "42P10" in error_msg:
+                print(f"Error saving internship: fingerprint column or unique constraint missing.")
+                print(f"Please run the database migration: docs/database/migration_internships_dedup.sql")
             else:
                 print(f"Error saving internship: {e}")
             return None
     
+    async def save_internships(self, internships: List[InternshipRecord]) -> list:
+        """
+        Save scraped internships, returning stored rows in the same order
+        
+        Listings that fail to save are returned as dictionaries so callers can still use them.
+        """
+        saved_internships = []
+        
+        for internship in internships:
+            try:
+                saved_internship = await self.save_internship(internship.to_row())
+                saved_internships.append(saved_internship or internship.to_dict())
+            except Exception as e:
+                # Continue even if one internship fails to save
+                print(f"Failed to save internship '{internship.title}': {e}")
+                saved_internships.append(internship.to_dict())
+        
+        return saved_internships
+    
     async def get_internship_by_id(self, internship_id: str) -> Optional[Dict[str, Any]]:
         """Get internship by ID"""
         try:
-            result = self.client.table("internships").select("*").eq("id", internship_id).execute()
+            result = self._execute(self.client.table("internships").select("*").eq("id", internship_id))
             return result.data[0] if result.data else None
         except Exception as e:
             print(f"Error fetching internship: {e}")
             return None
-    
+
+    async def search_internships_local(
+        self,
+        query: str,
+        location: Optional[str] = None,
+        max_age_days: Optional[int] = None,
+        limit: int = 10,
+        sort_by_recent: bool = False
+    ) -> list:
+        """Full-text search over stored internships (see migration_internships_search_index.sql)"""
+        try:
+            result = self._execute(self.client.rpc("search_internships_local", {
+                "search_query": query,
+                "location_query": location,
+                "max_age_days": max_age_days,
+                "result_limit": limit,
+                "sort_by_recent": sort_by_recent
+            }))
+            return result.data if result.data else []
+        except Exception as e:
+            error_msg = str(e)
+            if "search_internships_local" in error_msg or "PGRST202" in error_msg:
+                print(f"Error searching stored internships: search function not found.")
+                print(f"Please run the database migration: docs/database/migration_internships_search_index.sql")
+            else:
+                print(f"Error searching stored internships: {e}")
+            return []
+
+    async def get_internships_feed(
+        self,
+        query: str,
+        location: Optional[str] = None,
+        since: Optional[str] = None,
+        since_id: Optional[str] = None,
+        limit: int = 20
+    ) -> list:
+        """Listings matching a search after the (`since`, `since_id`) cursor, oldest first (see migration_saved_searches.sql)"""
+        try:
+            result = self._execute(self.client.rpc("internships_feed", {
+                "search_query": query,
+                "location_query": location,
+                "since": since,
+                "since_id": since_id,
+                "result_limit": limit
+            }))
+            return result.data if result.data else []
+        except Exception as e:
+            print(f"Error fetching internships feed: {e}")
+            return []
+
+    # Saved Search Operations
+    async def get_saved_search(self, user_id: str, query: str, location: str) -> Optional[Dict[str, Any]]:
+        """Get a user's saved search by its normalized query and location"""
+        try:
+            result = self._execute(self.client.table("saved_searches")\
+                .select("*")\
+                .eq("user_id", user_id)\
+                .eq("query", query)\
+                .eq("location", location))
+            return result.data[0] if result.data else None
+        except Exception as e:
+            print(f"Error fetching saved search: {e}")
+            return None
+
+    async def upsert_saved_search(self, saved_search: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Create a saved search or move its high-water mark"""
+        try:
+            result = self._execute(self.client.table("saved_searches")\
+                .upsert(saved_search, on_conflict="user_id,query,location"))
+            return result.data[0] if result.data else None
+        except Exception as e:
+            print(f"Error saving saved search: {e}")
+            return None
+
+    async def get_saved_searches(self, user_id: str) -> list:
+        """Get all of a user's saved searches"""
+        try:
+            result = self._execute(self.client.table("saved_searches")\
+                .select("*")\
+                .eq("user_id", user_id)\
+                .order("created_at", desc=True))
+            return result.data if result.data else []
+        except Exception as e:
+            print(f"Error fetching saved searches: {e}")
+            return []
+
+    async def delete_saved_search(self, saved_search_id: str, user_id: str) -> bool:
+        """Delete a user's saved search"""
+        try:
+            self._execute(self.client.table("saved_searches")\
+                .delete()\
+                .eq("id", saved_search_id)\
+                .eq("user_id", user_id))
+            return True
+        except Exception as e:
+            print(f"Error deleting saved search: {e}")
+            return False
+
+    # LLM Usage Operations
+    async def increment_llm_usage(self, rows: list) -> bool:
+        """Add a batch of per-user daily usage deltas (see migration_llm_usage.sql)"""
+        try:
+            self._execute(self.client.rpc("increment_llm_usage", {"rows": rows}))
+            return True
+        except Exception as e:
+            print(f"Error saving LLM usage: {e}")
+            return False
+
+    async def get_llm_usage(self, user_id: str, since_day: str) -> list:
+        """Get a user's daily LLM usage rows from `since_day` (YYYY-MM-DD) on"""
+        try:
+            result = self._execute(self.client.table("llm_usage")\
+                .select("*")\
+                .eq("user_id", user_id)\
+                .gte("day", since_day)\
+                .order("day", desc=True))
+            return result.data if result.data else []
+        except Exception as e:
+            print(f"Error fetching LLM usage: {e}")
+            return []
+
     # Email Operations
     async def save_email(self, email_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """Save sent email to database"""
         try:
-            result = self.client.table("emails").insert(email_data).execute()
+            result = self._execute(self.client.table("emails").insert(email_data))
             return result.data[0] if result.data else None
         except Exception as e:
             print(f"Error saving email: {e}")
             return None
     
+    async def get_applied_internships(
+        self,
+        user_id: str,
+        internship_ids: Optional[list] = None,
+        fingerprints: Optional[list] = None
+    ) -> list:
+        """
+        Internships among the given ids/fingerprints the user has already emailed,
+        with last_sent_at and emails_sent, in one query (see migration_email_applied.sql)
+        """
+        if not internship_ids and not fingerprints:
+            return []
+        
+        try:
+            result = self._execute(self.client.rpc("applied_internships", {
+                "p_user_id": user_id,
+                "internship_ids": internship_ids or [],
+                "fingerprints": fingerprints or []
+            }))
+            return result.data if result.data else []
+        except Exception as e:
+            error_msg = str(e)
+            if "applied_internships" in error_msg or "PGRST202" in error_msg:
+                print(f"Error fetching applied internships: function not found.")
+                print(f"Please run the database migration: docs/database/migration_email_applied.sql")
+            else:
+                print(f"Error fetching applied internships: {e}")
+            return []
+    
     async def get_user_emails(self, user_id: str, limit: int = 50) -> list:
         """Get user's email history"""
         try:
-            result = self.client.table("emails")\
+            result = self._execute(self.client.table("emails")\
                 .select("*, internships(*)")\
                 .eq("user_id", user_id)\
                 .order("sent_at", desc=True)\
-                .limit(limit)\
-                .execute()
+                .limit(limit))
             return result.data if result.data else []
         except Exception as e:
             print(f"Error fetching emails: {e}")
             return []
     
     # Storage Operations
-    async def upload_file(self, bucket: str, file_path: str, file_data: bytes) -> Optional[str]:
-        """Upload file to Supabase Storage"""
+    async def upload_file(self, bucket: str, file_path: str, file_data: Union[bytes, BufferedReader]) -> Optional[str]:
+        """Upload file to Supabase Storage (bytes, or a file object streamed from its current position)"""
         try:
             # Upload with explicit content type for PDF files
             file_options = {"content-type": "application/pdf"}
-            result = self.client.storage.from_(bucket).upload(
-                file_path, 
-                file_data,
-                file_options
-            )
+            with self.breaker:
+                result = self.client.storage.from_(bucket).upload(
+                    file_path, 
+                    file_data,
+                    file_options
+                )
             return file_path
         except Exception as e:
             print(f"Error uploading file: {e}")
@@ -233,7 +424,8 @@ class SupabaseService:
     async def delete_file(self, bucket: str, file_path: str) -> bool:
         """Delete file from Supabase Storage"""
         try:
-            self.client.storage.from_(bucket).remove([file_path])
+            with self.breaker:
+                self.client.storage.from_(bucket).remove([file_path])
             return True
         except Exception as e:
             print(f"Error deleting file: {e}")
@@ -0,0 +1,346 @@
+import os
+import json
+import time
+import asyncio
+import threading
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, List, Tuple
+from dotenv import load_dotenv
+
+from services.metrics import metrics
+
+load_dotenv()
+
+
+# USD per million tokens: (prompt, cached prompt, completion). Override with LLM_PRICES,
+# e.g. LLM_PRICES='{"llama3-70b-8192": [0.59, 0.295, 0.79]}'
+MODEL_PRICES: Dict[str, Tuple[float, float, float]] = {
+    "llama3-70b-8192": (0.59, 0.295, 0.79),
+    "llama-3.3-70b-versatile": (0.59, 0.295, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.025, 0.08),
+    "gemini-2.0-flash": (0.10, 0.025, 0.40),
+    "gemini-2.0-flash-exp": (0.10, 0.025, 0.40),
+    "gemini-2.0-flash-lite": (0.075, 0.01875, 0.30),
+}
+
+
+@dataclass
+class UsageTotals:
+    """Token counts and estimated cost accumulated for one (user, day, provider, model)"""
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_tokens: int = 0
+    cost_usd: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def add(self, other: "UsageTotals") -> None:
+        self.requests += other.requests
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.cached_tokens += other.cached_tokens
+        self.cost_usd += other.cost_usd
+
+
+def _today() -> str:
+    return datetime.now(timezone.utc).date().isoformat()
+
+
+class UsageService:
+    """
+    LLM token and cost accounting per user per day
+
+    Calls are aggregated in memory and written to the `llm_usage` table in
+    batches (see migration_llm_usage.sql). Daily token budgets are enforced
+    from the stored totals plus this process's unflushed usage.
+    """
+
+    def __init__(
+        self,
+        store=None,
+        daily_token_budget: Optional[int] = None,
+        flush_interval: Optional[float] = None,
+        flush_batch: Optional[int] = None,
+        budget_refresh: Optional[float] = None,
+    ):
+        """
+        Args:
+            store: Object with `increment_llm_usage(rows)` and `get_llm_usage(user_id, since_day)`
+                (defaults to supabase_service)
+            daily_token_budget: Tokens (prompt + completion) per user per UTC day, 0 for no limit
+            flush_interval: Seconds between batched writes
+            flush_batch: Pending rows that trigger a write before the interval elapses
+            budget_refresh: Seconds before a user's stored daily total is re-read
+        """
+        self._store = store
+        self.daily_token_budget = daily_token_budget if daily_token_budget is not None else int(os.getenv("LLM_DAILY_TOKEN_BUDGET", "0"))
+        self.flush_interval = flush_interval if flush_interval is not None else float(os.getenv("USAGE_FLUSH_INTERVAL_SECONDS", "30"))
+        self.flush_batch = flush_batch if flush_batch is not None else int(os.getenv("USAGE_FLUSH_BATCH", "100"))
+        self.budget_refresh = budget_refresh if budget_refresh is not None else float(os.getenv("USAGE_BUDGET_REFRESH_SECONDS", "300"))
+
+        self.prices = dict(MODEL_PRICES)
+        if os.getenv("LLM_PRICES"):
+            try:
+                self.prices.update({model: tuple(price) for model, price in json.loads(os.getenv("LLM_PRICES")).items()})
+            except Exception as e:
+                print(f"[USAGE] Ignoring invalid LLM_PRICES: {e}")
+
+        self._lock = threading.Lock()
+        # (user_id, day, provider, model) -> usage not yet written
+        self._pending: Dict[Tuple[str, str, str, str], UsageTotals] = {}
+        # user_id -> (day, tokens used today, monotonic time the stored total was read or None)
+        self._daily: Dict[str, Tuple[str, int, Optional[float]]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._flush_requested: Optional[asyncio.Event] = None
+
+        metrics.describe("llm_requests_total", "counter", "LLM calls by provider and model")
+        metrics.describe("llm_completion_tokens_total", "counter", "Completion tokens generated by the LLM provider")
+        metrics.describe("llm_cost_usd_total", "counter", "Estimated LLM spend in USD")
+        metrics.describe("llm_budget_rejections_total", "counter", "Requests rejected for exceeding the daily token budget")
+        metrics.describe("llm_usage_pending_rows", "gauge", "Usage rows waiting for the next batched write")
+        metrics.register_collector(self._collect)
+
+    @property
+    def store(self):
+        if self._store is None:
+            from services.supabase_service import supabase_service
+            self._store = supabase_service
+        return self._store
+
+    def cost(self, model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+        """Estimated cost of one call in USD (0 for models without a price)"""
+        prompt_price, cached_price, completion_price = self.prices.get(model, (0.0, 0.0, 0.0))
+        cached_tokens = min(cached_tokens, prompt_tokens)
+        return (
+            (prompt_tokens - cached_tokens) * prompt_price
+            + cached_tokens * cached_price
+            + completion_tokens * completion_price
+        ) / 1_000_000
+
+    def record(
+        self,
+        user_id: Optional[str],
+        provider: str,
+        model: str,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached_tokens: int = 0
+    ) -> float:
+        """
+        Account one LLM call
+
+        Args:
+            user_id: User the call was made for (None: metrics only)
+            provider: "groq" or "gemini"
+            model: Model name
+            prompt_tokens: Prompt tokens billed, including cached ones
+            completion_tokens: Generated tokens
+            cached_tokens: Prompt tokens served from the provider's cache
+
+        Returns:
+            Estimated cost in USD
+        """
+
+        cost = self.cost(model, prompt_tokens, completion_tokens, cached_tokens)
+        metrics.inc("llm_requests_total", provider=provider, model=model)
+        metrics.inc("llm_completion_tokens_total", completion_tokens, provider=provider, model=model)
+        metrics.inc("llm_cost_usd_total", cost, provider=provider, model=model)
+
+        if not user_id:
+            return cost
+
+        day = _today()
+        delta = UsageTotals(1, prompt_tokens, completion_tokens, cached_tokens, cost)
+
+        with self._lock:
+            self._pending.setdefault((user_id, day, provider, model), UsageTotals()).add(delta)
+
+            used_day, used, refreshed_at = self._daily.get(user_id, (day, 0, None))
+            if used_day != day:
+                used, refreshed_at = 0, None
+            self._daily[user_id] = (day, used + delta.total_tokens, refreshed_at)
+
+            pending_rows = len(self._pending)
+
+        if pending_rows >= self.flush_batch and self._flush_requested is not None:
+            self._flush_requested.set()
+
+        return cost
+
+    async def tokens_used_today(self, user_id: str) -> int:
+        """Tokens used by a user today: stored total plus unflushed usage, re-read every `budget_refresh` seconds"""
+        day = _today()
+        now = time.monotonic()
+
+        with self._lock:
+            used_day, used, refreshed_at = self._daily.get(user_id, (day, 0, None))
+            if used_day == day and refreshed_at is not None and now - refreshed_at < self.budget_refresh:
+                return used
+
+        rows = await self.store.get_llm_usage(user_id, day)
+        stored = sum(int(row.get("prompt_tokens") or 0) + int(row.get("completion_tokens") or 0) for row in rows)
+
+        with self._lock:
+            pending = sum(
+                totals.total_tokens
+                for (pending_user, pending_day, _, _), totals in self._pending.items()
+                if pending_user == user_id and pending_day == day
+            )
+            used = stored + pending
+            self._daily[user_id] = (day, used, now)
+
+        return used
+
+    async def remaining_tokens(self, user_id: str) -> Optional[int]:
+        """Tokens left in the user's daily budget, or None when no budget is set"""
+        if self.daily_token_budget <= 0:
+            return None
+        return max(0, self.daily_token_budget - await self.tokens_used_today(user_id))
+
+    async def within_budget(self, user_id: str) -> bool:
+        """Whether the user may start another generation today"""
+        remaining = await self.remaining_tokens(user_id)
+        if remaining is None or remaining > 0:
+            return True
+
+        metrics.inc("llm_budget_rejections_total")
+        return False
+
+    def seconds_until_reset(self) -> int:
+        """Seconds until the daily budgets reset (UTC midnight)"""
+        now = datetime.now(timezone.utc)
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+        return max(1, int((midnight - now).total_seconds()))
+
+    async def get_usage(self, user_id: str, days: int = 7) -> Dict:
+        """
+        A user's usage per day for the last `days` days, including unflushed calls
+
+        Returns:
+            Dict with per-day totals (newest first, broken down by model), today's
+            token count and the remaining daily budget
+        """
+
+        since = (datetime.now(timezone.utc).date() - timedelta(days=days - 1)).isoformat()
+        per_model: Dict[Tuple[str, str, str], UsageTotals] = {}
+
+        for row in await self.store.get_llm_usage(user_id, since):
+            key = (str(row["day"]), row["provider"], row["model"])
+            per_model.setdefault(key, UsageTotals()).add(UsageTotals(
+                int(row.get("requests") or 0),
+                int(row.get("prompt_tokens") or 0),
+                int(row.get("completion_tokens") or 0),
+                int(row.get("cached_tokens") or 0),
+                float(row.get("cost_usd") or 0),
+            ))
+
+        with self._lock:
+            for (pending_user, day, provider, model), totals in self._pending.items():
+                if pending_user == user_id and day >= since:
+                    per_model.setdefault((day, provider, model), UsageTotals()).add(totals)
+
+        daily: Dict[str, Dict] = {}
+        for (day, provider, model), totals in sorted(per_model.items(), reverse=True):
+            entry = daily.setdefault(day, {"day": day, **asdict(UsageTotals()), "models": []})
+            for field_name, value in asdict(totals).items():
+                entry[field_name] += value
+            entry["models"].append({"provider": provider, "model": model, **asdict(totals)})
+
+        for entry in daily.values():
+            entry["cost_usd"] = round(entry["cost_usd"], 6)
+            for model_entry in entry["models"]:
+                model_entry["cost_usd"] = round(model_entry["cost_usd"], 6)
+
+        today = daily.get(_today())
+        used_today = today["prompt_tokens"] + today["completion_tokens"] if today else 0
+
+        return {
+            "days": list(daily.values()),
+            "tokens_today": used_today,
+            "daily_token_budget": self.daily_token_budget or None,
+            "remaining_tokens": max(0, self.daily_token_budget - used_today) if self.daily_token_budget > 0 else None,
+        }
+
+    async def flush(self) -> int:
+        """
+        Write pending usage in one batch
+
+        Returns:
+            Number of rows written (0 when nothing was pending or the write failed)
+        """
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+
+        if not pending:
+            return 0
+
+        rows = [
+            {"user_id": user_id, "day": day, "provider": provider, "model": model, **asdict(totals)}
+            for (user_id, day, provider, model), totals in pending.items()
+        ]
+
+        if await self.store.increment_llm_usage(rows):
+            return len(rows)
+
+        # Keep the deltas for the next attempt
+        with self._lock:
+            for key, totals in pending.items():
+                self._pending.setdefault(key, UsageTotals()).add(totals)
+        return 0
+
+    def start(self) -> None:
+        """Start the background flush loop (no-op when already running)"""
+        if self._task and not self._task.done():
+            return
+
+        self._stopping = asyncio.Event()
+        self._flush_requested = asyncio.Event()
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write what is still pending"""
+        if self._task:
+            self._stopping.set()
+            self._flush_requested.set()
+            try:
+                await asyncio.wait_for(self._task, timeout=5)
+            except asyncio.TimeoutError:
+                self._task.cancel()
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        written = await self.flush()
+        if written:
+            print(f"[USAGE] Flushed {written} usage rows on shutdown")
+
+    async def _loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._flush_requested.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_requested.clear()
+
+            if self._stopping.is_set():
+                break
+
+            try:
+                await self.flush()
+            except Exception as e:
+                print(f"[USAGE] Flush failed: {e}")
+
+    def _collect(self):
+        with self._lock:
+            pending_rows = len(self._pending)
+        yield "llm_usage_pending_rows", {}, pending_rows
+
+
+# Singleton instance
+usage_service = UsageService()
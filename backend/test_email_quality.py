@@ -0,0 +1,143 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.email_quality import EmailQualityValidator, QualityRules, technologies
+
+# Golden samples for the email quality validator. No API calls; needs the backend .env
+# like the other scripts (services are initialized on import): python test_email_quality.py
+
+RESUME = """PRIYA SHARMA
+priya@example.com | github.com/priya
+
+EDUCATION
+B.E. Electronics, RV College of Engineering, 2021-2025
+
+PROJECTS
+SmartSense — real-time sensor fusion for industrial monitoring
+• STM32 microcontrollers running FreeRTOS, TensorFlow Lite anomaly detection
+• MQTT telemetry into InfluxDB
+Internify (AI internship outreach platform)
+• FastAPI backend, Supabase, Next.js frontend
+
+SKILLS
+Python, C++, Docker, Git
+"""
+
+GOOD = """I've been following Controlytics AI's work in embedded systems for predictive maintenance.
+
+I'm an electronics engineering student who builds edge AI solutions.
+
+One project I've spent significant time on is SmartSense, a real-time sensor fusion system for industrial monitoring. While building it, I worked extensively with STM32 microcontrollers, FreeRTOS, and TensorFlow Lite, running anomaly detection directly on the device and streaming telemetry over MQTT. Getting inference to fit in a few hundred kilobytes of RAM while keeping latency under ten milliseconds taught me a lot about profiling and trade-offs on constrained hardware.
+
+That experience maps closely to porting models onto the microcontrollers your team ships, where memory budgets and power draw matter as much as accuracy.
+
+I'd be happy to walk through the project if helpful.
+
+I've attached my resume below for more details on the project and related work."""
+
+GENERIC = """Dear Hiring Manager,
+
+I am writing to express my interest in the internship. I am passionate about technology and highly motivated to learn. I have worked on various projects using multiple technologies and I have experience in building software. I believe my skills make me a great fit for your company and I would be grateful for the opportunity to contribute to your team and grow as an engineer. I am a quick learner, a team player, and I enjoy solving hard problems. Thank you for considering my application, and I look forward to hearing from you soon about next steps in the process and learning more about the role and the team."""
+
+SHORT = "I built SmartSense with STM32 and FreeRTOS. I'd love to chat about the role."
+
+
+def test_extracts_projects_and_technologies():
+    validator = EmailQualityValidator()
+    entities = validator.extract_entities(RESUME)
+
+    assert entities.projects == ["SmartSense", "Internify"], entities.projects
+    for tech in ["STM32", "FreeRTOS", "TensorFlow Lite", "MQTT", "FastAPI", "Supabase", "Next.js", "Python", "C++", "Docker", "Git"]:
+        assert tech in entities.technologies, (tech, entities.technologies)
+    # "TensorFlow Lite" must not also count as plain TensorFlow
+    assert "TensorFlow" not in entities.technologies
+    print("✓ Resume entities extracted")
+
+
+def test_good_email_passes():
+    validator = EmailQualityValidator()
+    report = validator.check(GOOD, validator.extract_entities(RESUME))
+
+    assert report.passed, report.problems
+    assert report.projects == ["SmartSense"]
+    assert {"STM32", "FreeRTOS", "TensorFlow Lite", "MQTT"} <= set(report.technologies), report.technologies
+    assert report.generic_phrases == []
+    print(f"✓ Good email passes (score {report.score:.1f}, {report.word_count} words)")
+
+
+def test_generic_email_fails():
+    validator = EmailQualityValidator()
+    report = validator.check(GENERIC, validator.extract_entities(RESUME))
+
+    assert not report.passed
+    assert any("too generic" in problem for problem in report.problems), report.problems
+    assert {"dear hiring", "i am writing to", "i am passionate", "various projects"} <= set(report.generic_phrases)
+    assert report.projects == [] and report.technologies == []
+    print(f"✓ Generic email fails: {report.problems}")
+
+
+def test_short_email_fails():
+    report = EmailQualityValidator().check(SHORT)
+
+    assert not report.passed
+    assert report.problems == [f"too short ({report.word_count} words)"]
+    print("✓ Short email fails")
+
+
+def test_good_email_outscores_generic():
+    validator = EmailQualityValidator()
+    entities = validator.extract_entities(RESUME)
+
+    assert validator.check(GOOD, entities).score > validator.check(GENERIC, entities).score
+    print("✓ Ranking prefers the specific email")
+
+
+def test_required_entities_rule():
+    validator = EmailQualityValidator(QualityRules(min_projects=1, min_technologies=2))
+    entities = validator.extract_entities(RESUME)
+    unspecific = GOOD.replace("SmartSense", "my monitoring system")
+
+    assert validator.check(GOOD, entities).passed
+    report = validator.check(unspecific, entities)
+    assert not report.passed and "names 0 resume projects, needs 1" in report.problems, report.problems
+    print("✓ Required project mention enforced")
+
+
+def test_everyday_words_are_not_technologies():
+    assert technologies("I'd love to express my interest and react to the rest of the feedback") == []
+    assert technologies("Built with React, Express and a REST API") == ["React", "Express", "REST API"]
+    print("✓ Everyday words ignored")
+
+
+def test_stream_matches_full_check():
+    validator = EmailQualityValidator()
+    entities = validator.extract_entities(RESUME)
+
+    for size in (1, 3, 7, 16, 64):
+        stream = validator.stream(entities)
+        for start in range(0, len(GENERIC), size):
+            stream.feed(GENERIC[start:start + size])
+        stream.feed(" ")
+
+        assert sorted(stream.generic_phrases) == sorted(validator.check(GENERIC).generic_phrases), size
+        assert stream.too_generic
+
+    stream = validator.stream(entities)
+    for start in range(0, len(GOOD), 5):
+        stream.feed(GOOD[start:start + 5])
+    assert not stream.too_generic and stream.report().passed
+    print("✓ Streaming check agrees with the full check")
+
+
+if __name__ == "__main__":
+    print("Testing email quality validator...\n")
+    test_extracts_projects_and_technologies()
+    test_good_email_passes()
+    test_generic_email_fails()
+    test_short_email_fails()
+    test_good_email_outscores_generic()
+    test_required_entities_rule()
+    test_everyday_words_are_not_technologies()
+    test_stream_matches_full_check()
+    print("\nAll email quality tests passed")
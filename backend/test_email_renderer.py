@@ -0,0 +1,112 @@
+import os
+import sys
+import html
+import re
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.email_renderer import EmailRenderer, CompiledTemplate
+
+# Correctness checks for outbound email rendering, including hostile bodies. No API calls;
+# needs the backend .env like the other scripts: python test_email_renderer.py
+
+BODY = """Hi team,
+
+I'm a final-year student who built Internify with FastAPI & Supabase.
+It matched 1,200 listings in its first week.
+
+Best regards,
+Priya"""
+
+HOSTILE = [
+    "<script>alert('x')</script>",
+    '"><img src=x onerror=alert(1)>',
+    "</div></body></html><a href='https://evil.example'>Click</a>",
+    "<!-- comment --> <style>body{display:none}</style>",
+    "Tom & Jerry's <b>bold</b> claims",
+    "$content ${site_url} $$ $ {braces}",
+    "javascript:alert(1)",
+]
+
+
+def content_of(rendered_html: str) -> str:
+    match = re.search(r'<div class="email-content">\n(.*?)\n    </div>', rendered_html, re.S)
+    assert match, "email-content block missing"
+    return match.group(1).strip()
+
+
+def test_paragraphs_and_line_breaks():
+    rendered = EmailRenderer().render(BODY)
+    content = content_of(rendered.html)
+
+    assert content.count("<p>") == 3
+    assert "<br>It matched" in content
+    assert "FastAPI &amp; Supabase" in content
+    print("✓ Blank lines become paragraphs, newlines become <br>")
+
+
+def test_text_part():
+    rendered = EmailRenderer().render(BODY.replace("\n", "\r\n"))
+
+    assert rendered.text.startswith(BODY)
+    assert "\r" not in rendered.text
+    assert "FastAPI & Supabase" in rendered.text
+    assert "https://internify.app" in rendered.text
+    print("✓ text/plain part is the unescaped body plus footer")
+
+
+def test_hostile_input_is_escaped():
+    renderer = EmailRenderer()
+    clean = renderer.render("")
+
+    for body in HOSTILE:
+        rendered = renderer.render(body)
+        content = content_of(rendered.html)
+
+        # Nothing in the body can open a tag, and it round-trips exactly
+        assert "<" not in content.replace("<p>", "").replace("</p>", "").replace("<br>", ""), body
+        assert html.unescape(re.sub(r"</?p>|<br>", "", content)) == body.strip(), body
+        # The document around the body is untouched
+        assert rendered.html.replace(content, "") == clean.html.replace(content_of(clean.html), ""), body
+        assert rendered.text.startswith(body.strip()), body
+    print(f"✓ {len(HOSTILE)} hostile bodies escaped without changing the template")
+
+
+def test_placeholders_in_body_are_not_substituted():
+    rendered = EmailRenderer().render("Price: $content and ${site_url}")
+
+    assert "Price: $content and ${site_url}" in rendered.text
+    assert "Price: $content and ${site_url}" in rendered.html
+    print("✓ Template placeholders inside the body are left alone")
+
+
+def test_compiled_template_matches_string_template():
+    from string import Template
+
+    source = "a $x b ${y} $$ c $x"
+    compiled = CompiledTemplate(source, y="Y")
+    assert compiled.render(x="1") == Template(source).substitute(x="1", y="Y")
+    print("✓ Compiled template renders like string.Template")
+
+
+def test_batch_preserves_order_and_shares_identical_bodies():
+    renderer = EmailRenderer()
+    bodies = ["one", "two", "one", "<three>"]
+    rendered = renderer.render_batch(bodies)
+
+    assert [r.text.split("\n", 1)[0] for r in rendered] == ["one", "two", "one", "<three>"]
+    assert rendered[0] is rendered[2]
+    assert rendered[3] == renderer.render("<three>")
+    print("✓ Batch rendering keeps order and renders duplicates once")
+
+
+if __name__ == "__main__":
+    print("Testing email renderer...\n")
+
+    test_paragraphs_and_line_breaks()
+    test_text_part()
+    test_hostile_input_is_escaped()
+    test_placeholders_in_body_are_not_substituted()
+    test_compiled_template_matches_string_template()
+    test_batch_preserves_order_and_shares_identical_bodies()
+
+    print("\nAll email renderer tests passed")
@@ -0,0 +1,77 @@
+import os
+import asyncio
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.prefetch_service import PrefetchService
+from services.circuit_breaker import CircuitBreaker
+
+
+class StubScraper:
+    """Stands in for scraper_service without calling SerpAPI"""
+
+    def __init__(self):
+        self.calls = []
+        self.breaker = CircuitBreaker("serpapi-test", min_calls=1)
+
+    async def search_internships(self, query, location=None, limit=10, use_cache=True):
+        self.calls.append((query, location, limit, use_cache))
+        return [{"title": f"{query} Intern", "company": "Acme", "link": None, "description": "", "location": location}]
+
+
+class StubStore:
+    def __init__(self):
+        self.saved = []
+
+    async def save_internships(self, internships):
+        self.saved.extend(internships)
+        return internships
+
+
+async def test_prefetch():
+    print("Testing background prefetch with a stubbed scraper...\n")
+
+    scraper = StubScraper()
+    store = StubStore()
+    prefetch = PrefetchService(scraper=scraper, store=store, top_k=2, interval=0.05, budget=3, min_searches=2)
+
+    for _ in range(5):
+        prefetch.record_search("Data Science", "Pune")
+    for _ in range(3):
+        prefetch.record_search("backend", None)
+    prefetch.record_search("  BACKEND ", None)
+    prefetch.record_search("Rare role", "Delhi")  # below min_searches
+
+    refreshed = await prefetch.run_once()
+    assert refreshed == 2, refreshed
+    assert [call[0] for call in scraper.calls] == ["Data Science", "backend"], scraper.calls
+    assert all(call[3] is False for call in scraper.calls), "prefetch must bypass the search cache"
+    assert len(store.saved) == 2
+    print("✓ Refreshed the top-K popular searches")
+
+    # While SerpAPI's circuit is open, nothing is searched or counted against the budget
+    scraper.breaker.record_failure()
+    assert await prefetch.run_once() == 0
+    assert len(scraper.calls) == 2 and prefetch.remaining_budget() == 1
+    scraper.breaker = CircuitBreaker("serpapi-test", min_calls=1)
+    print("✓ Skipped refreshes while the SerpAPI circuit is open")
+
+    # Budget of 3 calls: only one more refresh is allowed in this window
+    refreshed = await prefetch.run_once()
+    assert refreshed == 1, refreshed
+    assert prefetch.remaining_budget() == 0
+    assert await prefetch.run_once() == 0
+    print("✓ Stayed within the SerpAPI budget")
+
+    # Background loop starts and stops cleanly
+    prefetch.enabled = True
+    prefetch.budget = 100
+    prefetch.start()
+    await asyncio.sleep(0.2)
+    await prefetch.stop()
+    assert len(scraper.calls) > 3
+    print("✓ Background loop started and stopped")
+
+
+if __name__ == "__main__":
+    asyncio.run(test_prefetch())
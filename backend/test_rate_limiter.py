@@ -0,0 +1,59 @@
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.rate_limiter import RateLimiter, InMemoryBucketBackend, BucketConfig
+
+# Tests for the token bucket rate limiter (in-process buckets): python test_rate_limiter.py
+
+
+def make_limiter(route: str, upstream: str) -> RateLimiter:
+    limiter = RateLimiter(InMemoryBucketBackend())
+    # Buckets that barely refill during the test
+    limiter.route_limits = {route: BucketConfig(capacity=5, period=3600)}
+    limiter.upstream_limits = {upstream: BucketConfig(capacity=2, period=3600)}
+    return limiter
+
+
+def user_level(limiter: RateLimiter, user_id: str, route: str) -> float:
+    return limiter.backend.levels()[f"user:{user_id}:{route}"]
+
+
+def test_route_and_upstream_buckets():
+    limiter = make_limiter("email.send", "resend")
+
+    assert limiter.check("u1", "email.send", "resend").allowed
+    assert limiter.check("u2", "email.send", "resend").allowed
+    # The upstream bucket is shared between users
+    decision = limiter.check("u3", "email.send", "resend")
+    assert not decision.allowed and decision.retry_after > 0
+    print("✓ Upstream bucket shared by all users")
+
+
+def test_upstream_rejection_refunds_user():
+    limiter = make_limiter("llm.generate", "llm")
+    assert limiter.check_upstream("llm", cost=2).allowed
+
+    limiter.check("u1", "llm.generate")
+    before = user_level(limiter, "u1", "llm.generate")
+    assert not limiter.check("u1", "llm.generate", "llm", cost=3).allowed
+    after = user_level(limiter, "u1", "llm.generate")
+    assert abs(after - before) < 0.01, (before, after)
+    print("✓ User bucket unchanged after an upstream rejection")
+
+
+def test_user_rejection():
+    limiter = make_limiter("internships.search", "serpapi")
+    for _ in range(5):
+        assert limiter.check("u1", "internships.search").allowed
+    assert not limiter.check("u1", "internships.search").allowed
+    assert limiter.check("u2", "internships.search").allowed
+    print("✓ Per-user bucket limits one user only")
+
+
+if __name__ == "__main__":
+    print("Testing rate limiter...\n")
+    test_route_and_upstream_buckets()
+    test_upstream_rejection_refunds_user()
+    test_user_rejection()
+    print("\nAll rate limiter tests passed")
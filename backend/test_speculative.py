@@ -0,0 +1,134 @@
+import os
+import asyncio
+import sys
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from services.speculative_service import SpeculativeService, PRIORITY_VIEW, PRIORITY_SEARCH
+
+
+class StubLLM:
+    """Stands in for llm_service without calling a provider"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.calls = []
+        # Set to make the provider fail, so generate_email falls back
+        self.failing = False
+
+    async def generate_email(self, resume_text, internship_description, internship_title, company_name, cache_key=None, user_id=None, allow_fallback=True):
+        self.calls.append(internship_title)
+        await asyncio.sleep(self.delay)
+        if self.failing:
+            return "Locally built email" if allow_fallback else None
+        return f"Email for {internship_title} at {company_name} from {resume_text}"
+
+    async def generate_subject_line(self, job_title, company_name, resume_text=None, internship_description=None, user_id=None):
+        return f"{job_title} at {company_name}"
+
+    calls_per_email = 4
+
+    def provider_available(self):
+        return True
+
+    def request_key(self, user_id, resume_text, internship_description, internship_title, company_name):
+        return (user_id, internship_title)
+
+
+class StubResumes:
+    def __init__(self):
+        self.latest = {"u1": ("r1", "resume one"), "u2": ("r2", "resume two")}
+
+    async def get_resume(self, user_id, resume_id=None):
+        return self.latest.get(user_id)
+
+
+class StubUsage:
+    def __init__(self):
+        self.remaining = {}
+
+    async def remaining_tokens(self, user_id):
+        return self.remaining.get(user_id)
+
+
+def listing(i):
+    return {"id": f"i{i}", "title": f"Role {i}", "company": "Acme", "description": "Build things"}
+
+
+async def test_speculative():
+    print("Testing speculative email generation with stubbed services...\n")
+
+    llm, resumes, usage = StubLLM(), StubResumes(), StubUsage()
+    speculative = SpeculativeService(
+        llm=llm, resumes=resumes, usage=usage, enabled=True,
+        workers=1, queue_size=3, per_user=2, ttl=60, max_wait=60, min_tokens=1000
+    )
+
+    # Nothing is queued before the workers start (or when disabled)
+    assert not speculative.enqueue("u1", listing(0))
+    speculative.start()
+
+    # A viewed listing is generated in the background and served once
+    assert speculative.enqueue("u1", listing(1), PRIORITY_VIEW)
+    assert not speculative.enqueue("u1", {**listing(9), "already_applied": True})
+    await asyncio.sleep(0.15)
+    result = await speculative.take("u1", "i1")
+    assert result and result["body"] == "Email for Role 1 at Acme from resume one", result
+    assert await speculative.take("u1", "i1") is None
+    print("✓ Served a pre-generated email once")
+
+    # A request arriving mid-generation waits for it instead of generating again
+    speculative.enqueue("u1", listing(2))
+    await asyncio.sleep(0.01)
+    result = await speculative.take("u1", "i2")
+    assert result and "Role 2" in result["body"]
+    assert llm.calls.count("Role 2") == 1
+    print("✓ Joined a generation in progress")
+
+    # A different (or replaced) resume is a miss
+    speculative.enqueue("u1", listing(3))
+    await asyncio.sleep(0.15)
+    assert await speculative.take("u1", "i3", resume_id="r-other") is None
+    print("✓ Ignored an email generated with another resume")
+
+    # Users low on budget aren't spent on
+    usage.remaining["u2"] = 500
+    speculative.enqueue("u2", listing(4))
+    await asyncio.sleep(0.15)
+    assert "Role 4" not in llm.calls
+    usage.remaining["u2"] = None
+    print("✓ Skipped a user below the token floor")
+
+    # A locally built fallback email isn't cached as if the provider wrote it
+    llm.failing = True
+    speculative.enqueue("u1", listing(13))
+    await asyncio.sleep(0.15)
+    assert "Role 13" in llm.calls
+    assert await speculative.take("u1", "i13") is None
+    llm.failing = False
+    print("✓ Didn't cache a fallback email")
+
+    # Saturation: per-user cap, then views evict queued search results, search results are dropped
+    llm.delay = 0.5
+    speculative.enqueue("u1", listing(5))  # picked up by the worker
+    await asyncio.sleep(0.01)
+    assert speculative.enqueue("u1", listing(6), PRIORITY_SEARCH)
+    assert speculative.enqueue("u1", listing(7), PRIORITY_SEARCH)
+    assert not speculative.enqueue("u1", listing(8), PRIORITY_SEARCH)  # u1 has 2 queued
+    assert speculative.enqueue("u2", listing(10), PRIORITY_SEARCH)
+    assert not speculative.enqueue("u2", listing(11), PRIORITY_SEARCH)  # queue full
+    resumes.latest["u3"] = ("r3", "resume three")
+    assert speculative.enqueue("u3", listing(12), PRIORITY_VIEW)  # evicts the newest search job
+    assert ("u2", "i10") not in speculative._pending and ("u3", "i12") in speculative._pending
+    print("✓ Bounded the queue and evicted lower-priority jobs")
+
+    # A queued job is cancelled when the user generates before it starts
+    assert await speculative.take("u1", "i7") is None
+    assert ("u1", "i7") not in speculative._pending
+
+    await speculative.stop()
+    assert not speculative._pending and not speculative._running
+    print("✓ Stopped and cancelled outstanding work")
+
+
+if __name__ == "__main__":
+    asyncio.run(test_speculative())
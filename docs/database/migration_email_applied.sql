@@ -0,0 +1,39 @@
+-- Migration: "Already applied" lookups for search results and the /email/send dedupe guard
+-- Run this in Supabase SQL Editor (after migration_internships_dedup.sql)
+
+-- A user's emails per internship; sent_at is included so MAX(sent_at) reads the index only
+CREATE INDEX IF NOT EXISTS idx_emails_user_internship
+    ON emails(user_id, internship_id) INCLUDE (sent_at);
+
+-- Which of a set of listings the user has already emailed, in one query.
+-- Listings match by stored id, or by fingerprint (company + title + location) for
+-- listings not saved yet or stored under another id.
+-- Called by the backend with supabase.rpc("applied_internships", {...})
+CREATE OR REPLACE FUNCTION applied_internships(
+    p_user_id UUID,
+    internship_ids UUID[] DEFAULT '{}',
+    fingerprints TEXT[] DEFAULT '{}'
+)
+RETURNS TABLE (
+    internship_id UUID,
+    fingerprint TEXT,
+    last_sent_at TIMESTAMP,
+    emails_sent INTEGER
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        i.id,
+        i.fingerprint,
+        MAX(e.sent_at),
+        COUNT(*)::INTEGER
+    FROM emails e
+    JOIN internships i ON i.id = e.internship_id
+    WHERE e.user_id = p_user_id
+      AND (e.internship_id = ANY(internship_ids) OR i.fingerprint = ANY(fingerprints))
+    GROUP BY i.id, i.fingerprint;
+$$;
+
+GRANT EXECUTE ON FUNCTION applied_internships(UUID, UUID[], TEXT[]) TO service_role;
+
+COMMENT ON FUNCTION applied_internships IS 'Last email a user sent per internship, for a batch of internship ids and fingerprints';
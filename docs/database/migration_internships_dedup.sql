@@ -0,0 +1,27 @@
+-- Migration: De-duplicate stored internships by fingerprint
+-- Run this in Supabase SQL Editor before deploying the de-duplication engine
+
+-- Fingerprint = hash of normalized company, title and location (computed by the backend)
+ALTER TABLE internships
+ADD COLUMN IF NOT EXISTS fingerprint TEXT;
+
+-- One row per posting; the backend upserts on this constraint.
+-- Rows stored before this migration keep a NULL fingerprint and are not affected.
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint WHERE conname = 'internships_fingerprint_key'
+    ) THEN
+        ALTER TABLE internships ADD CONSTRAINT internships_fingerprint_key UNIQUE (fingerprint);
+    END IF;
+END $$;
+
+-- Upserts update existing rows
+DROP POLICY IF EXISTS "Service role can update internships" ON internships;
+CREATE POLICY "Service role can update internships" ON internships
+    FOR UPDATE
+    TO service_role
+    USING (true)
+    WITH CHECK (true);
+
+COMMENT ON COLUMN internships.fingerprint IS 'Hash of normalized company, title and location used to merge duplicate postings';
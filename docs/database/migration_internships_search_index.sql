@@ -0,0 +1,74 @@
+-- Migration: Full-text search index over stored internships
+-- Run this in Supabase SQL Editor to enable /internships/local-search
+
+-- Weighted search document: title and company rank above location, location above description
+ALTER TABLE internships
+ADD COLUMN IF NOT EXISTS search_vector tsvector
+GENERATED ALWAYS AS (
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(company, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(location, '')), 'B') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'C')
+) STORED;
+
+-- GIN index for full-text matches
+CREATE INDEX IF NOT EXISTS idx_internships_search_vector ON internships USING GIN (search_vector);
+
+-- Index for recency filters
+CREATE INDEX IF NOT EXISTS idx_internships_created_at ON internships(created_at DESC);
+
+-- Ranked search over stored listings
+-- Called by the backend with supabase.rpc("search_internships_local", {...})
+CREATE OR REPLACE FUNCTION search_internships_local(
+    search_query TEXT,
+    location_query TEXT DEFAULT NULL,
+    max_age_days INTEGER DEFAULT NULL,
+    result_limit INTEGER DEFAULT 10,
+    sort_by_recent BOOLEAN DEFAULT FALSE
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    company TEXT,
+    link TEXT,
+    description TEXT,
+    location TEXT,
+    posted_at TIMESTAMP,
+    created_at TIMESTAMP,
+    contact_email TEXT,
+    contact_phone TEXT,
+    contact_website TEXT,
+    rank REAL
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        i.id,
+        i.title,
+        i.company,
+        i.link,
+        i.description,
+        i.location,
+        i.posted_at,
+        i.created_at,
+        i.contact_email,
+        i.contact_phone,
+        i.contact_website,
+        ts_rank_cd(i.search_vector, q, 32) AS rank
+    FROM internships i, websearch_to_tsquery('english', search_query) q
+    WHERE i.search_vector @@ q
+      AND (location_query IS NULL
+           OR to_tsvector('simple', coalesce(i.location, '')) @@ plainto_tsquery('simple', location_query))
+      AND (max_age_days IS NULL
+           OR i.created_at >= NOW() - make_interval(days => max_age_days))
+    ORDER BY
+        CASE WHEN sort_by_recent THEN i.created_at END DESC,
+        rank DESC,
+        i.created_at DESC
+    LIMIT result_limit;
+$$;
+
+GRANT EXECUTE ON FUNCTION search_internships_local(TEXT, TEXT, INTEGER, INTEGER, BOOLEAN) TO authenticated, service_role;
+
+COMMENT ON COLUMN internships.search_vector IS 'Weighted full-text document (title, company, location, description)';
+COMMENT ON FUNCTION search_internships_local IS 'Ranked full-text search over stored internships with optional location and recency filters';
@@ -0,0 +1,62 @@
+-- Migration: LLM token and cost accounting per user per day
+-- Run this in Supabase SQL Editor
+
+-- One row per (user, day, provider, model); the backend batches increments
+CREATE TABLE IF NOT EXISTS llm_usage (
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    day DATE NOT NULL,
+    provider TEXT NOT NULL,
+    model TEXT NOT NULL,
+    requests INTEGER NOT NULL DEFAULT 0,
+    prompt_tokens BIGINT NOT NULL DEFAULT 0,
+    completion_tokens BIGINT NOT NULL DEFAULT 0,
+    cached_tokens BIGINT NOT NULL DEFAULT 0,
+    cost_usd NUMERIC(12, 6) NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP DEFAULT NOW(),
+    PRIMARY KEY (user_id, day, provider, model)
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_usage_day ON llm_usage(day DESC);
+
+ALTER TABLE llm_usage ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own LLM usage" ON llm_usage;
+CREATE POLICY "Users can view own LLM usage" ON llm_usage
+    FOR SELECT
+    USING (auth.uid()::text = user_id::text);
+
+-- Add a batch of usage deltas in one round-trip.
+-- rows: [{"user_id", "day", "provider", "model", "requests", "prompt_tokens",
+--         "completion_tokens", "cached_tokens", "cost_usd"}, ...]
+CREATE OR REPLACE FUNCTION increment_llm_usage(rows JSONB)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+    INSERT INTO llm_usage AS u (
+        user_id, day, provider, model, requests, prompt_tokens, completion_tokens, cached_tokens, cost_usd, updated_at
+    )
+    SELECT
+        (r->>'user_id')::UUID,
+        (r->>'day')::DATE,
+        r->>'provider',
+        r->>'model',
+        (r->>'requests')::INTEGER,
+        (r->>'prompt_tokens')::BIGINT,
+        (r->>'completion_tokens')::BIGINT,
+        (r->>'cached_tokens')::BIGINT,
+        (r->>'cost_usd')::NUMERIC,
+        NOW()
+    FROM jsonb_array_elements(rows) AS r
+    ON CONFLICT (user_id, day, provider, model) DO UPDATE SET
+        requests = u.requests + EXCLUDED.requests,
+        prompt_tokens = u.prompt_tokens + EXCLUDED.prompt_tokens,
+        completion_tokens = u.completion_tokens + EXCLUDED.completion_tokens,
+        cached_tokens = u.cached_tokens + EXCLUDED.cached_tokens,
+        cost_usd = u.cost_usd + EXCLUDED.cost_usd,
+        updated_at = NOW();
+$$;
+
+GRANT EXECUTE ON FUNCTION increment_llm_usage(JSONB) TO service_role;
+
+COMMENT ON TABLE llm_usage IS 'LLM tokens and estimated cost per user, day, provider and model';
+COMMENT ON COLUMN llm_usage.cached_tokens IS 'Prompt tokens served from the provider prompt cache (included in prompt_tokens)';
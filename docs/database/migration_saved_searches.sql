@@ -0,0 +1,87 @@
+-- Migration: Saved searches with a "new since last fetch" feed
+-- Run this in Supabase SQL Editor after migration_internships_search_index.sql
+
+-- One subscription per (user, query, location)
+CREATE TABLE IF NOT EXISTS saved_searches (
+    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
+    user_id UUID REFERENCES users(id) ON DELETE CASCADE,
+    query TEXT NOT NULL,
+    location TEXT NOT NULL DEFAULT '',
+    last_seen_at TIMESTAMP,
+    last_seen_id UUID,
+    last_fetched_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT NOW(),
+    UNIQUE (user_id, query, location)
+);
+
+-- For databases that ran an earlier version of this migration
+ALTER TABLE saved_searches ADD COLUMN IF NOT EXISTS last_seen_id UUID;
+
+-- Feed reads walk internships by (first-seen time, id)
+DROP INDEX IF EXISTS idx_internships_created_at;
+CREATE INDEX IF NOT EXISTS idx_internships_created_at_id ON internships(created_at, id);
+
+ALTER TABLE saved_searches ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can manage own saved searches" ON saved_searches;
+CREATE POLICY "Users can manage own saved searches" ON saved_searches
+    FOR ALL
+    USING (auth.uid()::text = user_id::text)
+    WITH CHECK (auth.uid()::text = user_id::text);
+
+-- Listings matching a search that come after the (since, since_id) cursor, oldest first,
+-- so the caller can advance its cursor to the last row it received. The id breaks ties
+-- between listings stored in the same batch, which share a created_at. Without since_id
+-- the cursor is inclusive: a listing at exactly `since` may repeat once, but is never lost.
+DROP FUNCTION IF EXISTS internships_feed(TEXT, TEXT, TIMESTAMP, INTEGER);
+
+CREATE OR REPLACE FUNCTION internships_feed(
+    search_query TEXT,
+    location_query TEXT DEFAULT NULL,
+    since TIMESTAMP DEFAULT NULL,
+    since_id UUID DEFAULT NULL,
+    result_limit INTEGER DEFAULT 20
+)
+RETURNS TABLE (
+    id UUID,
+    title TEXT,
+    company TEXT,
+    link TEXT,
+    description TEXT,
+    location TEXT,
+    posted_at TIMESTAMP,
+    created_at TIMESTAMP,
+    contact_email TEXT,
+    contact_phone TEXT,
+    contact_website TEXT
+)
+LANGUAGE sql STABLE
+AS $$
+    SELECT
+        i.id,
+        i.title,
+        i.company,
+        i.link,
+        i.description,
+        i.location,
+        i.posted_at,
+        i.created_at,
+        i.contact_email,
+        i.contact_phone,
+        i.contact_website
+    FROM internships i
+    WHERE i.search_vector @@ websearch_to_tsquery('english', search_query)
+      AND (since IS NULL
+           OR (since_id IS NULL AND i.created_at >= since)
+           OR (i.created_at, i.id) > (since, since_id))
+      AND (location_query IS NULL
+           OR to_tsvector('simple', coalesce(i.location, '')) @@ plainto_tsquery('simple', location_query))
+    ORDER BY i.created_at ASC, i.id ASC
+    LIMIT result_limit;
+$$;
+
+GRANT EXECUTE ON FUNCTION internships_feed(TEXT, TEXT, TIMESTAMP, UUID, INTEGER) TO authenticated, service_role;
+
+COMMENT ON TABLE saved_searches IS 'Saved internship searches with a high-water mark for the new-listings feed';
+COMMENT ON COLUMN saved_searches.last_seen_at IS 'created_at of the newest internship already delivered by the feed';
+COMMENT ON COLUMN saved_searches.last_seen_id IS 'id of that internship, to order listings sharing its created_at';
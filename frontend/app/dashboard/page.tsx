@@ -34,6 +34,7 @@ export default function DashboardPage() {
         
         // Clear any old localStorage data to prevent data leakage between users
         localStorage.removeItem('selectedInternship')
+        localStorage.removeItem('selectedResumeId')
         
         // Use getUser() instead of getSession() - it's more reliable and validates the JWT
         const { data: { user }, error } = await supabase.auth.getUser()
@@ -159,6 +160,9 @@ export default function DashboardPage() {
     setSelectedInternship(internship)
     // Store selected internship in localStorage and navigate
     localStorage.setItem('selectedInternship', JSON.stringify(internship))
+    if (resume?.id) {
+      localStorage.setItem('selectedResumeId', resume.id)
+    }
     router.push('/email-preview')
   }
 
@@ -51,8 +51,8 @@ export default function EmailPreviewPage() {
     const email = extractEmailFromInternship(parsedInternship)
     setRecipientEmail(email)
 
-    // Generate email - pass empty resume_text so backend fetches it from database for current user
-    await generateEmail(parsedInternship, '')
+    // Generate email - the backend resolves the resume by id (or the latest one if none is stored)
+    await generateEmail(parsedInternship)
   }
 
   const extractEmailFromInternship = (internship: any): string => {
@@ -61,15 +61,20 @@ export default function EmailPreviewPage() {
     return internship.company ? `hr@${internship.company.toLowerCase().replace(/\s+/g, '')}.com` : 'contact@company.com'
   }
 
-  const generateEmail = async (internshipData: any, resumeText: string) => {
+  const generateEmail = async (internshipData: any, regenerate = false) => {
     setGenerating(true)
     try {
-      const response = await llmAPI.generateEmail({
+      const request = {
         internship_description: internshipData.description || internshipData.title,
-        resume_text: resumeText,
+        resume_id: localStorage.getItem('selectedResumeId') || undefined,
         internship_title: internshipData.title,
         company_name: internshipData.company,
-      })
+        internship_id: internshipData.id,
+      }
+      // Regenerate serves the next-best candidate from the first generation when one is cached
+      const response = regenerate
+        ? await llmAPI.regenerateEmail(request)
+        : await llmAPI.generateEmail(request)
 
       setSubject(response.data.subject)
       setBody(response.data.body)
@@ -84,8 +89,7 @@ export default function EmailPreviewPage() {
 
   const handleRegenerate = async () => {
     if (!internship) return
-    // Pass empty string so backend fetches resume from database for current user
-    await generateEmail(internship, '')
+    await generateEmail(internship, true)
   }
 
 
@@ -15,6 +15,8 @@ interface InternshipCardProps {
     contact_email?: string
     contact_phone?: string
     contact_website?: string
+    already_applied?: boolean
+    last_sent_at?: string | null
   }
   onSelect?: (internship: any) => void
   selected?: boolean
@@ -48,6 +50,11 @@ export default function InternshipCard({ internship, onSelect, selected }: Inter
               <Building className="w-4 h-4" />
               <span className="text-sm font-medium">{internship.company}</span>
             </div>
+            {internship.already_applied && (
+              <span className="inline-block mt-2 px-2 py-0.5 bg-amber-50 text-amber-700 text-xs font-medium rounded border border-amber-200">
+                Already applied{internship.last_sent_at ? ` on ${formatDate(internship.last_sent_at)}` : ''}
+              </span>
+            )}
           </div>
 
           {selected && (
@@ -80,26 +80,34 @@ export const resumeAPI = {
   upload: (formData: FormData) => api.post('/resume/upload', formData, {
     headers: { 'Content-Type': 'multipart/form-data' }
   }),
-  getLatest: () => api.get('/resume/latest'),
+  getLatest: (includeText: boolean = false) =>
+    api.get('/resume/latest', { params: { include_text: includeText } }),
   delete: (resumeId: string) => api.delete(`/resume/${resumeId}`),
 }
 
 export const internshipsAPI = {
-  search: (role: string, location?: string, limit?: number) => 
-    api.get('/internships/search', { params: { role, location, limit } }),
+  search: (role: string, location?: string, limit?: number, sort: 'relevance' | 'match' = 'match') => 
+    api.get('/internships/search', { params: { role, location, limit, sort } }),
   getById: (internshipId: string) => api.get(`/internships/${internshipId}`),
   searchByCompany: (companyName: string, role?: string) =>
     api.get(`/internships/company/${companyName}`, { params: { role } }),
 }
 
+export interface EmailGenerateRequest {
+  internship_description: string
+  internship_title: string
+  company_name: string
+  // Reference the resume by id; the backend resolves its text (latest resume if omitted)
+  resume_id?: string
+  resume_text?: string
+  // Stored listing id; serves an email pre-generated when the listing was viewed
+  internship_id?: string
+}
+
 export const llmAPI = {
-  generateEmail: (data: {
-    internship_description: string
-    resume_text: string
-    internship_title: string
-    company_name: string
-  }) => api.post('/llm/generate-email', data),
-  regenerateEmail: (data: any) => api.post('/llm/regenerate-email', data),
+  generateEmail: (data: EmailGenerateRequest) => api.post('/llm/generate-email', data),
+  // Same payload as generateEmail; serves a runner-up candidate from the last generation when cached
+  regenerateEmail: (data: EmailGenerateRequest) => api.post('/llm/regenerate-email', data),
 }
 
 export const emailAPI = {
@@ -108,7 +116,12 @@ export const emailAPI = {
     recipient_email: string
     subject: string
     body: string
-  }) => api.post('/email/send', data),
+    // Send even if this internship was already emailed (otherwise 409)
+    force?: boolean
+  }, idempotencyKey?: string) => api.post('/email/send', data, {
+    // Reuse the same key when retrying so the email is sent at most once
+    headers: idempotencyKey ? { 'Idempotency-Key': idempotencyKey } : undefined
+  }),
   getHistory: (limit?: number) => api.get('/email/history', { params: { limit } }),
   getById: (emailId: string) => api.get(`/email/${emailId}`),
   delete: (emailId: string) => api.delete(`/email/${emailId}`),